@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+import timeit
+import tracemalloc
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from trustshield.serving.entity_lists import EntityLists, compile_entity_list
+
+DEFAULT_OUTPUT = "reports/benchmarks/entity_lists.json"
+DEFAULT_SIZES = [1_000_000, 10_000_000]
+LOOKUPS = 20_000
+BATCH_ROWS = 10_000
+
+
+def measure_entity_list(n_entries: int, workdir: Path, random_state: int = 42) -> dict[str, Any]:
+    text_path = workdir / f"cards_{n_entries}.txt"
+    compiled_path = workdir / f"cards_{n_entries}.npy"
+    with text_path.open("w", encoding="utf-8") as f:
+        for start in range(0, n_entries, 1_000_000):
+            stop = min(start + 1_000_000, n_entries)
+            f.write("\n".join(f"card_{i}" for i in range(start, stop)) + "\n")
+
+    def _lists(path: Path) -> EntityLists:
+        spec = {"name": "cards", "column": "card_id", "action": "block", "path": str(path)}
+        return EntityLists([spec])
+
+    started = time.perf_counter()
+    lists = _lists(text_path)
+    text_load_seconds = time.perf_counter() - started
+    resident_bytes = lists.stats()["lists"][0]["bytes"]
+    # Timing and peak memory come from separate loads; tracemalloc slows allocation down.
+    tracemalloc.start()
+    try:
+        compile_entity_list(text_path, compiled_path)
+        _, peak_bytes = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    started = time.perf_counter()
+    compiled = _lists(compiled_path)
+    compiled_load_seconds = time.perf_counter() - started
+
+    # Half the probes are listed ids, half are not.
+    rng = np.random.default_rng(random_state)
+    probes = [
+        {"card_id": f"card_{i}" if i % 2 else f"other_{i}"}
+        for i in rng.integers(0, n_entries, LOOKUPS).tolist()
+    ]
+    lookup_us = {}
+    for name, index in (("text", lists), ("compiled", compiled)):
+        probe_iter = iter(probes * 2)
+        seconds = timeit.timeit(lambda: index.match(next(probe_iter)), number=LOOKUPS)
+        lookup_us[name] = round(seconds / LOOKUPS * 1e6, 3)
+    batch = pd.DataFrame(probes[:BATCH_ROWS])
+    batch_seconds = timeit.timeit(lambda: compiled.match_frame(batch), number=3) / 3
+    return {
+        "n_entries": n_entries,
+        "text_load_seconds": round(text_load_seconds, 3),
+        "compiled_load_seconds": round(compiled_load_seconds, 4),
+        "resident_mb": round(resident_bytes / 1e6, 1),
+        "bytes_per_entry": round(resident_bytes / n_entries, 2),
+        "peak_load_mb": round(peak_bytes / 1e6, 1),
+        "lookup_us": lookup_us["text"],
+        "compiled_lookup_us": lookup_us["compiled"],
+        "batch_ns_per_row": round(batch_seconds / BATCH_ROWS * 1e9, 1),
+    }
+
+
+def run_entity_list_benchmark(sizes: list[int] | None = None) -> dict[str, Any]:
+    with tempfile.TemporaryDirectory() as workdir:
+        results = [measure_entity_list(n, Path(workdir)) for n in sizes or DEFAULT_SIZES]
+    report = {
+        "generated_at_epoch": int(time.time()),
+        "python": sys.version.split()[0],
+        "results": results,
+    }
+    out_path = Path(DEFAULT_OUTPUT)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    for result in results:
+        print(
+            f"{result['n_entries']:>10} ids: {result['resident_mb']:.0f} MB, "
+            f"load {result['text_load_seconds']:.1f}s (text) / "
+            f"{result['compiled_load_seconds'] * 1000:.1f}ms (compiled), "
+            f"{result['lookup_us']:.1f} us/lookup, {result['batch_ns_per_row']:.0f} ns/row batched"
+        )
+    print(f"Entity list benchmark saved to {out_path}")
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure entity list memory, load and lookups.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    args = parser.parse_args()
+    run_entity_list_benchmark(sizes=args.sizes)
+
+
+if __name__ == "__main__":
+    main()
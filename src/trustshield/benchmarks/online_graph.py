@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any
+
+from trustshield.features import OnlineEntityGraph
+from trustshield.ingestion import generate_synthetic_events
+
+DEFAULT_OUTPUT = "reports/benchmarks/online_graph.json"
+DEFAULT_SIZES = [10_000, 50_000, 200_000]
+
+
+def _events(n_events: int, random_state: int) -> list[dict[str, Any]]:
+    frame = generate_synthetic_events(n_samples=n_events, random_state=random_state)
+    # Spread over ten minutes, well inside one window, so nothing ages out mid-run.
+    frame["event_ts"] = 1_700_000_000.0 + frame.index.to_numpy() * (600.0 / n_events)
+    columns = ["user_id", "device_id", "ip_id", "card_id", "merchant_id", "event_ts"]
+    return frame[columns].to_dict(orient="records")
+
+
+def measure_online_graph(
+    n_events: int, link_columns: list[str] | None = None, random_state: int = 42
+) -> dict[str, Any]:
+    events = _events(n_events, random_state)
+    graph = OnlineEntityGraph(link_columns=link_columns)
+    # Timing and memory come from separate passes; tracemalloc slows allocation down.
+    started = time.perf_counter()
+    for event in events:
+        graph.update(event)
+    elapsed = time.perf_counter() - started
+    stats = graph.stats()
+
+    graph = OnlineEntityGraph(link_columns=link_columns)
+    tracemalloc.start()
+    try:
+        for event in events:
+            graph.update(event)
+        current_bytes, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    nodes = stats["active_nodes"] + stats["standby_nodes"]
+    return {
+        "n_events": n_events,
+        "link_columns": graph.link_columns,
+        "us_per_event": round(elapsed / n_events * 1e6, 3),
+        "events_per_second": round(n_events / elapsed, 1),
+        "nodes": nodes,
+        "memory_mb": round(current_bytes / 1e6, 3),
+        "bytes_per_node": round(current_bytes / max(nodes, 1), 1),
+        "hub_links_skipped": stats["hub_links_skipped"],
+    }
+
+
+def run_online_graph_benchmark(
+    sizes: list[int] | None = None, link_columns: list[str] | None = None
+) -> dict[str, Any]:
+    results = [measure_online_graph(n, link_columns=link_columns) for n in sizes or DEFAULT_SIZES]
+    report = {
+        "generated_at_epoch": int(time.time()),
+        "python": sys.version.split()[0],
+        "results": results,
+    }
+    out_path = Path(DEFAULT_OUTPUT)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    for result in results:
+        print(
+            f"{result['n_events']:>9} events: {result['us_per_event']:>8.2f} us/event, "
+            f"{result['nodes']} nodes, {result['memory_mb']:.1f} MB "
+            f"({result['bytes_per_node']:.0f} B/node)"
+        )
+    print(f"Online graph benchmark saved to {out_path}")
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Measure OnlineEntityGraph update cost and memory."
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument(
+        "--link-columns", nargs="+", default=None, help="Default: user, device, ip, card"
+    )
+    args = parser.parse_args()
+    run_online_graph_benchmark(sizes=args.sizes, link_columns=args.link_columns)
+
+
+if __name__ == "__main__":
+    main()
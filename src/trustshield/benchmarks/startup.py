@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+DEFAULT_OUTPUT = "reports/benchmarks/startup.json"
+# Modules the serving import must not pull in eagerly; each costs hundreds of milliseconds.
+LAZY_MODULES = [
+    "sklearn",
+    "sklearn.metrics",
+    "scipy.stats",
+    "scipy.sparse",
+    "pandera",
+    "networkx",
+    "mlflow",
+    "trustshield.evaluation",
+    "trustshield.monitoring.report",
+    "trustshield.monitoring.dashboard",
+]
+
+# Runs in a fresh interpreter: import the app, run its lifespan and poll until the model
+# is loaded and warm, then report timings as one JSON line.
+_CHILD = """
+import json, sys, time
+started = time.perf_counter()
+import trustshield.serving.app as serving_app
+imported = time.perf_counter()
+eager = [name for name in {lazy!r} if name in sys.modules]
+serving_app.MODEL_BUNDLE_PATH = {bundle_path!r}
+from fastapi.testclient import TestClient
+with TestClient(serving_app.app) as client:
+    serving = time.perf_counter()
+    while client.get("/health").json()["model_status"] in ("not_started", "loading"):
+        time.sleep(0.005)
+    ready = time.perf_counter()
+    state = client.get("/health/ready").json()["model"]
+print(json.dumps({{
+    "import_seconds": imported - started,
+    "serving_seconds": serving - started,
+    "ready_seconds": ready - started,
+    "model_status": state["status"],
+    "load_seconds": state["load_seconds"],
+    "warmup_seconds": state["warmup_seconds"],
+    "eager_heavy_modules": eager,
+}}))
+"""
+
+
+def measure_startup(bundle_path: str) -> dict[str, Any]:
+    script = _CHILD.format(lazy=LAZY_MODULES, bundle_path=bundle_path)
+    # Make the package importable in the child even when it is not installed.
+    src_root = str(Path(__file__).resolve().parents[2])
+    pythonpath = os.pathsep.join(filter(None, [src_root, os.environ.get("PYTHONPATH")]))
+    env = {**os.environ, "PYTHONPATH": pythonpath}
+    started = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", script],
+        check=True,
+        capture_output=True,
+        text=True,
+        env=env,
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    # Includes interpreter start-up, which an autoscaler waits for as well.
+    result["process_seconds"] = time.perf_counter() - started
+    return result
+
+
+def _median(runs: list[dict[str, Any]], key: str) -> float | None:
+    values = [run[key] for run in runs if run.get(key) is not None]
+    return round(statistics.median(values), 4) if values else None
+
+
+def run_startup_benchmark(runs: int = 5, bundle_path: str | None = None) -> dict[str, Any]:
+    with tempfile.TemporaryDirectory() as tmp:
+        if bundle_path is None:
+            import joblib
+
+            from trustshield.benchmarks.hot_paths import _bench_bundle
+
+            bundle_path = str(Path(tmp) / "model_bundle.joblib")
+            joblib.dump(_bench_bundle(n_samples=4000, random_state=42), bundle_path)
+        results = [measure_startup(bundle_path) for _ in range(runs)]
+
+    summary = {
+        key: _median(results, key)
+        for key in (
+            "import_seconds",
+            "serving_seconds",
+            "ready_seconds",
+            "process_seconds",
+            "load_seconds",
+            "warmup_seconds",
+        )
+    }
+    report = {
+        "generated_at_epoch": int(time.time()),
+        "python": sys.version.split()[0],
+        "runs": runs,
+        "median": summary,
+        "eager_heavy_modules": sorted({m for run in results for m in run["eager_heavy_modules"]}),
+        "results": results,
+    }
+    out_path = Path(DEFAULT_OUTPUT)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(
+        f"import {summary['import_seconds']}s, accepting requests {summary['serving_seconds']}s, "
+        f"model ready {summary['ready_seconds']}s (median of {runs})"
+    )
+    if report["eager_heavy_modules"]:
+        print(f"Eagerly imported: {', '.join(report['eager_heavy_modules'])}")
+    print(f"Startup benchmark saved to {out_path}")
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure API import and time-to-ready.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--bundle", default=None, help="Model bundle; default trains a small one")
+    args = parser.parse_args()
+    run_startup_benchmark(runs=args.runs, bundle_path=args.bundle)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing as mp
+import resource
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+DEFAULT_SIZES = [5_000, 20_000, 50_000]
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS reports bytes.
+    return float(peak) / (1024.0 * 1024.0) if sys.platform == "darwin" else float(peak) / 1024.0
+
+
+def _run_size(
+    n_samples: int, profile: str, max_features_tfidf: int, random_state: int
+) -> dict[str, Any]:
+    from trustshield.ingestion import generate_profile_events
+    from trustshield.models.train import fit_ensemble
+    from trustshield.preprocessing import normalize_text
+
+    df = generate_profile_events(profile, n_samples=n_samples, random_state=random_state)
+    df = df.drop(columns=["event_ts"])
+    df["message_text"] = df["message_text"].map(normalize_text)
+    rss_before_fit_mb = _peak_rss_mb()
+
+    started = time.perf_counter()
+    bundle = fit_ensemble(df, max_features_tfidf=max_features_tfidf, random_state=random_state)
+    fit_seconds = time.perf_counter() - started
+
+    return {
+        "n_samples": n_samples,
+        "fit_seconds": round(fit_seconds, 4),
+        "peak_rss_mb": round(_peak_rss_mb(), 2),
+        "peak_rss_before_fit_mb": round(rss_before_fit_mb, 2),
+        "pr_auc": round(float(bundle["metrics"]["pr_auc"]), 4),
+    }
+
+
+def run_training_benchmark(
+    sizes: list[int] | None = None,
+    profile: str = "small",
+    max_features_tfidf: int = 3000,
+    random_state: int = 42,
+) -> dict[str, Any]:
+    # A fresh spawned process per size keeps ru_maxrss from leaking across runs.
+    ctx = mp.get_context("spawn")
+    results = []
+    for n_samples in sizes or DEFAULT_SIZES:
+        with ctx.Pool(processes=1) as pool:
+            result = pool.apply(_run_size, (n_samples, profile, max_features_tfidf, random_state))
+        print(
+            f"n={result['n_samples']}: fit {result['fit_seconds']:.2f}s, "
+            f"peak RSS {result['peak_rss_mb']:.1f} MB"
+        )
+        results.append(result)
+
+    report = {
+        "generated_at_epoch": int(time.time()),
+        "profile": profile,
+        "max_features_tfidf": max_features_tfidf,
+        "results": results,
+    }
+    out_path = Path("reports/benchmarks/training.json")
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"Training benchmark saved to {out_path}")
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmark fit time and peak RSS versus dataset size."
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--profile", default="small")
+    parser.add_argument("--max-features-tfidf", type=int, default=3000)
+    args = parser.parse_args()
+    run_training_benchmark(
+        args.sizes, profile=args.profile, max_features_tfidf=args.max_features_tfidf
+    )
+
+
+if __name__ == "__main__":
+    main()
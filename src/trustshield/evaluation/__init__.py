@@ -1,11 +1,21 @@
+from .cost_curve import cost_curve, optimize_thresholds, segment_cost_curves
 from .cost_report import generate_cost_report
 from .error_analysis import generate_error_analysis_report
+from .error_cube import build_error_cube
 from .metrics import cost_saved_metric
+from .policy_replay import expand_policy_grid, replay_policies, run_policy_replay
 from .policy_simulation import run_policy_simulation
 
 __all__ = [
     "cost_saved_metric",
     "generate_error_analysis_report",
+    "build_error_cube",
     "run_policy_simulation",
+    "run_policy_replay",
+    "replay_policies",
+    "expand_policy_grid",
     "generate_cost_report",
+    "cost_curve",
+    "optimize_thresholds",
+    "segment_cost_curves",
 ]
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+
+def cost_curve(
+    y_true: np.ndarray,
+    scores: np.ndarray,
+    fraud_cost: float = 100.0,
+    review_cost: float = 2.0,
+    block_fp_cost: float | None = None,
+) -> dict[str, np.ndarray]:
+    # One descending sort; every distinct score is a candidate threshold (`score >= t`).
+    # Index 0 is the "flag nothing" threshold just above the maximum score. With no events
+    # that is the only point, at threshold 1.0.
+    y_true = np.asarray(y_true).astype(np.int64)
+    scores = np.asarray(scores, dtype=float)
+    if len(y_true) != len(scores):
+        raise ValueError(f"y_true has {len(y_true)} values but scores has {len(scores)}")
+    block_fp_cost = review_cost if block_fp_cost is None else block_fp_cost
+
+    order = np.argsort(-scores)
+    sorted_scores = scores[order]
+    fraud_cum = np.cumsum(y_true[order])
+    # Last position of each run of equal scores closes one threshold.
+    run_ends = np.flatnonzero(np.append(sorted_scores[1:] != sorted_scores[:-1], len(scores) > 0))
+
+    top = float(np.nextafter(sorted_scores[0], np.inf)) if len(scores) else 1.0
+    thresholds = np.concatenate([[top], sorted_scores[run_ends]])
+    flagged = np.concatenate([[0], run_ends + 1]).astype(np.int64)
+    fraud_flagged = np.concatenate([[0], fraud_cum[run_ends]]).astype(np.int64)
+    legit_flagged = flagged - fraud_flagged
+    return {
+        "thresholds": thresholds,
+        "flagged": flagged,
+        "fraud_flagged": fraud_flagged,
+        "legit_flagged": legit_flagged,
+        # Block-only policy at each threshold; equals `cost_saved_metric` pointwise.
+        "cost_saved_block": fraud_cost * fraud_flagged - block_fp_cost * legit_flagged,
+        "fraud_cost": np.float64(fraud_cost),
+        "review_cost": np.float64(review_cost),
+        "block_fp_cost": np.float64(block_fp_cost),
+    }
+
+
+def optimize_thresholds(curve: dict[str, np.ndarray]) -> dict[str, Any]:
+    # Review band [r, b) and block band [b, 1]: every flagged fraud is saved, reviews cost
+    # `review_cost` each and blocked legit events cost `block_fp_cost`. The objective splits
+    # into A(r) + B(b) with b >= r, so a running max over B gives the exact optimum in O(n).
+    fraud_cost = float(curve["fraud_cost"])
+    review_cost = float(curve["review_cost"])
+    block_fp_cost = float(curve["block_fp_cost"])
+    flagged = curve["flagged"]
+    gain_review = fraud_cost * curve["fraud_flagged"] - review_cost * flagged
+    gain_block = review_cost * flagged - block_fp_cost * curve["legit_flagged"]
+
+    best_block = np.maximum.accumulate(gain_block)
+    # Position of the running maximum; ties keep the higher (earlier) block threshold.
+    previous_best = np.concatenate([[-np.inf], best_block[:-1]])
+    positions = np.where(gain_block > previous_best, np.arange(len(gain_block)), 0)
+    best_block_idx = np.maximum.accumulate(positions)
+
+    total = gain_review + best_block
+    review_idx = int(np.argmax(total))
+    block_idx = int(best_block_idx[review_idx])
+    thresholds = curve["thresholds"]
+    return {
+        "review_threshold": float(thresholds[review_idx]),
+        "block_threshold": float(thresholds[block_idx]),
+        "cost_saved": float(total[review_idx]),
+        "review_load": int(flagged[review_idx] - flagged[block_idx]),
+        "block_volume": int(flagged[block_idx]),
+        "fraud_flagged": int(curve["fraud_flagged"][review_idx]),
+        "fraud_blocked": int(curve["fraud_flagged"][block_idx]),
+    }
+
+
+def best_block_only(curve: dict[str, np.ndarray]) -> dict[str, Any]:
+    idx = int(np.argmax(curve["cost_saved_block"]))
+    return {
+        "block_threshold": float(curve["thresholds"][idx]),
+        "cost_saved": float(curve["cost_saved_block"][idx]),
+        "block_volume": int(curve["flagged"][idx]),
+        "fraud_blocked": int(curve["fraud_flagged"][idx]),
+    }
+
+
+def curve_points(curve: dict[str, np.ndarray], max_points: int = 200) -> list[dict[str, float]]:
+    # Evenly spaced in flagged volume, so long flat tails do not crowd out the interesting part.
+    n = len(curve["thresholds"])
+    if n <= max_points:
+        idx = np.arange(n)
+    else:
+        targets = np.linspace(0, curve["flagged"][-1], max_points)
+        idx = np.unique(np.searchsorted(curve["flagged"], targets, side="left").clip(0, n - 1))
+    return [
+        {
+            "threshold": round(float(curve["thresholds"][i]), 6),
+            "flagged": int(curve["flagged"][i]),
+            "fraud_flagged": int(curve["fraud_flagged"][i]),
+            "cost_saved_block": float(curve["cost_saved_block"][i]),
+        }
+        for i in idx
+    ]
+
+
+def segment_cost_curves(
+    segments: pd.Series,
+    y_true: np.ndarray,
+    scores: np.ndarray,
+    max_segments: int = 20,
+    min_events: int = 50,
+    **cost_kwargs: float,
+) -> dict[str, dict[str, Any]]:
+    codes, uniques = pd.factorize(segments.astype(str))
+    sizes = np.bincount(codes[codes >= 0], minlength=len(uniques))
+    ranked = [i for i in np.argsort(-sizes, kind="stable") if sizes[i] >= min_events][:max_segments]
+    y_true = np.asarray(y_true)
+    scores = np.asarray(scores, dtype=float)
+    out: dict[str, dict[str, Any]] = {}
+    for code in ranked:
+        mask = codes == code
+        curve = cost_curve(y_true[mask], scores[mask], **cost_kwargs)
+        out[str(uniques[code])] = {
+            "n_events": int(sizes[code]),
+            "fraud_events": int(y_true[mask].sum()),
+            "optimal": optimize_thresholds(curve),
+        }
+    return out
@@ -5,35 +5,62 @@ import time
 from pathlib import Path
 
 import joblib
-import numpy as np
 
+from trustshield.evaluation.cost_curve import (
+    best_block_only,
+    cost_curve,
+    curve_points,
+    optimize_thresholds,
+    segment_cost_curves,
+)
 from trustshield.evaluation.metrics import cost_saved_metric
 from trustshield.ingestion import generate_synthetic_events
-from trustshield.models import score_event
+from trustshield.models import score_frame
 from trustshield.preprocessing import normalize_text
 
+SEGMENT_COLUMNS = ["country", "merchant_id"]
 
-def generate_cost_report(block_threshold: float = 0.75) -> dict:
+
+def generate_cost_report(
+    block_threshold: float = 0.75,
+    fraud_cost: float = 100.0,
+    review_cost: float = 2.0,
+    block_fp_cost: float | None = None,
+    n_samples: int = 1000,
+) -> dict:
     artifact_path = Path("reports/artifacts/model_bundle.joblib")
     if not artifact_path.exists():
         raise FileNotFoundError("Model artifact is missing. Run `make train` first.")
     bundle = joblib.load(artifact_path)
 
-    holdout = generate_synthetic_events(n_samples=1000, random_state=321)
+    holdout = generate_synthetic_events(n_samples=n_samples, random_state=321)
     holdout["message_text"] = holdout["message_text"].map(normalize_text)
 
-    scores = np.array([score_event(bundle, row) for row in holdout.to_dict(orient="records")])
+    scores = score_frame(bundle, holdout)["risk_score"].to_numpy(dtype=float)
     y_true = holdout["is_fraud"].to_numpy(dtype=int)
     y_block = (scores >= block_threshold).astype(int)
 
-    saved = cost_saved_metric(y_true, y_block, fraud_cost=100.0, review_cost=2.0)
+    saved = cost_saved_metric(y_true, y_block, fraud_cost=fraud_cost, review_cost=review_cost)
+    cost_kwargs = {
+        "fraud_cost": fraud_cost,
+        "review_cost": review_cost,
+        "block_fp_cost": review_cost if block_fp_cost is None else block_fp_cost,
+    }
+    curve = cost_curve(y_true, scores, **cost_kwargs)
     report = {
         "generated_at_epoch": int(time.time()),
         "block_threshold": block_threshold,
         "n_samples": int(len(holdout)),
         "blocked_events": int(y_block.sum()),
         "estimated_cost_saved": float(saved),
-        "assumptions": {"fraud_cost": 100.0, "review_cost": 2.0},
+        "assumptions": cost_kwargs,
+        "optimal_thresholds": optimize_thresholds(curve),
+        "optimal_block_only": best_block_only(curve),
+        "cost_curve": curve_points(curve),
+        "segments": {
+            col: segment_cost_curves(holdout[col], y_true, scores, **cost_kwargs)
+            for col in SEGMENT_COLUMNS
+        },
     }
 
     out_path = Path("reports/cost_report.json")
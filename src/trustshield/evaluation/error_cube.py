@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from trustshield.features.graph import ENTITY_COLS
+from trustshield.features.risk_rules import _int_column, reason_flag_masks
+
+EXEMPLAR_COLUMNS = ["event_id", "message_text", "country", "payment_attempts", "account_age_days"]
+PAYMENT_ATTEMPT_EDGES = [2, 4, 5]
+PAYMENT_ATTEMPT_LABELS = ["0-1", "2-3", "4", "5+"]
+ACCOUNT_AGE_EDGES = [2, 7, 30, 90, 365]
+ACCOUNT_AGE_LABELS = ["0-1", "2-6", "7-29", "30-89", "90-364", "365+"]
+HOTNESS_EDGES = [2, 5, 20]
+HOTNESS_LABELS = ["1", "2-4", "5-19", "20+"]
+
+
+def _bucket_codes(
+    values: np.ndarray, edges: list[int], labels: list[str]
+) -> tuple[np.ndarray, list[str]]:
+    return np.digitize(values, edges), labels
+
+
+def _entity_hotness(frame: pd.DataFrame) -> np.ndarray:
+    # Busiest linked entity per row, counted within the scored frame itself.
+    hotness = np.ones(len(frame), dtype=np.int64)
+    for col in ENTITY_COLS:
+        if col in frame.columns:
+            codes = pd.factorize(frame[col])[0] + 1
+            hotness = np.maximum(hotness, np.bincount(codes)[codes])
+    return hotness
+
+
+def _segment_dimensions(frame: pd.DataFrame) -> dict[str, tuple[np.ndarray, list[str]]]:
+    country_codes, countries = pd.factorize(frame["country"].astype(str).str.upper())
+    return {
+        "country": (country_codes, [str(value) for value in countries]),
+        "payment_attempts": _bucket_codes(
+            _int_column(frame, "payment_attempts"), PAYMENT_ATTEMPT_EDGES, PAYMENT_ATTEMPT_LABELS
+        ),
+        "account_age_days": _bucket_codes(
+            _int_column(frame, "account_age_days"), ACCOUNT_AGE_EDGES, ACCOUNT_AGE_LABELS
+        ),
+        "entity_hotness": _bucket_codes(_entity_hotness(frame), HOTNESS_EDGES, HOTNESS_LABELS),
+    }
+
+
+def _top_k(rows: np.ndarray, keys: np.ndarray, k: int) -> np.ndarray:
+    # argpartition picks the k largest keys in O(len(rows)); only those k get sorted.
+    if len(rows) > k:
+        rows = rows[np.argpartition(-keys[rows], k - 1)[:k]]
+    return rows[np.argsort(-keys[rows], kind="stable")]
+
+
+def _exemplars(frame: pd.DataFrame, scores: np.ndarray, rows: np.ndarray) -> list[dict[str, Any]]:
+    cols = [col for col in EXEMPLAR_COLUMNS if col in frame.columns]
+    records = frame.iloc[rows][cols].astype(object).to_dict(orient="records")
+    for record, row in zip(records, rows):
+        record["score"] = round(float(scores[row]), 6)
+    return records
+
+
+def _segment_summary(cells: np.ndarray, hist: np.ndarray) -> dict[str, Any]:
+    tn, fp, fn, tp = (int(value) for value in cells)
+    return {
+        "n": tn + fp + fn + tp,
+        "tn": tn,
+        "fp": fp,
+        "fn": fn,
+        "tp": tp,
+        "precision": round(tp / max(tp + fp, 1), 4),
+        "recall": round(tp / max(tp + fn, 1), 4),
+        "false_positive_rate": round(fp / max(fp + tn, 1), 4),
+        "score_hist_legit": hist[0].astype(int).tolist(),
+        "score_hist_fraud": hist[1].astype(int).tolist(),
+    }
+
+
+def build_error_cube(
+    frame: pd.DataFrame,
+    scores: np.ndarray,
+    y_true: np.ndarray,
+    threshold: float = 0.5,
+    n_bins: int = 10,
+    top_k: int = 5,
+) -> dict[str, Any]:
+    scores = np.asarray(scores, dtype=float)
+    y_true = np.asarray(y_true).astype(np.int64)
+    pred = (scores >= threshold).astype(np.int64)
+    # Confusion cell per row: 0=TN, 1=FP, 2=FN, 3=TP.
+    cell = 2 * y_true + pred
+    score_bin = np.clip((scores * n_bins).astype(np.int64), 0, n_bins - 1)
+    hist_slot = y_true * n_bins + score_bin
+    is_fp = cell == 1
+    is_fn = cell == 2
+    # FPs rank by high score, FNs by low score.
+    fp_keys = np.where(is_fp, scores, -np.inf)
+    fn_keys = np.where(is_fn, -scores, -np.inf)
+
+    cube: dict[str, Any] = {}
+    for name, (codes, labels) in _segment_dimensions(frame).items():
+        n_segments = len(labels)
+        # One bincount per dimension for the confusion cells and one for the histograms.
+        cells = np.bincount(codes * 4 + cell, minlength=n_segments * 4).reshape(n_segments, 4)
+        hists = np.bincount(
+            codes * 2 * n_bins + hist_slot, minlength=n_segments * 2 * n_bins
+        ).reshape(n_segments, 2, n_bins)
+        # Integer sort groups rows by segment in linear time; exemplars come from each slice.
+        order = np.argsort(codes, kind="stable")
+        bounds = np.searchsorted(codes[order], np.arange(n_segments + 1))
+        segments: dict[str, Any] = {}
+        for code, label in enumerate(labels):
+            if cells[code].sum() == 0:
+                continue
+            rows = order[bounds[code] : bounds[code + 1]]
+            summary = _segment_summary(cells[code], hists[code])
+            summary["top_false_positives"] = _exemplars(
+                frame, scores, _top_k(rows[is_fp[rows]], fp_keys, top_k)
+            )
+            summary["top_false_negatives"] = _exemplars(
+                frame, scores, _top_k(rows[is_fn[rows]], fn_keys, top_k)
+            )
+            segments[label] = summary
+        cube[name] = segments
+
+    # Reason flags overlap, so each flag is its own slice. Rows are binned once by their flag
+    # combination; a flag's totals are the sum over the combinations that contain it.
+    flags = reason_flag_masks(frame)
+    combo = np.zeros(len(frame), dtype=np.int64)
+    for i, mask in enumerate(flags.values()):
+        combo |= mask.astype(np.int64) << i
+    n_combos = 1 << len(flags)
+    combo_cells = np.bincount(combo * 4 + cell, minlength=n_combos * 4).reshape(n_combos, 4)
+    combo_hists = np.bincount(
+        combo * 2 * n_bins + hist_slot, minlength=n_combos * 2 * n_bins
+    ).reshape(n_combos, 2, n_bins)
+    cube["reason_flags"] = {}
+    for i, (flag, mask) in enumerate(flags.items()):
+        has_flag = (np.arange(n_combos) >> i & 1).astype(bool)
+        flag_cells = combo_cells[has_flag].sum(axis=0)
+        if flag_cells.sum() == 0:
+            continue
+        rows = np.flatnonzero(mask)
+        summary = _segment_summary(flag_cells, combo_hists[has_flag].sum(axis=0))
+        summary["top_false_positives"] = _exemplars(
+            frame, scores, _top_k(rows[is_fp[rows]], fp_keys, top_k)
+        )
+        summary["top_false_negatives"] = _exemplars(
+            frame, scores, _top_k(rows[is_fn[rows]], fn_keys, top_k)
+        )
+        cube["reason_flags"][flag] = summary
+
+    return {
+        "threshold": threshold,
+        "n_bins": n_bins,
+        "bin_edges": np.linspace(0.0, 1.0, n_bins + 1).round(4).tolist(),
+        "dimensions": cube,
+    }
+
+
+def top_errors(
+    frame: pd.DataFrame, scores: np.ndarray, y_true: np.ndarray, threshold: float, k: int = 10
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    scores = np.asarray(scores, dtype=float)
+    y_true = np.asarray(y_true).astype(np.int64)
+    pred = scores >= threshold
+    fp_rows = np.flatnonzero(pred & (y_true == 0))
+    fn_rows = np.flatnonzero(~pred & (y_true == 1))
+    return (
+        _exemplars(frame, scores, _top_k(fp_rows, scores, k)),
+        _exemplars(frame, scores, _top_k(fn_rows, -scores, k)),
+    )
@@ -0,0 +1,318 @@
+from __future__ import annotations
+
+import argparse
+import copy
+import itertools
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import joblib
+import numpy as np
+import pandas as pd
+import yaml
+
+from trustshield.features import event_time as event_time_module
+from trustshield.features.risk_rules import _int_column
+from trustshield.ingestion.readers import read_events
+from trustshield.models.infer import score_frame
+from trustshield.preprocessing.validation import OPTIONAL_COLUMNS, REQUIRED_COLUMNS
+from trustshield.serving.policy import (
+    DEFAULT_RATE_LIMIT_BUCKETS,
+    load_policy,
+    rate_limit_clock_skew,
+    rate_limit_rules,
+)
+
+_worker_context: dict[str, Any] | None = None
+
+
+def window_counts(keys: pd.Series, event_ts: np.ndarray, window_seconds: float) -> np.ndarray:
+    # Count of same-key events in [ts - window, ts] up to and including each event, as an
+    # online sliding window sees them when events arrive in timestamp order (ties by input
+    # order). Rate-limit replay passes bucket ids as `event_ts`.
+    n = len(event_ts)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+    key_codes = pd.factorize(keys)[0].astype(np.int64)
+    event_ts = np.asarray(event_ts, dtype=float)
+    # Rank timestamps and window starts together so the (key, time) composite stays exact.
+    values, inverse = np.unique(
+        np.concatenate([event_ts, event_ts - float(window_seconds)]), return_inverse=True
+    )
+    inverse = inverse.reshape(-1)
+    ts_rank = inverse[:n]
+    start_rank = inverse[n:]
+    base = np.int64(len(values) + 1)
+
+    # A stable sort keeps input order for equal timestamps, matching the online tie order.
+    composite = key_codes * base + ts_rank
+    order = np.argsort(composite, kind="stable")
+    # Queries walk the sorted order too, so searchsorted scans forward instead of jumping.
+    first_in_window = np.searchsorted(
+        composite[order], (key_codes * base + start_rank)[order], side="left"
+    )
+    counts = np.empty(n, dtype=np.int64)
+    counts[order] = np.arange(n) - first_in_window + 1
+    return counts
+
+
+def _set_dotted(policy: dict[str, Any], dotted_key: str, value: Any) -> None:
+    node = policy
+    *parents, leaf = dotted_key.split(".")
+    for part in parents:
+        node = node.setdefault(part, {})
+    node[leaf] = value
+
+
+def expand_policy_grid(
+    base_policy: dict[str, Any], grid: dict[str, list[Any]]
+) -> list[dict[str, Any]]:
+    variants = [{"name": "baseline", "params": {}, "policy": base_policy}]
+    keys = sorted(grid)
+    for combo in itertools.product(*(grid[key] for key in keys)):
+        params = dict(zip(keys, combo))
+        policy = copy.deepcopy(base_policy)
+        for dotted_key, value in params.items():
+            _set_dotted(policy, dotted_key, value)
+        name = ",".join(f"{key}={value}" for key, value in params.items())
+        variants.append({"name": name, "params": params, "policy": policy})
+    return variants
+
+
+def _buckets_per_window(policy: dict[str, Any]) -> int:
+    cfg = policy.get("rate_limits") or {}
+    return int(cfg.get("buckets_per_window", DEFAULT_RATE_LIMIT_BUCKETS))
+
+
+def _rate_limit_key_codes(events: pd.DataFrame, keys: tuple[str, ...]) -> np.ndarray:
+    # One code per distinct key tuple; -1 where a key is missing or a placeholder
+    # ("unknown_*"), which the online counters skip as well.
+    codes = np.zeros(len(events), dtype=np.int64)
+    invalid = np.zeros(len(events), dtype=bool)
+    for col in keys:
+        if col not in events.columns:
+            return np.full(len(events), -1, dtype=np.int64)
+        col_codes, uniques = pd.factorize(events[col])
+        placeholder = pd.Index(uniques).astype(str).str.startswith("unknown_")
+        # Missing values get code -1, which picks the trailing True.
+        invalid |= np.append(placeholder, True)[col_codes]
+        codes = pd.factorize(codes * (len(uniques) + 1) + col_codes)[0]
+    codes[invalid] = -1
+    return codes
+
+
+def _replay_context(
+    events: pd.DataFrame, scores: np.ndarray, variants: list[dict[str, Any]]
+) -> dict[str, Any]:
+    if "event_ts" not in events.columns:
+        raise ValueError("Policy replay needs an `event_ts` column to rebuild rate-limit windows.")
+    raw_ts = pd.to_numeric(events["event_ts"], errors="coerce").to_numpy(dtype=float)
+    # Event times as the online counters see them: wall time when missing, and capped at the
+    # variant's clock skew ahead of the wall clock.
+    now = event_time_module.wall_time()
+    raw_ts = np.where(np.isnan(raw_ts), now, raw_ts)
+    counters: set[tuple[tuple[str, ...], int, int, float | None]] = set()
+    for variant in variants:
+        buckets = _buckets_per_window(variant["policy"])
+        skew = rate_limit_clock_skew(variant["policy"])
+        for rule in rate_limit_rules(variant["policy"]):
+            counters.add((rule["keys"], rule["window_seconds"], buckets, skew))
+    counts: dict[tuple[tuple[str, ...], int, int, float | None], np.ndarray] = {}
+    key_codes: dict[tuple[str, ...], np.ndarray] = {}
+    for keys, window, buckets, skew in sorted(counters, key=lambda c: (*c[:3], c[3] or -1.0)):
+        if keys not in key_codes:
+            key_codes[keys] = _rate_limit_key_codes(events, keys)
+        codes = key_codes[keys]
+        counted = codes >= 0
+        event_ts = raw_ts if skew is None else np.minimum(raw_ts, now + skew)
+        # Online counters are rings of `buckets` buckets: an event counts the same-key events
+        # at most `buckets - 1` buckets before its own. Shared by every variant with the same
+        # keys, window, bucket count and clock skew; thresholds only compare against it.
+        bucket_ids = np.floor_divide(event_ts[counted], window / buckets)
+        window_count = np.zeros(len(events), dtype=np.int64)
+        window_count[counted] = window_counts(
+            pd.Series(codes[counted]), bucket_ids, window_seconds=buckets - 1
+        )
+        counts[(keys, window, buckets, skew)] = window_count
+
+    labels = None
+    if "is_fraud" in events.columns:
+        labels = _int_column(events, "is_fraud") == 1
+    return {
+        "scores": np.asarray(scores, dtype=float),
+        "payment_attempts": _int_column(events, "payment_attempts"),
+        "account_age_days": _int_column(events, "account_age_days"),
+        "window_counts": counts,
+        "labels": labels,
+    }
+
+
+def evaluate_variant(context: dict[str, Any], variant: dict[str, Any]) -> dict[str, Any]:
+    policy = variant["policy"]
+    scores = context["scores"]
+    n = len(scores)
+    thresholds = policy["score_thresholds"]
+    hard_rules = policy["hard_rules"]
+    trigger_counts: dict[str, int] = {}
+
+    rate_block = np.zeros(n, dtype=bool)
+    rate_review = np.zeros(n, dtype=bool)
+    buckets = _buckets_per_window(policy)
+    skew = rate_limit_clock_skew(policy)
+    for rule in rate_limit_rules(policy):
+        key = (rule["keys"], rule["window_seconds"], buckets, skew)
+        counts = context["window_counts"][key]
+        block = np.zeros(n, dtype=bool)
+        if rule["block"] is not None:
+            block = counts >= int(rule["block"])
+        review = np.zeros(n, dtype=bool)
+        if rule["review"] is not None:
+            review = ~block & (counts >= int(rule["review"]))
+        trigger_counts[f"{rule['trigger']}:block"] = int(block.sum())
+        trigger_counts[f"{rule['trigger']}:review"] = int(review.sum())
+        rate_block |= block
+        rate_review |= review
+
+    # Same precedence as `decide`: hard rules, then rate limits, then score thresholds.
+    max_attempts = context["payment_attempts"] >= int(hard_rules["max_payment_attempts"])
+    min_age = ~max_attempts & (
+        context["account_age_days"] <= int(hard_rules["min_account_age_days"])
+    )
+    by_score = ~max_attempts & ~min_age & ~rate_block & ~rate_review
+    score_block = by_score & (scores >= float(thresholds["block"]))
+    score_review = by_score & ~score_block & (scores >= float(thresholds["review"]))
+    trigger_counts["hard_rule:max_payment_attempts"] = int(max_attempts.sum())
+    trigger_counts["hard_rule:min_account_age_days"] = int(min_age.sum())
+    trigger_counts["score:block_threshold"] = int(score_block.sum())
+    trigger_counts["score:review_threshold"] = int(score_review.sum())
+
+    is_block = max_attempts | rate_block | score_block
+    is_review = ~is_block & (min_age | rate_review | score_review)
+    decisions = {
+        "allow": int(n - is_block.sum() - is_review.sum()),
+        "review": int(is_review.sum()),
+        "block": int(is_block.sum()),
+    }
+    result: dict[str, Any] = {
+        "name": variant["name"],
+        "params": variant["params"],
+        "decisions": decisions,
+        "top_policy_triggers": sorted(
+            ((name, count) for name, count in trigger_counts.items() if count > 0),
+            key=lambda x: x[1],
+            reverse=True,
+        )[:10],
+    }
+    labels = context["labels"]
+    if labels is not None:
+        n_fraud = int(labels.sum())
+        result["review_precision_proxy"] = round(
+            int((labels & is_review).sum()) / max(decisions["review"], 1), 4
+        )
+        result["block_precision_proxy"] = round(
+            int((labels & is_block).sum()) / max(decisions["block"], 1), 4
+        )
+        result["fraud_capture_rate"] = round(
+            int((labels & (is_block | is_review)).sum()) / max(n_fraud, 1), 4
+        )
+    return result
+
+
+def _init_worker(context: dict[str, Any]) -> None:
+    global _worker_context
+    _worker_context = context
+
+
+def _evaluate_in_worker(variant: dict[str, Any]) -> dict[str, Any]:
+    if _worker_context is None:
+        raise RuntimeError("Policy replay worker was not initialized; use replay_policies.")
+    return evaluate_variant(_worker_context, variant)
+
+
+def replay_policies(
+    events: pd.DataFrame,
+    scores: np.ndarray,
+    variants: list[dict[str, Any]],
+    workers: int = 1,
+) -> list[dict[str, Any]]:
+    context = _replay_context(events, scores, variants)
+    if workers <= 1 or len(variants) <= 1:
+        return [evaluate_variant(context, variant) for variant in variants]
+    # The shared window counts are shipped once per worker, not once per variant.
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(context,)
+    ) as pool:
+        chunksize = max(1, len(variants) // (4 * workers))
+        return list(pool.map(_evaluate_in_worker, variants, chunksize=chunksize))
+
+
+def _load_scores(events: pd.DataFrame, scores_path: str | None, bundle_path: str) -> np.ndarray:
+    if "risk_score" in events.columns:
+        return events["risk_score"].to_numpy(dtype=float)
+    if scores_path:
+        scored = read_events(scores_path, columns=["event_id", "risk_score"], compact=False)
+        merged = events[["event_id"]].merge(scored, on="event_id", how="left")
+        if merged["risk_score"].isna().any():
+            raise ValueError("Scores file does not cover every replayed event_id.")
+        return merged["risk_score"].to_numpy(dtype=float)
+    return score_frame(joblib.load(bundle_path), events)["risk_score"].to_numpy(dtype=float)
+
+
+def run_policy_replay(
+    input_path: str,
+    grid_path: str = "configs/policy_grid.yaml",
+    policy_path: str = "configs/policy.yaml",
+    scores_path: str | None = None,
+    bundle_path: str = "reports/artifacts/model_bundle.joblib",
+    workers: int = 1,
+) -> dict[str, Any]:
+    events = read_events(input_path, columns=REQUIRED_COLUMNS + OPTIONAL_COLUMNS + ["risk_score"])
+    scores = _load_scores(events, scores_path, bundle_path)
+    with Path(grid_path).open("r", encoding="utf-8") as f:
+        grid = yaml.safe_load(f).get("grid", {})
+    variants = expand_policy_grid(load_policy(policy_path), grid)
+
+    start = time.perf_counter()
+    results = replay_policies(events, scores, variants, workers=workers)
+    elapsed = time.perf_counter() - start
+    report = {
+        "generated_at_epoch": int(time.time()),
+        "n_events": int(len(events)),
+        "n_variants": len(variants),
+        "elapsed_seconds": round(elapsed, 4),
+        "variants": results,
+    }
+    out_path = Path("reports/policy_replay.json")
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(
+        f"Replayed {len(events)} events against {len(variants)} policy variants "
+        f"in {elapsed:.2f}s; report saved to {out_path}"
+    )
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay an event log against policy variants.")
+    parser.add_argument("--input", required=True, help="Event file or glob with event_ts")
+    parser.add_argument("--grid", default="configs/policy_grid.yaml")
+    parser.add_argument("--policy", default="configs/policy.yaml")
+    parser.add_argument("--scores", default=None, help="Batch scoring output joined on event_id")
+    parser.add_argument("--bundle", default="reports/artifacts/model_bundle.joblib")
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+    run_policy_replay(
+        args.input,
+        grid_path=args.grid,
+        policy_path=args.policy,
+        scores_path=args.scores,
+        bundle_path=args.bundle,
+        workers=args.workers,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -4,9 +4,12 @@ import json
 import time
 from pathlib import Path
 
+import numpy as np
+
+from trustshield.evaluation.policy_replay import replay_policies
 from trustshield.ingestion import generate_synthetic_events
 from trustshield.preprocessing import normalize_text
-from trustshield.serving.policy import decide, init_policy_state, load_policy
+from trustshield.serving.policy import load_policy
 
 
 def _heuristic_score(payload: dict) -> float:
@@ -23,37 +26,20 @@ def _heuristic_score(payload: dict) -> float:
 
 def run_policy_simulation(n_events: int = 1200) -> dict:
     policy = load_policy()
-    state = init_policy_state()
     df = generate_synthetic_events(n_samples=n_events, random_state=77)
     df["message_text"] = df["message_text"].map(normalize_text)
+    df["event_ts"] = 1_700_000_000 + 5 * np.arange(len(df))
+    scores = np.array([_heuristic_score(row) for row in df.to_dict(orient="records")])
 
-    decisions = {"allow": 0, "review": 0, "block": 0}
-    trigger_counts: dict[str, int] = {}
-    review_true_fraud = 0
-    block_true_fraud = 0
-
-    ts = 1_700_000_000
-    for row in df.to_dict(orient="records"):
-        row["event_ts"] = ts
-        ts += 5
-        score = _heuristic_score(row)
-        decision, _, triggers = decide(score, row, policy, state=state)
-        decisions[decision] += 1
-        for trigger in triggers:
-            trigger_counts[trigger] = trigger_counts.get(trigger, 0) + 1
-
-        if int(row["is_fraud"]) == 1 and decision == "review":
-            review_true_fraud += 1
-        if int(row["is_fraud"]) == 1 and decision == "block":
-            block_true_fraud += 1
-
+    variant = {"name": "current", "params": {}, "policy": policy}
+    result = replay_policies(df, scores, [variant])[0]
     report = {
         "generated_at_epoch": int(time.time()),
         "n_events": n_events,
-        "decisions": decisions,
-        "review_precision_proxy": round(review_true_fraud / max(decisions["review"], 1), 4),
-        "block_precision_proxy": round(block_true_fraud / max(decisions["block"], 1), 4),
-        "top_policy_triggers": sorted(trigger_counts.items(), key=lambda x: x[1], reverse=True)[:10],
+        "decisions": result["decisions"],
+        "review_precision_proxy": result["review_precision_proxy"],
+        "block_precision_proxy": result["block_precision_proxy"],
+        "top_policy_triggers": result["top_policy_triggers"],
     }
 
     out_path = Path("reports/policy_simulation.json")
@@ -1,9 +1,30 @@
-from .graph import build_graph_stats, enrich_with_graph_features, graph_features_for_payload
-from .risk_rules import extract_reason_flags
+from .graph import (
+    GraphStatsAccumulator,
+    build_graph_stats,
+    enrich_with_graph_features,
+    graph_features_for_payload,
+)
+from .khop import KHOP_FEATURES, KHopIndexAccumulator, build_khop_index
+from .near_duplicate import CAMPAIGN_FEATURES, NearDuplicateIndex
+from .online_graph import LIVE_GRAPH_FEATURES, OnlineEntityGraph
+from .risk_rules import extract_reason_flags, reason_flag_masks
+from .velocity import EntityFeatureStore, replay_velocity_features, velocity_feature_names
 
 __all__ = [
     "extract_reason_flags",
+    "reason_flag_masks",
     "build_graph_stats",
     "enrich_with_graph_features",
     "graph_features_for_payload",
+    "GraphStatsAccumulator",
+    "KHOP_FEATURES",
+    "KHopIndexAccumulator",
+    "build_khop_index",
+    "LIVE_GRAPH_FEATURES",
+    "OnlineEntityGraph",
+    "CAMPAIGN_FEATURES",
+    "NearDuplicateIndex",
+    "EntityFeatureStore",
+    "replay_velocity_features",
+    "velocity_feature_names",
 ]
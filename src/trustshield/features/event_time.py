@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+import time
+from typing import Any
+
+DEFAULT_MAX_CLOCK_SKEW_SECONDS = 300.0
+
+
+def wall_time() -> float:
+    return time.time()
+
+
+def event_time(
+    raw_ts: Any, max_skew_seconds: float | None = DEFAULT_MAX_CLOCK_SKEW_SECONDS
+) -> float:
+    # The event's time for online stores, whose clocks never move backwards: wall time when
+    # missing, and never more than `max_skew_seconds` ahead of the wall clock. `event_ts` comes
+    # from the client, and one far-future value would otherwise freeze every window.
+    now = wall_time()
+    if raw_ts is None or raw_ts != raw_ts:
+        return now
+    event_ts = float(raw_ts)
+    if max_skew_seconds is not None:
+        event_ts = min(event_ts, now + float(max_skew_seconds))
+    return event_ts
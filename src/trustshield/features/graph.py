@@ -4,11 +4,14 @@ from typing import Any
 
 import numpy as np
 import pandas as pd
-try:
-    import networkx as nx
-except Exception:
-    nx = None
 
+from trustshield.features.khop import (
+    KHOP_FEATURES,
+    KHopIndexAccumulator,
+    build_khop_index,
+    khop_features_for_frame,
+    khop_features_for_payload,
+)
 
 ENTITY_COLS = ["device_id", "ip_id", "card_id"]
 NODE_COLS = ["user_id", "device_id", "ip_id", "card_id", "merchant_id"]
@@ -18,6 +21,21 @@ def _node_name(col: str, value: str) -> str:
     return f"{col}:{value}"
 
 
+def _observed_value_counts(series: pd.Series) -> pd.Series:
+    # Categorical columns report every category, including ones absent from this slice.
+    counts = series.value_counts()
+    return counts[counts > 0]
+
+
+def _map_entity(series: pd.Series, mapping: dict[str, float], default: float) -> pd.Series:
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # Map each dictionary entry once, then gather by code.
+        mapped = series.cat.categories.map(lambda value: mapping.get(value, default))
+        values = np.append(np.asarray(mapped, dtype=float), default)
+        return pd.Series(values[series.cat.codes.to_numpy()], index=series.index)
+    return series.map(mapping).fillna(default)
+
+
 def build_graph_stats(train_df: pd.DataFrame, target_col: str = "is_fraud") -> dict[str, Any]:
     stats: dict[str, Any] = {
         "entity_degree": {},
@@ -28,6 +46,11 @@ def build_graph_stats(train_df: pd.DataFrame, target_col: str = "is_fraud") -> d
 
     node_pagerank: dict[str, float] = {}
     node_component_size: dict[str, float] = {}
+    try:
+        # Training-only dependency; the serving path just reads the resulting maps.
+        import networkx as nx
+    except Exception:
+        nx = None
     if nx is not None:
         graph = nx.Graph()
         for row in train_df[NODE_COLS].to_dict(orient="records"):
@@ -43,8 +66,8 @@ def build_graph_stats(train_df: pd.DataFrame, target_col: str = "is_fraud") -> d
                     node_component_size[node] = comp_size
 
     for col in ENTITY_COLS:
-        degree_map = train_df[col].value_counts().astype(float).to_dict()
-        fraud_map = train_df.groupby(col)[target_col].mean().astype(float).to_dict()
+        degree_map = _observed_value_counts(train_df[col]).astype(float).to_dict()
+        fraud_map = train_df.groupby(col, observed=True)[target_col].mean().astype(float).to_dict()
         stats["entity_degree"][col] = degree_map
         stats["entity_fraud_rate"][col] = fraud_map
         if node_pagerank:
@@ -63,7 +86,7 @@ def build_graph_stats(train_df: pd.DataFrame, target_col: str = "is_fraud") -> d
             stats["entity_component_size"][col] = {value: 1.0 for value in degree_map.keys()}
 
     stats["global_degree_mean"] = float(
-        np.mean([train_df[col].value_counts().mean() for col in ENTITY_COLS])
+        np.mean([_observed_value_counts(train_df[col]).mean() for col in ENTITY_COLS])
     )
     stats["global_fraud_rate"] = float(train_df[target_col].mean())
     stats["global_pagerank_mean"] = float(
@@ -76,10 +99,165 @@ def build_graph_stats(train_df: pd.DataFrame, target_col: str = "is_fraud") -> d
             [np.mean(list(stats["entity_component_size"][col].values()) or [1.0]) for col in ENTITY_COLS]
         )
     )
+    stats["khop"] = build_khop_index(train_df, target_col=target_col)
     return stats
 
 
-def enrich_with_graph_features(df: pd.DataFrame, stats: dict[str, Any]) -> pd.DataFrame:
+class GraphStatsAccumulator:
+    """Incremental `build_graph_stats` for chunked training data.
+
+    State grows with the number of distinct entities, never with the number of rows.
+    PageRank uses the degree-share approximation of the networkx-free path.
+    """
+
+    def __init__(self, target_col: str = "is_fraud") -> None:
+        self.target_col = target_col
+        self.entity_count: dict[str, dict[str, float]] = {col: {} for col in ENTITY_COLS}
+        self.entity_fraud: dict[str, dict[str, float]] = {col: {} for col in ENTITY_COLS}
+        self.node_ids: dict[str, int] = {}
+        self.parent: list[int] = []
+        self.rows_seen = 0
+        self.fraud_seen = 0.0
+        self.khop = KHopIndexAccumulator(target_col=target_col)
+
+    def _find(self, node: int) -> int:
+        parent = self.parent
+        root = node
+        while parent[root] != root:
+            root = parent[root]
+        while parent[node] != root:
+            parent[node], node = root, parent[node]
+        return root
+
+    def _union_chunk_components(self, chunk: pd.DataFrame) -> None:
+        # Components are solved per chunk with scipy, then merged into the global union-find
+        # once per distinct node instead of once per edge. scipy is imported here because
+        # serving imports this module for payload lookups only.
+        from scipy.sparse import coo_matrix
+        from scipy.sparse.csgraph import connected_components
+
+        codes = []
+        names: list[str] = []
+        for col in NODE_COLS:
+            col_codes, uniques = pd.factorize(chunk[col].astype(str), sort=False)
+            codes.append(col_codes + len(names))
+            names.extend(_node_name(col, str(value)) for value in uniques)
+        if not names:
+            return
+        src = np.concatenate([codes[0]] * (len(NODE_COLS) - 1))
+        dst = np.concatenate(codes[1:])
+        n_nodes = len(names)
+        adjacency = coo_matrix(
+            (np.ones(len(src), dtype=np.int8), (src, dst)), shape=(n_nodes, n_nodes)
+        )
+        _, labels = connected_components(adjacency, directed=False)
+
+        global_ids = np.empty(len(names), dtype=np.int64)
+        for local_id, name in enumerate(names):
+            node = self.node_ids.get(name)
+            if node is None:
+                node = len(self.parent)
+                self.node_ids[name] = node
+                self.parent.append(node)
+            global_ids[local_id] = node
+
+        label_roots: dict[int, int] = {}
+        for local_id, label in enumerate(labels.tolist()):
+            root = self._find(int(global_ids[local_id]))
+            anchor = label_roots.get(label)
+            if anchor is None:
+                label_roots[label] = root
+                continue
+            anchor = self._find(anchor)
+            if anchor != root:
+                self.parent[root] = anchor
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        if chunk.empty:
+            return
+        target = chunk[self.target_col].astype(float)
+        for col in ENTITY_COLS:
+            grouped = target.groupby(chunk[col].astype(str), sort=False).agg(["size", "sum"])
+            counts = self.entity_count[col]
+            frauds = self.entity_fraud[col]
+            for value, size, fraud in zip(grouped.index, grouped["size"], grouped["sum"]):
+                counts[value] = counts.get(value, 0.0) + float(size)
+                frauds[value] = frauds.get(value, 0.0) + float(fraud)
+        self._union_chunk_components(chunk)
+        self.khop.update(chunk)
+        self.rows_seen += len(chunk)
+        self.fraud_seen += float(target.sum())
+
+    def finalize(self) -> dict[str, Any]:
+        component_size: dict[int, float] = {}
+        roots = [self._find(node) for node in range(len(self.parent))]
+        for root in roots:
+            component_size[root] = component_size.get(root, 0.0) + 1.0
+
+        stats: dict[str, Any] = {
+            "entity_degree": {},
+            "entity_fraud_rate": {},
+            "entity_pagerank": {},
+            "entity_component_size": {},
+        }
+        for col in ENTITY_COLS:
+            degree_map = dict(self.entity_count[col])
+            fraud_sums = self.entity_fraud[col]
+            total_degree = max(float(sum(degree_map.values())), 1.0)
+            stats["entity_degree"][col] = degree_map
+            stats["entity_fraud_rate"][col] = {
+                value: fraud_sums[value] / count for value, count in degree_map.items()
+            }
+            stats["entity_pagerank"][col] = {
+                value: count / total_degree for value, count in degree_map.items()
+            }
+            stats["entity_component_size"][col] = {
+                value: component_size[roots[self.node_ids[_node_name(col, value)]]]
+                for value in degree_map.keys()
+            }
+
+        stats["global_degree_mean"] = float(
+            np.mean(
+                [
+                    np.mean(list(stats["entity_degree"][col].values()) or [0.0])
+                    for col in ENTITY_COLS
+                ]
+            )
+        )
+        stats["global_fraud_rate"] = float(self.fraud_seen / max(self.rows_seen, 1))
+        stats["global_pagerank_mean"] = float(
+            np.mean(
+                [
+                    np.mean(list(stats["entity_pagerank"][col].values()) or [0.0])
+                    for col in ENTITY_COLS
+                ]
+            )
+        )
+        stats["global_component_size_mean"] = float(
+            np.mean(
+                [
+                    np.mean(list(stats["entity_component_size"][col].values()) or [1.0])
+                    for col in ENTITY_COLS
+                ]
+            )
+        )
+        stats["khop"] = self.khop.finalize()
+        return stats
+
+
+def _unseen_live(
+    series: pd.Series, mapping: dict[str, float], live_degree: np.ndarray
+) -> np.ndarray:
+    # Entities missing from the training graph that the live graph has seen; omitted fields
+    # (placeholder ids) are never ingested live and keep the global means.
+    return series.map(mapping).isna().to_numpy(dtype=bool) & (live_degree > 0)
+
+
+def enrich_with_graph_features(
+    df: pd.DataFrame, stats: dict[str, Any], live: pd.DataFrame | None = None
+) -> pd.DataFrame:
+    # `live` holds OnlineEntityGraph features row-aligned with `df`; when given, entities
+    # unseen in training take their live degree and component size instead of global means.
     out = df.copy()
 
     for col in ENTITY_COLS:
@@ -87,12 +265,28 @@ def enrich_with_graph_features(df: pd.DataFrame, stats: dict[str, Any]) -> pd.Da
         fraud_map = stats["entity_fraud_rate"][col]
         pagerank_map = stats["entity_pagerank"][col]
         component_map = stats["entity_component_size"][col]
-        out[f"graph_{col}_degree"] = out[col].map(degree_map).fillna(stats["global_degree_mean"])
-        out[f"graph_{col}_fraud_rate"] = out[col].map(fraud_map).fillna(stats["global_fraud_rate"])
-        out[f"graph_{col}_pagerank"] = out[col].map(pagerank_map).fillna(stats["global_pagerank_mean"])
-        out[f"graph_{col}_component_size"] = out[col].map(component_map).fillna(
-            stats["global_component_size_mean"]
+        out[f"graph_{col}_degree"] = _map_entity(out[col], degree_map, stats["global_degree_mean"])
+        out[f"graph_{col}_fraud_rate"] = _map_entity(
+            out[col], fraud_map, stats["global_fraud_rate"]
+        )
+        out[f"graph_{col}_pagerank"] = _map_entity(
+            out[col], pagerank_map, stats["global_pagerank_mean"]
+        )
+        out[f"graph_{col}_component_size"] = _map_entity(
+            out[col], component_map, stats["global_component_size_mean"]
         )
+        if live is not None:
+            live_degree = live[f"live_{col}_degree"].to_numpy(dtype=float)
+            unseen = _unseen_live(out[col], degree_map, live_degree)
+            out[f"graph_{col}_degree"] = np.where(
+                unseen, live_degree, out[f"graph_{col}_degree"].to_numpy(dtype=float)
+            )
+            unseen = _unseen_live(out[col], component_map, live_degree)
+            out[f"graph_{col}_component_size"] = np.where(
+                unseen,
+                live["live_component_size"].to_numpy(dtype=float),
+                out[f"graph_{col}_component_size"].to_numpy(dtype=float),
+            )
 
     out["graph_max_entity_fraud_rate"] = out[
         [f"graph_{col}_fraud_rate" for col in ENTITY_COLS]
@@ -102,10 +296,21 @@ def enrich_with_graph_features(df: pd.DataFrame, stats: dict[str, Any]) -> pd.Da
     out["graph_min_component_size"] = out[
         [f"graph_{col}_component_size" for col in ENTITY_COLS]
     ].min(axis=1)
+    # Bundles trained before the k-hop index have no "khop" entry and no such model inputs.
+    if "khop" in stats:
+        khop_features = khop_features_for_frame(out, stats["khop"])
+        for name, values in khop_features.items():
+            out[name] = values
+        for name in KHOP_FEATURES:
+            out[f"graph_max_{name}"] = np.max(
+                [khop_features[f"graph_{col}_{name}"] for col in stats["khop"]["entities"]], axis=0
+            )
     return out
 
 
-def graph_features_for_payload(payload: dict[str, Any], stats: dict[str, Any]) -> dict[str, float]:
+def graph_features_for_payload(
+    payload: dict[str, Any], stats: dict[str, Any], live: dict[str, float] | None = None
+) -> dict[str, float]:
     features: dict[str, float] = {}
     for col in ENTITY_COLS:
         value = str(payload.get(col, f"unknown_{col}"))
@@ -121,6 +326,12 @@ def graph_features_for_payload(payload: dict[str, Any], stats: dict[str, Any]) -
         features[f"graph_{col}_component_size"] = float(
             component_map.get(value, stats["global_component_size_mean"])
         )
+        live_degree = (live or {}).get(f"live_{col}_degree", 0.0)
+        if live_degree > 0:
+            if value not in degree_map:
+                features[f"graph_{col}_degree"] = float(live_degree)
+            if value not in component_map:
+                features[f"graph_{col}_component_size"] = float(live["live_component_size"])
 
     features["graph_max_entity_fraud_rate"] = float(
         max(features[f"graph_{col}_fraud_rate"] for col in ENTITY_COLS)
@@ -134,4 +345,11 @@ def graph_features_for_payload(payload: dict[str, Any], stats: dict[str, Any]) -
     features["graph_min_component_size"] = float(
         min(features[f"graph_{col}_component_size"] for col in ENTITY_COLS)
     )
+    if "khop" in stats:
+        khop_features = khop_features_for_payload(payload, stats["khop"])
+        features.update(khop_features)
+        for name in KHOP_FEATURES:
+            features[f"graph_max_{name}"] = max(
+                khop_features[f"graph_{col}_{name}"] for col in stats["khop"]["entities"]
+            )
     return features
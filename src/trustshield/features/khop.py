@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+# Merchants are left out: a popular merchant puts every card within two hops of every other.
+KHOP_LINK_COLS = ["user_id", "device_id", "ip_id", "card_id"]
+KHOP_FEATURES = ["hop1_fraud_rate", "hop2_fraud_rate", "label_prop_risk"]
+DEFAULT_PRIOR_WEIGHT = 5.0
+DEFAULT_PROPAGATION_ALPHA = 0.5
+DEFAULT_PROPAGATION_ITERATIONS = 10
+
+
+class KHopIndexAccumulator:
+    """Builds the k-hop risk index from training chunks.
+
+    Rows are kept as int32 entity codes plus the label, so state grows by a few bytes per row
+    and by one dict entry per distinct entity. All graph work happens in `finalize`, with
+    sparse matrix-vector products only, so no 2-hop adjacency is ever materialized.
+    """
+
+    def __init__(
+        self,
+        target_col: str = "is_fraud",
+        link_columns: list[str] | None = None,
+        prior_weight: float = DEFAULT_PRIOR_WEIGHT,
+        alpha: float = DEFAULT_PROPAGATION_ALPHA,
+        iterations: int = DEFAULT_PROPAGATION_ITERATIONS,
+    ) -> None:
+        self.target_col = target_col
+        self.link_columns = list(link_columns or KHOP_LINK_COLS)
+        self.prior_weight = float(prior_weight)
+        self.alpha = float(alpha)
+        self.iterations = int(iterations)
+        self.entity_ids: dict[str, dict[str, int]] = {col: {} for col in self.link_columns}
+        self.codes: dict[str, list[np.ndarray]] = {col: [] for col in self.link_columns}
+        self.labels: list[np.ndarray] = []
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        if chunk.empty:
+            return
+        for col in self.link_columns:
+            ids = self.entity_ids[col]
+            local_codes, uniques = pd.factorize(chunk[col].astype(str), sort=False)
+            # One dict operation per distinct value in the chunk, not per row.
+            global_codes = np.array(
+                [ids.setdefault(value, len(ids)) for value in uniques.tolist()], dtype=np.int32
+            )
+            self.codes[col].append(global_codes[local_codes])
+        self.labels.append(chunk[self.target_col].to_numpy(dtype=np.float32))
+
+    def finalize(self) -> dict[str, Any]:
+        # scipy is imported here because serving imports this module for lookups only.
+        from scipy.sparse import csr_matrix
+
+        if not self.labels:
+            return {"features": list(KHOP_FEATURES), "default": 0.0, "entities": {}}
+        y = np.concatenate(self.labels).astype(np.float64)
+        n_rows = len(y)
+        offsets = np.cumsum([0] + [len(self.entity_ids[col]) for col in self.link_columns])
+        n_nodes = int(offsets[-1])
+        # Event x entity incidence; entity co-occurrence is B^T B.
+        cols = np.concatenate(
+            [
+                np.concatenate(self.codes[col]) + offsets[i]
+                for i, col in enumerate(self.link_columns)
+            ]
+        )
+        rows = np.tile(np.arange(n_rows, dtype=np.int64), len(self.link_columns))
+        ones = np.ones(len(cols), dtype=np.float64)
+        # Both orientations are built as CSR; transposing one would convert it on every product.
+        incidence = csr_matrix((ones, (rows, cols)), shape=(n_rows, n_nodes))
+        incidence_t = csr_matrix((ones, (cols, rows)), shape=(n_nodes, n_rows))
+        del rows, cols, ones
+        events = np.asarray(incidence_t.sum(axis=1)).ravel()
+        frauds = incidence_t @ y
+        co_occurrence = incidence_t @ incidence
+        del incidence
+        co_occurrence.setdiag(0)
+        co_occurrence.eliminate_zeros()
+        adjacency = co_occurrence.copy()
+        adjacency.data[:] = 1.0
+        degree = np.asarray(adjacency.sum(axis=1)).ravel()
+
+        prior = float(y.mean())
+        m = self.prior_weight
+
+        def _smoothed(fraud: np.ndarray, count: np.ndarray) -> np.ndarray:
+            return (np.maximum(fraud, 0.0) + m * prior) / (np.maximum(count, 0.0) + m)
+
+        # 1 hop: events of the entities sharing an event with this one, minus the events they
+        # share with it, so an entity's own labels do not leak into its neighbourhood rate.
+        links = len(self.link_columns) - 1
+        own_events = events * links
+        own_frauds = frauds * links
+        hop1_fraud = adjacency @ frauds
+        hop1_events = adjacency @ events
+        hop1 = _smoothed(hop1_fraud - own_frauds, hop1_events - own_events)
+        # 2 hops: walk-weighted over two steps, dropping the walks that return to the entity.
+        hop2 = _smoothed(
+            adjacency @ hop1_fraud - degree * frauds, adjacency @ hop1_events - degree * events
+        )
+
+        # Label propagation: each entity's smoothed fraud rate diffused over the
+        # row-normalized adjacency, r <- alpha * P r + (1 - alpha) * r0.
+        seed = _smoothed(frauds, events)
+        inv_degree = np.divide(1.0, degree, out=np.zeros_like(degree), where=degree > 0)
+        risk = seed.copy()
+        for _ in range(self.iterations):
+            spread = inv_degree * (adjacency @ risk)
+            risk = np.where(degree > 0, self.alpha * spread + (1.0 - self.alpha) * seed, seed)
+
+        values = np.column_stack([hop1, hop2, risk]).astype(np.float32)
+        entities = {}
+        # Users are the hubs that link entities; only the entities are looked up at serving.
+        for i, col in enumerate(self.link_columns):
+            if col == "user_id":
+                continue
+            # Ids were assigned in first-seen order, so the dict order is the row order.
+            entities[col] = {
+                "index": pd.Index(list(self.entity_ids[col]), dtype=object),
+                "values": values[offsets[i] : offsets[i + 1]],
+            }
+        return {"features": list(KHOP_FEATURES), "default": prior, "entities": entities}
+
+
+def build_khop_index(
+    train_df: pd.DataFrame, target_col: str = "is_fraud", **kwargs: Any
+) -> dict[str, Any]:
+    accumulator = KHopIndexAccumulator(target_col=target_col, **kwargs)
+    accumulator.update(train_df)
+    return accumulator.finalize()
+
+
+def _index_positions(series: pd.Series, index: pd.Index) -> np.ndarray:
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # Look up each dictionary entry once, then gather by code.
+        positions = np.append(index.get_indexer(series.cat.categories.astype(str)), -1)
+        return positions[series.cat.codes.to_numpy()]
+    return index.get_indexer(series.astype(str))
+
+
+def khop_features_for_frame(df: pd.DataFrame, khop: dict[str, Any]) -> dict[str, np.ndarray]:
+    default = float(khop["default"])
+    features: dict[str, np.ndarray] = {}
+    for col, entry in khop["entities"].items():
+        positions = _index_positions(df[col], entry["index"])
+        values = np.full((len(df), len(khop["features"])), default, dtype=float)
+        known = positions >= 0
+        values[known] = entry["values"][positions[known]]
+        for j, name in enumerate(khop["features"]):
+            features[f"graph_{col}_{name}"] = values[:, j]
+    return features
+
+
+def khop_features_for_payload(payload: dict[str, Any], khop: dict[str, Any]) -> dict[str, float]:
+    default = float(khop["default"])
+    features: dict[str, float] = {}
+    for col, entry in khop["entities"].items():
+        value = str(payload.get(col, f"unknown_{col}"))
+        try:
+            row = entry["values"][entry["index"].get_loc(value)].tolist()
+        except KeyError:
+            row = [default] * len(khop["features"])
+        for name, feature in zip(khop["features"], row):
+            features[f"graph_{col}_{name}"] = feature
+    return features
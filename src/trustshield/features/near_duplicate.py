@@ -0,0 +1,259 @@
+from __future__ import annotations
+
+import math
+import threading
+import zlib
+from collections import OrderedDict, deque
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from trustshield.features.event_time import DEFAULT_MAX_CLOCK_SKEW_SECONDS, event_time
+from trustshield.preprocessing.text import normalize_text
+
+DEFAULT_WINDOW_SECONDS = 3_600.0
+DEFAULT_RECENT_SECONDS = 300.0
+DEFAULT_BUCKETS = 12
+DEFAULT_BANDS = 8
+DEFAULT_ROWS_PER_BAND = 4
+DEFAULT_SHINGLE_TOKENS = 2
+DEFAULT_MIN_TOKENS = 4
+DEFAULT_MAX_CLUSTERS = 200_000
+DEFAULT_DISTINCT_BITS = 256
+CAMPAIGN_FEATURES = [
+    "campaign_cluster_messages",
+    "campaign_cluster_recent_messages",
+    "campaign_cluster_users",
+    "campaign_cluster_cards",
+]
+# Fixed so signatures, and so clusters, do not depend on the process.
+_PERMUTATION_SEED = 20_240_917
+_SHINGLE_BASE = np.uint64(1_000_003)
+
+
+class NearDuplicateIndex:
+    """Streaming clusters of near-duplicate messages, for scam campaigns.
+
+    Each message is reduced to word shingles of its normalized text and a MinHash signature of
+    `bands * rows_per_band` values. Signatures are split into bands, and an LSH table per band
+    maps band values to a cluster: a message joins the cluster it shares the most bands with,
+    so two messages land together with probability 1 - (1 - J**rows)**bands at Jaccard
+    similarity J (even odds at about 0.55 with the defaults). Clusters never merge; a lightly
+    mutated template keeps joining the cluster its earlier variants created.
+
+    Per cluster, a ring of `buckets` time buckets over `window_seconds` keeps message counts
+    and linear-counting bitmaps of senders and cards, as in EntityFeatureStore. Band entries
+    and clusters idle for longer than the window are evicted, and at most `max_clusters` are
+    kept, so memory follows traffic in the window rather than all traffic. Event times are
+    capped at `max_clock_skew_seconds` ahead of the wall clock.
+    """
+
+    def __init__(
+        self,
+        window_seconds: float = DEFAULT_WINDOW_SECONDS,
+        recent_seconds: float = DEFAULT_RECENT_SECONDS,
+        buckets: int = DEFAULT_BUCKETS,
+        bands: int = DEFAULT_BANDS,
+        rows_per_band: int = DEFAULT_ROWS_PER_BAND,
+        shingle_tokens: int = DEFAULT_SHINGLE_TOKENS,
+        min_tokens: int = DEFAULT_MIN_TOKENS,
+        max_clusters: int = DEFAULT_MAX_CLUSTERS,
+        distinct_bits: int = DEFAULT_DISTINCT_BITS,
+        max_clock_skew_seconds: float | None = DEFAULT_MAX_CLOCK_SKEW_SECONDS,
+    ) -> None:
+        self.window_seconds = float(window_seconds)
+        self.recent_seconds = float(recent_seconds)
+        self.buckets = int(buckets)
+        self.bands = int(bands)
+        self.rows_per_band = int(rows_per_band)
+        self.shingle_tokens = int(shingle_tokens)
+        self.min_tokens = int(min_tokens)
+        self.max_clusters = int(max_clusters)
+        self.distinct_bits = int(distinct_bits)
+        self.max_clock_skew_seconds = max_clock_skew_seconds
+        self._width = self.window_seconds / self.buckets
+        # Buckets counted as recent: the one being filled plus enough before it to span
+        # `recent_seconds`.
+        self._recent_buckets = max(1, math.ceil(self.recent_seconds / self._width))
+        # Multiply-shift hashing: one odd 64-bit multiplier per hash, top 32 bits of a * x.
+        rng = np.random.default_rng(_PERMUTATION_SEED)
+        n_hashes = self.bands * self.rows_per_band
+        self._mul = rng.integers(0, 1 << 63, n_hashes, dtype=np.uint64)[:, None] * 2 + 1
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._clock = 0.0
+            self._tables: list[dict[bytes, list[Any]]] = [{} for _ in range(self.bands)]
+            # One (time, band, key) per band entry, about oldest first, for time eviction.
+            self._band_log: deque[tuple[float, int, bytes]] = deque()
+            # Cluster id -> [last message time, bucket ring], least recently seen first.
+            self._clusters: OrderedDict[int, list[Any]] = OrderedDict()
+            self._next_cluster = 0
+            self.messages_seen = 0
+            self.messages_skipped = 0
+            self.evicted_clusters = 0
+
+    def band_keys(self, text: Any) -> list[bytes] | None:
+        # LSH band keys of a message; None when it is too short to tell templates apart.
+        if not isinstance(text, str):
+            return None
+        tokens = np.fromiter(
+            map(zlib.crc32, normalize_text(text).encode("utf-8").split()), dtype=np.uint64
+        )
+        if len(tokens) < self.min_tokens:
+            return None
+        # Shingle hashes as polynomials over the token hashes; products wrap modulo 2**64.
+        n_shingles = len(tokens) - self.shingle_tokens + 1
+        shingles = tokens[:n_shingles]
+        for offset in range(1, self.shingle_tokens):
+            shingles = shingles * _SHINGLE_BASE + tokens[offset : offset + n_shingles]
+        # The top bits are monotone in the product, so the shift can follow the min.
+        signature = (self._mul * shingles).min(axis=1) >> np.uint64(32)
+        raw = signature.astype("<u4").tobytes()
+        step = 4 * self.rows_per_band
+        return [raw[i : i + step] for i in range(0, len(raw), step)]
+
+    def _distinct_bit(self, value: Any) -> int:
+        if value is None or str(value).startswith("unknown_"):
+            return 0
+        return 1 << (zlib.crc32(str(value).encode("utf-8")) % self.distinct_bits)
+
+    def _estimate(self, bitmap: int) -> float:
+        zeros = self.distinct_bits - bitmap.bit_count()
+        if zeros == self.distinct_bits:
+            return 0.0
+        if zeros == 0:
+            return self.distinct_bits * math.log(self.distinct_bits)
+        return -self.distinct_bits * math.log(zeros / self.distinct_bits)
+
+    def update(self, payload: dict[str, Any]) -> dict[str, float]:
+        # Clusters the message, then returns features of its cluster including it. Messages
+        # too short to fingerprint are not clustered; their features stay at zero.
+        return self._update(payload, self.band_keys(payload.get("message_text")))
+
+    def update_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        # Rows are clustered in frame order, so each sees the rows before it. Scam waves repeat
+        # messages verbatim, so each distinct text is fingerprinted once.
+        if "message_text" in df.columns:
+            codes, uniques = pd.factorize(df["message_text"])
+            keys = [self.band_keys(text) for text in uniques.tolist()]
+            keys.append(None)
+            row_keys = [keys[code] for code in codes]
+        else:
+            row_keys = [None] * len(df)
+        columns = [col for col in ("user_id", "card_id", "event_ts") if col in df.columns]
+        rows = [
+            self._update(row, band_keys)
+            for row, band_keys in zip(df[columns].to_dict(orient="records"), row_keys)
+        ]
+        return pd.DataFrame(rows, columns=CAMPAIGN_FEATURES, index=df.index, dtype=float)
+
+    def _update(self, payload: dict[str, Any], band_keys: list[bytes] | None) -> dict[str, float]:
+        event_ts = event_time(payload.get("event_ts"), self.max_clock_skew_seconds)
+        user_bit = self._distinct_bit(payload.get("user_id"))
+        card_bit = self._distinct_bit(payload.get("card_id"))
+        with self._lock:
+            # Out-of-order timestamps never move the clock backwards.
+            self._clock = now = max(self._clock, event_ts)
+            self.messages_seen += 1
+            self._expire(now)
+            if band_keys is None:
+                self.messages_skipped += 1
+                return dict.fromkeys(CAMPAIGN_FEATURES, 0.0)
+            cluster_id, state = self._assign(band_keys, now)
+            for band, key in enumerate(band_keys):
+                entry = self._tables[band].get(key)
+                if entry is None:
+                    self._tables[band][key] = [cluster_id, now]
+                    self._band_log.append((now, band, key))
+                else:
+                    entry[0], entry[1] = cluster_id, now
+            return self._count(state, now, user_bit, card_bit)
+
+    def _expire(self, now: float) -> None:
+        horizon = now - self.window_seconds
+        log = self._band_log
+        while log and log[0][0] < horizon:
+            _, band, key = log.popleft()
+            entry = self._tables[band][key]
+            if entry[1] < horizon:
+                del self._tables[band][key]
+            else:
+                # Written again since: back in the queue at its last write. The queue is then
+                # only roughly in time order, which can delay an eviction but never skip one.
+                log.append((entry[1], band, key))
+        clusters = self._clusters
+        while clusters:
+            oldest = next(iter(clusters.values()))
+            if oldest[0] >= horizon and len(clusters) <= self.max_clusters:
+                break
+            clusters.popitem(last=False)
+            self.evicted_clusters += 1
+
+    def _assign(self, band_keys: list[bytes], now: float) -> tuple[int, list[Any]]:
+        votes: dict[int, int] = {}
+        for band, key in enumerate(band_keys):
+            entry = self._tables[band].get(key)
+            # Entries of evicted clusters are dropped lazily, here or by `_expire`.
+            if entry is not None and entry[0] in self._clusters:
+                votes[entry[0]] = votes.get(entry[0], 0) + 1
+        if votes:
+            cluster_id = max(votes, key=votes.__getitem__)
+            state = self._clusters[cluster_id]
+            state[0] = now
+            self._clusters.move_to_end(cluster_id)
+            return cluster_id, state
+        cluster_id = self._next_cluster
+        self._next_cluster += 1
+        state = [now, deque()]
+        self._clusters[cluster_id] = state
+        if len(self._clusters) > self.max_clusters:
+            self._clusters.popitem(last=False)
+            self.evicted_clusters += 1
+        return cluster_id, state
+
+    def _count(
+        self, state: list[Any], now: float, user_bit: int, card_bit: int
+    ) -> dict[str, float]:
+        ring = state[1]
+        bucket = int(now // self._width)
+        if ring and ring[-1][0] == bucket:
+            current = ring[-1]
+        else:
+            # [bucket, messages, sender bitmap, card bitmap]
+            current = [bucket, 0, 0, 0]
+            ring.append(current)
+            while ring[0][0] <= bucket - self.buckets:
+                ring.popleft()
+        current[1] += 1
+        current[2] |= user_bit
+        current[3] |= card_bit
+        messages = recent = users = cards = 0
+        for ring_bucket in ring:
+            messages += ring_bucket[1]
+            if ring_bucket[0] > bucket - self._recent_buckets:
+                recent += ring_bucket[1]
+            users |= ring_bucket[2]
+            cards |= ring_bucket[3]
+        return {
+            "campaign_cluster_messages": float(messages),
+            "campaign_cluster_recent_messages": float(recent),
+            "campaign_cluster_users": self._estimate(users),
+            "campaign_cluster_cards": self._estimate(cards),
+        }
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "messages_seen": self.messages_seen,
+                "messages_skipped": self.messages_skipped,
+                "clusters": len(self._clusters),
+                "clusters_created": self._next_cluster,
+                "evicted_clusters": self.evicted_clusters,
+                "band_entries": sum(len(table) for table in self._tables),
+                "window_seconds": self.window_seconds,
+                "max_clusters": self.max_clusters,
+            }
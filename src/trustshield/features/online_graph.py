@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import threading
+from typing import Any
+
+import pandas as pd
+
+from trustshield.features.event_time import DEFAULT_MAX_CLOCK_SKEW_SECONDS, event_time
+from trustshield.features.graph import ENTITY_COLS
+
+DEFAULT_WINDOW_SECONDS = 3_600.0
+DEFAULT_MAX_NODES = 1_000_000
+DEFAULT_MAX_HUB_DEGREE = 200
+# Merchants are left out: every shopper of a popular merchant would land in one component.
+LIVE_LINK_COLS = ["user_id", "device_id", "ip_id", "card_id"]
+LIVE_GRAPH_FEATURES = [
+    "live_component_size",
+    "live_component_users",
+    "live_component_cards",
+    *(f"live_{col}_degree" for col in ENTITY_COLS),
+]
+
+
+class _Generation:
+    # Union-find over interned node ids, with per-root node counts by entity type.
+    def __init__(self, started_at: float, n_kinds: int) -> None:
+        self.started_at = started_at
+        self.ids: dict[str, int] = {}
+        self.parent: list[int] = []
+        self.degree: list[int] = []
+        self.kind_counts: list[list[int]] = [[] for _ in range(n_kinds)]
+
+    def node(self, key: str, kind: int) -> int:
+        node = self.ids.get(key)
+        if node is None:
+            node = len(self.parent)
+            self.ids[key] = node
+            self.parent.append(node)
+            self.degree.append(0)
+            for i, counts in enumerate(self.kind_counts):
+                counts.append(1 if i == kind else 0)
+        return node
+
+    def find(self, node: int) -> int:
+        parent = self.parent
+        root = node
+        while parent[root] != root:
+            root = parent[root]
+        while parent[node] != root:
+            parent[node], node = root, parent[node]
+        return root
+
+    def union(self, a: int, b: int) -> int:
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return root_a
+        size_a = sum(counts[root_a] for counts in self.kind_counts)
+        size_b = sum(counts[root_b] for counts in self.kind_counts)
+        if size_a < size_b:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        for counts in self.kind_counts:
+            counts[root_a] += counts[root_b]
+        return root_a
+
+
+class OnlineEntityGraph:
+    """Live entity graph over scored events, with incremental connected components.
+
+    Each event links its user to its other `link_columns` entities: device, ip and card by
+    default. Components are tracked with a union-find, which cannot delete edges, so edges age
+    out by generation instead: every event goes into an active and a standby generation, and
+    every `window_seconds` (or once the active one holds `max_nodes` nodes) the standby becomes
+    active and a new standby starts. Features therefore cover between one and two windows of
+    traffic, and memory stays at no more than two generations. Event times are capped at
+    `max_clock_skew_seconds` ahead of the wall clock, so a far-future timestamp cannot stop
+    rotation.
+    """
+
+    def __init__(
+        self,
+        window_seconds: float = DEFAULT_WINDOW_SECONDS,
+        max_nodes: int = DEFAULT_MAX_NODES,
+        max_hub_degree: int = DEFAULT_MAX_HUB_DEGREE,
+        link_columns: list[str] | None = None,
+        max_clock_skew_seconds: float | None = DEFAULT_MAX_CLOCK_SKEW_SECONDS,
+    ) -> None:
+        self.window_seconds = float(window_seconds)
+        self.max_nodes = int(max_nodes)
+        self.max_hub_degree = int(max_hub_degree)
+        self.link_columns = list(link_columns or LIVE_LINK_COLS)
+        self.max_clock_skew_seconds = max_clock_skew_seconds
+        if self.link_columns[0] != "user_id":
+            raise ValueError("link_columns must start with user_id, the hub of each event.")
+        self._kind = {col: i for i, col in enumerate(self.link_columns)}
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._clock = 0.0
+            self._active: _Generation | None = None
+            self._standby: _Generation | None = None
+            self.events_seen = 0
+            self.rotations = 0
+            self.hub_links_skipped = 0
+
+    def _rotate(self, now: float) -> None:
+        self._active = self._standby or _Generation(now, len(self.link_columns))
+        self._standby = _Generation(now, len(self.link_columns))
+        self.rotations += 1
+
+    def update(self, payload: dict[str, Any]) -> dict[str, float]:
+        # Ingests the event, then returns features of its component including this event.
+        # Placeholder ids ("unknown_*") from omitted fields are not entities and stay out.
+        event_ts = event_time(payload.get("event_ts"), self.max_clock_skew_seconds)
+        keys = []
+        for col in self.link_columns:
+            value = payload.get(col)
+            if value is None or str(value).startswith("unknown_"):
+                continue
+            keys.append((col, f"{col}:{value}"))
+        with self._lock:
+            # Out-of-order timestamps never move the clock backwards.
+            self._clock = max(self._clock, event_ts)
+            if self._active is None:
+                self._active = _Generation(self._clock, len(self.link_columns))
+                self._standby = _Generation(self._clock, len(self.link_columns))
+            elif (
+                self._clock - self._standby.started_at >= self.window_seconds
+                or len(self._active.parent) >= self.max_nodes
+            ):
+                self._rotate(self._clock)
+            self.events_seen += 1
+            features = {}
+            for generation in (self._standby, self._active):
+                features = self._ingest(generation, keys)
+            return features
+
+    def update_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        # Rows are ingested in frame order, so each sees the edges of the rows before it.
+        columns = [col for col in [*self.link_columns, "event_ts"] if col in df.columns]
+        rows = [self.update(row) for row in df[columns].to_dict(orient="records")]
+        return pd.DataFrame(rows, columns=LIVE_GRAPH_FEATURES, index=df.index, dtype=float)
+
+    def _ingest(self, generation: _Generation, keys: list[tuple[str, str]]) -> dict[str, float]:
+        nodes = {col: generation.node(key, self._kind[col]) for col, key in keys}
+        for node in nodes.values():
+            generation.degree[node] += 1
+        hub = nodes.get("user_id")
+        if hub is not None:
+            for col, node in nodes.items():
+                if col == "user_id":
+                    continue
+                # A shared merchant or carrier-grade NAT ip would otherwise merge everything.
+                if generation.degree[node] > self.max_hub_degree:
+                    if generation is self._active:
+                        self.hub_links_skipped += 1
+                    continue
+                generation.union(hub, node)
+        features = {name: 0.0 for name in LIVE_GRAPH_FEATURES}
+        if not nodes:
+            return features
+        root = generation.find(hub if hub is not None else next(iter(nodes.values())))
+        counts = generation.kind_counts
+        features["live_component_size"] = float(sum(kind[root] for kind in counts))
+        for name, col in (("live_component_users", "user_id"), ("live_component_cards", "card_id")):
+            if col in self._kind:
+                features[name] = float(counts[self._kind[col]][root])
+        for col in ENTITY_COLS:
+            if col in nodes:
+                features[f"live_{col}_degree"] = float(generation.degree[nodes[col]])
+        return features
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            generations = [gen for gen in (self._active, self._standby) if gen is not None]
+            nodes = [len(gen.parent) for gen in generations]
+            return {
+                "events_seen": self.events_seen,
+                "rotations": self.rotations,
+                "hub_links_skipped": self.hub_links_skipped,
+                "window_seconds": self.window_seconds,
+                "active_nodes": nodes[0] if nodes else 0,
+                "standby_nodes": nodes[1] if len(nodes) > 1 else 0,
+                "max_nodes": self.max_nodes,
+                "active_since": generations[0].started_at if generations else None,
+            }
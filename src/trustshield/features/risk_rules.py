@@ -2,12 +2,18 @@ from __future__ import annotations
 
 from typing import Any
 
+import numpy as np
+import pandas as pd
+
+SUSPICIOUS_TOKENS = ("otp", "urgent", "click", "transfer", "outside platform")
+HIGH_RISK_COUNTRY_CODES = {"NG", "RU"}
+
 
 def extract_reason_flags(payload: dict[str, Any]) -> list[str]:
     reasons: list[str] = []
 
     text = str(payload.get("message_text", "")).lower()
-    if any(token in text for token in ("otp", "urgent", "click", "transfer", "outside platform")):
+    if any(token in text for token in SUSPICIOUS_TOKENS):
         reasons.append("suspicious_message_pattern")
 
     if int(payload.get("payment_attempts", 0)) >= 4:
@@ -22,7 +28,38 @@ def extract_reason_flags(payload: dict[str, Any]) -> list[str]:
     if int(payload.get("chargeback_history", 0)) == 1:
         reasons.append("prior_chargeback")
 
-    if str(payload.get("country", "")).upper() in {"NG", "RU"}:
+    if str(payload.get("country", "")).upper() in HIGH_RISK_COUNTRY_CODES:
         reasons.append("high_risk_country")
 
     return reasons
+
+
+def _int_column(df: pd.DataFrame, col: str) -> np.ndarray:
+    if col not in df.columns:
+        return np.zeros(len(df), dtype=np.int64)
+    return pd.to_numeric(df[col], errors="coerce").fillna(0).to_numpy(dtype=np.int64)
+
+
+def reason_flag_masks(df: pd.DataFrame) -> dict[str, np.ndarray]:
+    # Column-wise `extract_reason_flags`; keys keep the same order as the per-row version.
+    if "message_text" in df.columns:
+        codes, uniques = pd.factorize(df["message_text"].astype(str).str.lower())
+        suspicious = np.array(
+            [any(token in text for token in SUSPICIOUS_TOKENS) for text in uniques], dtype=bool
+        )
+        suspicious_mask = suspicious[codes] if len(uniques) else np.zeros(len(df), dtype=bool)
+    else:
+        suspicious_mask = np.zeros(len(df), dtype=bool)
+    if "country" in df.columns:
+        countries = df["country"].astype(str).str.upper()
+        high_risk_country = countries.isin(HIGH_RISK_COUNTRY_CODES).to_numpy()
+    else:
+        high_risk_country = np.zeros(len(df), dtype=bool)
+    return {
+        "suspicious_message_pattern": suspicious_mask,
+        "high_payment_attempts": _int_column(df, "payment_attempts") >= 4,
+        "new_account": _int_column(df, "account_age_days") < 7,
+        "high_device_reuse": _int_column(df, "device_reuse_count") >= 4,
+        "prior_chargeback": _int_column(df, "chargeback_history") == 1,
+        "high_risk_country": high_risk_country,
+    }
@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import math
+import threading
+import zlib
+from collections import OrderedDict, deque
+from typing import Any
+
+import pandas as pd
+
+from trustshield.features.event_time import DEFAULT_MAX_CLOCK_SKEW_SECONDS, event_time
+
+DEFAULT_WINDOWS_SECONDS = [60, 600, 3_600]
+DEFAULT_BUCKETS_PER_WINDOW = 6
+DEFAULT_MAX_ENTITIES = 500_000
+DEFAULT_DISTINCT_BITS = 256
+VELOCITY_PREFIX = "velocity_"
+# Per entity type: the field summed over each window and the field counted distinct.
+VELOCITY_SPECS: dict[str, dict[str, str | None]] = {
+    "user_id": {"sum": "payment_attempts", "distinct": None},
+    "device_id": {"sum": "payment_attempts", "distinct": "card_id"},
+    "ip_id": {"sum": None, "distinct": "user_id"},
+    "card_id": {"sum": None, "distinct": None},
+}
+
+
+def velocity_feature_names(windows: list[int] | None = None) -> list[str]:
+    names = []
+    for window in windows or DEFAULT_WINDOWS_SECONDS:
+        for entity, spec in VELOCITY_SPECS.items():
+            names.append(f"{VELOCITY_PREFIX}{entity}_events_{window}s")
+            if spec["sum"]:
+                names.append(f"{VELOCITY_PREFIX}{entity}_{spec['sum']}_sum_{window}s")
+            if spec["distinct"]:
+                names.append(f"{VELOCITY_PREFIX}{entity}_distinct_{spec['distinct']}_{window}s")
+    return names
+
+
+class EntityFeatureStore:
+    """Per-entity rolling counts, sums and distinct counts over several windows.
+
+    Each window is a ring of `buckets` time buckets, so a window covers between
+    (buckets - 1) / buckets and all of its length. Distinct counts use one linear-counting
+    bitmap per bucket, merged with OR at read time: a few dozen bytes per bucket, and estimates
+    saturate around bits * ln(bits) distinct values. Entities idle for longer than the largest
+    window are evicted, and each entity type holds at most `max_entities` entities. Event
+    times are capped at `max_clock_skew_seconds` ahead of the wall clock.
+    """
+
+    def __init__(
+        self,
+        windows_seconds: list[int] | None = None,
+        buckets: int = DEFAULT_BUCKETS_PER_WINDOW,
+        max_entities: int = DEFAULT_MAX_ENTITIES,
+        distinct_bits: int = DEFAULT_DISTINCT_BITS,
+        max_clock_skew_seconds: float | None = DEFAULT_MAX_CLOCK_SKEW_SECONDS,
+    ) -> None:
+        self.windows = [int(window) for window in windows_seconds or DEFAULT_WINDOWS_SECONDS]
+        self.buckets = int(buckets)
+        self.max_entities = int(max_entities)
+        self.distinct_bits = int(distinct_bits)
+        self.max_clock_skew_seconds = max_clock_skew_seconds
+        self._widths = [window / self.buckets for window in self.windows]
+        self._horizon = float(max(self.windows))
+        self._names = {
+            entity: [
+                (
+                    f"{VELOCITY_PREFIX}{entity}_events_{window}s",
+                    f"{VELOCITY_PREFIX}{entity}_{spec['sum']}_sum_{window}s"
+                    if spec["sum"]
+                    else None,
+                    f"{VELOCITY_PREFIX}{entity}_distinct_{spec['distinct']}_{window}s"
+                    if spec["distinct"]
+                    else None,
+                )
+                for window in self.windows
+            ]
+            for entity, spec in VELOCITY_SPECS.items()
+        }
+        self.feature_names = velocity_feature_names(self.windows)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._clock = 0.0
+            # Entity key -> [last event time, one bucket ring per window], oldest first.
+            self._tables: dict[str, OrderedDict[str, list[Any]]] = {
+                entity: OrderedDict() for entity in VELOCITY_SPECS
+            }
+            self.events_seen = 0
+            self.evicted = 0
+
+    def _distinct_bit(self, value: Any) -> int:
+        # crc32 rather than hash(): stable across processes, so replayed training features
+        # match the ones serving computes.
+        return 1 << (zlib.crc32(str(value).encode("utf-8")) % self.distinct_bits)
+
+    def _estimate(self, bitmap: int) -> float:
+        zeros = self.distinct_bits - bitmap.bit_count()
+        if zeros == 0:
+            return self.distinct_bits * math.log(self.distinct_bits)
+        return -self.distinct_bits * math.log(zeros / self.distinct_bits)
+
+    def update(self, payload: dict[str, Any]) -> dict[str, float]:
+        # Counts the event, then returns aggregates that include it. Placeholder ids
+        # ("unknown_*") are not entities; their features stay at zero.
+        event_ts = event_time(payload.get("event_ts"), self.max_clock_skew_seconds)
+        features = dict.fromkeys(self.feature_names, 0.0)
+        with self._lock:
+            # Out-of-order timestamps never move the clock backwards.
+            self._clock = now = max(self._clock, event_ts)
+            self.events_seen += 1
+            for entity, spec in VELOCITY_SPECS.items():
+                key = payload.get(entity)
+                if key is None or str(key).startswith("unknown_"):
+                    continue
+                amount = float(payload.get(spec["sum"]) or 0) if spec["sum"] else 0.0
+                distinct = spec["distinct"]
+                bit = self._distinct_bit(payload.get(distinct)) if distinct else 0
+                self._ingest(entity, str(key), now, amount, bit, features)
+        return features
+
+    def _ingest(
+        self,
+        entity: str,
+        key: str,
+        now: float,
+        amount: float,
+        bit: int,
+        features: dict[str, float],
+    ) -> None:
+        table = self._tables[entity]
+        state = table.get(key)
+        if state is None:
+            # [last event time, bucket rings, event counts, sums], one ring/count/sum per window.
+            n_windows = len(self.windows)
+            state = [now, [deque() for _ in range(n_windows)], [0] * n_windows, [0.0] * n_windows]
+            table[key] = state
+            # Tables only grow here. Least recently seen first: drop idle entities, then
+            # enforce the cap.
+            while table:
+                oldest = next(iter(table.values()))
+                if oldest[0] >= now - self._horizon and len(table) <= self.max_entities:
+                    break
+                table.popitem(last=False)
+                self.evicted += 1
+        else:
+            state[0] = now
+            table.move_to_end(key)
+        rings, counts, totals = state[1], state[2], state[3]
+        for i, (width, (count_name, sum_name, distinct_name)) in enumerate(
+            zip(self._widths, self._names[entity])
+        ):
+            ring = rings[i]
+            bucket = int(now // width)
+            if ring and ring[-1][0] == bucket:
+                current = ring[-1]
+            else:
+                # Buckets only expire when a new one starts; the clock never goes backwards.
+                current = [bucket, 0, 0.0, 0]
+                ring.append(current)
+                while ring[0][0] <= bucket - self.buckets:
+                    expired = ring.popleft()
+                    counts[i] -= expired[1]
+                    totals[i] -= expired[2]
+            current[1] += 1
+            current[2] += amount
+            current[3] |= bit
+            counts[i] += 1
+            totals[i] += amount
+            features[count_name] = float(counts[i])
+            if sum_name:
+                features[sum_name] = totals[i]
+            if distinct_name:
+                bitmap = 0
+                for ring_bucket in ring:
+                    bitmap |= ring_bucket[3]
+                features[distinct_name] = self._estimate(bitmap)
+
+    def update_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        # Rows are counted in frame order, so each sees the rows before it.
+        rows = [self.update(row) for row in df.to_dict(orient="records")]
+        return pd.DataFrame(rows, columns=self.feature_names, index=df.index, dtype=float)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "events_seen": self.events_seen,
+                "evicted": self.evicted,
+                "windows_seconds": self.windows,
+                "tracked_entities": {entity: len(table) for entity, table in self._tables.items()},
+                "max_entities": self.max_entities,
+            }
+
+
+def replay_velocity_features(
+    df: pd.DataFrame, windows_seconds: list[int] | None = None, **kwargs: Any
+) -> pd.DataFrame:
+    # Training-time features: events replayed in time order through a fresh store, so each
+    # row only sees the events before it, as serving would.
+    store = EntityFeatureStore(windows_seconds, **kwargs)
+    ordered = df.sort_values("event_ts", kind="stable")
+    return store.update_frame(ordered).reindex(df.index)
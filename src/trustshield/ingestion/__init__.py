@@ -1,3 +1,16 @@
+from .profiles import SCALE_PROFILES, ScaleProfile, generate_profile_events, get_scale_profile
+from .readers import compact_event_dtypes, iter_event_chunks, read_events
 from .synthetic import generate_synthetic_events
+from .writers import FrameWriter
 
-__all__ = ["generate_synthetic_events"]
+__all__ = [
+    "generate_synthetic_events",
+    "generate_profile_events",
+    "get_scale_profile",
+    "ScaleProfile",
+    "SCALE_PROFILES",
+    "read_events",
+    "iter_event_chunks",
+    "compact_event_dtypes",
+    "FrameWriter",
+]
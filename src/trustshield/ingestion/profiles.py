@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import argparse
+from dataclasses import dataclass, replace
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from trustshield.ingestion.synthetic import (
+    COUNTRIES,
+    HIGH_RISK_COUNTRIES,
+    RISK_MESSAGES,
+    SAFE_MESSAGES,
+)
+
+
+@dataclass(frozen=True)
+class ScaleProfile:
+    n_samples: int
+    n_users: int
+    n_merchants: int
+    n_devices: int
+    n_ips: int
+    n_cards: int
+    zipf_exponent: float = 0.9
+    n_fraud_rings: int = 0
+    ring_devices: int = 4
+    ring_cards: int = 12
+    ring_ips: int = 3
+    ring_min_latent_risk: float = 0.55
+    ring_share: float = 0.6
+    duration_seconds: int = 86_400
+    burst_share: float = 0.25
+    burst_mean_seconds: float = 30.0
+    start_ts: int = 1_700_000_000
+
+
+SCALE_PROFILES: dict[str, ScaleProfile] = {
+    "small": ScaleProfile(
+        n_samples=20_000,
+        n_users=8_000,
+        n_merchants=300,
+        n_devices=6_000,
+        n_ips=7_000,
+        n_cards=10_000,
+        n_fraud_rings=20,
+    ),
+    "medium": ScaleProfile(
+        n_samples=500_000,
+        n_users=200_000,
+        n_merchants=5_000,
+        n_devices=150_000,
+        n_ips=180_000,
+        n_cards=250_000,
+        n_fraud_rings=300,
+        duration_seconds=7 * 86_400,
+    ),
+    "large": ScaleProfile(
+        n_samples=5_000_000,
+        n_users=2_000_000,
+        n_merchants=50_000,
+        n_devices=1_500_000,
+        n_ips=1_800_000,
+        n_cards=2_500_000,
+        n_fraud_rings=3_000,
+        duration_seconds=30 * 86_400,
+    ),
+}
+
+
+def get_scale_profile(name: str, **overrides: int | float) -> ScaleProfile:
+    if name not in SCALE_PROFILES:
+        raise ValueError(f"Unknown scale profile {name!r}. Available: {sorted(SCALE_PROFILES)}")
+    return replace(SCALE_PROFILES[name], **overrides)
+
+
+def _zipf_indices(
+    rng: np.random.Generator, n_entities: int, size: int, exponent: float
+) -> np.ndarray:
+    # Truncated Zipf via inverse CDF, so popularity is heavy-tailed but ids stay in range.
+    weights = np.arange(1, n_entities + 1, dtype=np.float64) ** -exponent
+    cdf = np.cumsum(weights)
+    cdf /= cdf[-1]
+    idx = np.searchsorted(cdf, rng.random(size), side="right")
+    return np.minimum(idx, n_entities - 1)
+
+
+def _entity_ids(prefix: str, idx: np.ndarray, n_entities: int) -> np.ndarray:
+    # Format each distinct id once; popular entities repeat many times per dump.
+    width = max(len(str(n_entities - 1)), 4)
+    uniques, inverse = np.unique(idx, return_inverse=True)
+    names = np.array([f"{prefix}_{value:0{width}d}" for value in uniques], dtype=object)
+    return names[inverse]
+
+
+def _ring_members(
+    ring: np.ndarray, per_ring: int, offset: int, rng: np.random.Generator
+) -> np.ndarray:
+    # Ring entities live in a dedicated id block right after the organic population.
+    return offset + ring * per_ring + rng.integers(0, per_ring, size=len(ring))
+
+
+def generate_profile_events(
+    profile: str | ScaleProfile = "small",
+    n_samples: int | None = None,
+    random_state: int = 42,
+) -> pd.DataFrame:
+    cfg = get_scale_profile(profile) if isinstance(profile, str) else profile
+    n = int(n_samples if n_samples is not None else cfg.n_samples)
+    rng = np.random.default_rng(random_state)
+
+    latent_risk = np.clip(rng.beta(2.0, 5.0, n) + rng.normal(0.0, 0.08, n), 0, 1)
+    risky_message = (latent_risk > 0.5) | (rng.random(n) < 0.12)
+    country_idx = rng.integers(0, len(COUNTRIES), n)
+    countries = np.array(COUNTRIES)[country_idx]
+    payment_attempts = rng.poisson(2.0 + latent_risk * 3.0)
+    account_age_days = np.maximum(
+        1, (rng.gamma(4.5, 25.0, n) * (1.1 - latent_risk)).astype(np.int64)
+    )
+    device_reuse_count = rng.poisson(1.5 + latent_risk * 4.0)
+    chargeback_history = (rng.random(n) < (0.06 + 0.4 * latent_risk)).astype(np.int64)
+
+    safe_pick = rng.integers(0, len(SAFE_MESSAGES), n)
+    risk_pick = rng.integers(0, len(RISK_MESSAGES), n)
+    messages = np.where(
+        risky_message, np.array(RISK_MESSAGES)[risk_pick], np.array(SAFE_MESSAGES)[safe_pick]
+    )
+
+    user_idx = _zipf_indices(rng, cfg.n_users, n, cfg.zipf_exponent)
+    merchant_idx = _zipf_indices(rng, cfg.n_merchants, n, cfg.zipf_exponent)
+    device_idx = _zipf_indices(rng, cfg.n_devices, n, cfg.zipf_exponent)
+    ip_idx = _zipf_indices(rng, cfg.n_ips, n, cfg.zipf_exponent)
+    card_idx = _zipf_indices(rng, cfg.n_cards, n, cfg.zipf_exponent)
+
+    duration = float(cfg.duration_seconds)
+    event_ts = rng.uniform(0.0, duration, n)
+
+    n_devices, n_ips, n_cards = cfg.n_devices, cfg.n_ips, cfg.n_cards
+    if cfg.n_fraud_rings > 0:
+        in_ring = (latent_risk > cfg.ring_min_latent_risk) & (rng.random(n) < cfg.ring_share)
+        ring_rows = np.flatnonzero(in_ring)
+        ring = rng.integers(0, cfg.n_fraud_rings, len(ring_rows))
+        device_idx[ring_rows] = _ring_members(ring, cfg.ring_devices, cfg.n_devices, rng)
+        card_idx[ring_rows] = _ring_members(ring, cfg.ring_cards, cfg.n_cards, rng)
+        ip_idx[ring_rows] = _ring_members(ring, cfg.ring_ips, cfg.n_ips, rng)
+        # Rings strike in short waves around a per-ring anchor time.
+        ring_anchor = rng.uniform(0.0, duration, cfg.n_fraud_rings)
+        event_ts[ring_rows] = ring_anchor[ring] + rng.exponential(
+            cfg.burst_mean_seconds, len(ring_rows)
+        )
+        n_devices += cfg.n_fraud_rings * cfg.ring_devices
+        n_cards += cfg.n_fraud_rings * cfg.ring_cards
+        n_ips += cfg.n_fraud_rings * cfg.ring_ips
+    else:
+        in_ring = np.zeros(n, dtype=bool)
+
+    bursty = np.flatnonzero(~in_ring & (rng.random(n) < cfg.burst_share))
+    # Deterministic per-user session anchor: no per-user array for millions of users.
+    user_anchor = (user_idx[bursty].astype(np.float64) * 2654435761.0) % duration
+    event_ts[bursty] = user_anchor + rng.exponential(cfg.burst_mean_seconds, len(bursty))
+    event_ts = cfg.start_ts + np.clip(event_ts, 0.0, duration)
+
+    risk_boost = (
+        np.isin(countries, list(HIGH_RISK_COUNTRIES)) * 0.16
+        + (payment_attempts >= 4) * 0.08
+        + (account_age_days < 7) * 0.12
+        + (device_reuse_count >= 4) * 0.1
+        + risky_message * 0.18
+        + chargeback_history * 0.22
+    )
+    fraud_prob = np.clip(latent_risk * 0.6 + risk_boost, 0, 1)
+    is_fraud = (rng.random(n) < fraud_prob).astype(np.int64)
+
+    order = np.argsort(event_ts, kind="stable")
+    return pd.DataFrame(
+        {
+            "event_id": np.arange(n, dtype=np.int64),
+            "message_text": messages[order],
+            "country": countries[order],
+            "user_id": _entity_ids("user", user_idx[order], cfg.n_users),
+            "device_id": _entity_ids("device", device_idx[order], n_devices),
+            "ip_id": _entity_ids("ip", ip_idx[order], n_ips),
+            "card_id": _entity_ids("card", card_idx[order], n_cards),
+            "merchant_id": _entity_ids("merchant", merchant_idx[order], cfg.n_merchants),
+            "payment_attempts": payment_attempts[order].astype(np.int64),
+            "account_age_days": account_age_days[order].astype(np.int64),
+            "device_reuse_count": device_reuse_count[order].astype(np.int64),
+            "chargeback_history": chargeback_history[order],
+            "is_fraud": is_fraud[order],
+            "event_ts": event_ts[order],
+        }
+    )
+
+
+def write_events(df: pd.DataFrame, output_path: Path) -> Path:
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    suffix = output_path.suffix.lower()
+    if suffix == ".parquet":
+        df.to_parquet(output_path, index=False)
+    elif suffix in {".jsonl", ".ndjson"}:
+        df.to_json(output_path, orient="records", lines=True)
+    else:
+        df.to_csv(output_path, index=False)
+    return output_path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate a scaled synthetic event dump.")
+    parser.add_argument("--profile", default="small", choices=sorted(SCALE_PROFILES))
+    parser.add_argument("--n-samples", type=int, default=None)
+    parser.add_argument("--random-state", type=int, default=42)
+    parser.add_argument("--output", default="data/raw/events_small.csv")
+    args = parser.parse_args()
+
+    df = generate_profile_events(
+        args.profile, n_samples=args.n_samples, random_state=args.random_state
+    )
+    path = write_events(df, Path(args.output))
+    print(f"Wrote {len(df)} events ({args.profile} profile) to {path}")
+
+
+if __name__ == "__main__":
+    main()
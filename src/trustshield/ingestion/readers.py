@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import glob
+from collections.abc import Iterator
+from pathlib import Path
+
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from trustshield.preprocessing.validation import OPTIONAL_COLUMNS, REQUIRED_COLUMNS
+
+ID_COLUMNS = ["user_id", "device_id", "ip_id", "card_id", "merchant_id"]
+CATEGORICAL_COLUMNS = ID_COLUMNS + ["country"]
+INT_COLUMNS = [
+    "event_id",
+    "payment_attempts",
+    "account_age_days",
+    "device_reuse_count",
+    "chargeback_history",
+    "is_fraud",
+]
+DEFAULT_CHUNK_SIZE = 100_000
+
+
+def resolve_event_paths(path: str | Path | list[str | Path]) -> list[Path]:
+    if isinstance(path, (list, tuple)):
+        paths = [Path(p) for p in path]
+    else:
+        matches = sorted(glob.glob(str(path)))
+        paths = [Path(p) for p in matches] if matches else [Path(path)]
+    missing = [str(p) for p in paths if not p.exists()]
+    if missing:
+        raise FileNotFoundError(f"Event files not found: {missing}")
+    return paths
+
+
+def compact_event_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    out = df.copy()
+    for col in INT_COLUMNS:
+        if col in out.columns:
+            # event_id keeps int64 headroom; the small counters fit in int8/int16.
+            downcast = out[col].astype("int64")
+            out[col] = (
+                downcast if col == "event_id" else pd.to_numeric(downcast, downcast="integer")
+            )
+    if "event_ts" in out.columns:
+        # Epoch seconds need float64; float32 would round to ~2 minutes.
+        out["event_ts"] = out["event_ts"].astype("float64")
+    for col in CATEGORICAL_COLUMNS:
+        if col in out.columns and not isinstance(out[col].dtype, pd.CategoricalDtype):
+            out[col] = out[col].astype("category")
+    return out
+
+
+def _project(columns: list[str] | None) -> list[str]:
+    return list(columns) if columns is not None else REQUIRED_COLUMNS + OPTIONAL_COLUMNS
+
+
+def _iter_raw_chunks(path: Path, columns: list[str], chunk_size: int) -> Iterator[pd.DataFrame]:
+    suffix = path.suffix.lower()
+    if suffix == ".parquet":
+        try:
+            import pyarrow.parquet as pq
+        except Exception as exc:
+            raise ImportError("Reading Parquet requires `pip install -e \".[parquet]\"`.") from exc
+        parquet_file = pq.ParquetFile(path)
+        available = [col for col in columns if col in parquet_file.schema_arrow.names]
+        chunks = (
+            batch.to_pandas()
+            for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=available)
+        )
+    elif suffix in {".jsonl", ".ndjson"}:
+        # JSON has no column pushdown; projection happens right after parsing each chunk.
+        chunks = pd.read_json(path, lines=True, chunksize=chunk_size)
+    else:
+        wanted = set(columns)
+        chunks = pd.read_csv(path, chunksize=chunk_size, usecols=lambda col: col in wanted)
+
+    for chunk in chunks:
+        chunk = chunk[[col for col in columns if col in chunk.columns]]
+        # Chunked CSV parsing can surface small ids as uint64; the schema wants int64.
+        ints = {col: "int64" for col in INT_COLUMNS if col in chunk.columns}
+        yield chunk.astype(ints)
+
+
+def iter_event_chunks(
+    path: str | Path | list[str | Path],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    columns: list[str] | None = None,
+    compact: bool = True,
+) -> Iterator[pd.DataFrame]:
+    projected = _project(columns)
+    for event_path in resolve_event_paths(path):
+        for chunk in _iter_raw_chunks(event_path, projected, chunk_size):
+            yield compact_event_dtypes(chunk) if compact else chunk
+
+
+def read_events(
+    path: str | Path | list[str | Path],
+    columns: list[str] | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    compact: bool = True,
+) -> pd.DataFrame:
+    chunks = list(iter_event_chunks(path, chunk_size=chunk_size, columns=columns, compact=compact))
+    if not chunks:
+        return pd.DataFrame(columns=_project(columns))
+    if not compact:
+        return pd.concat(chunks, ignore_index=True)
+
+    # Chunk categoricals carry their own dictionaries; merge them instead of
+    # letting concat fall back to object columns.
+    merged: dict[str, pd.Series] = {}
+    for col in chunks[0].columns:
+        if isinstance(chunks[0][col].dtype, pd.CategoricalDtype):
+            merged[col] = pd.Series(union_categoricals([chunk[col] for chunk in chunks]))
+        else:
+            merged[col] = pd.concat([chunk[col] for chunk in chunks], ignore_index=True)
+    return pd.DataFrame(merged)
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pandas as pd
+
+
+class FrameWriter:
+    """Appends DataFrames to one Parquet (zstd) or JSONL file, chosen by suffix."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.is_parquet = path.suffix.lower() == ".parquet"
+        self._parquet_writer = None
+        self._handle = None if self.is_parquet else path.open("w", encoding="utf-8")
+
+    def write(self, frame: pd.DataFrame) -> None:
+        if self.is_parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            # An all-empty list column infers as list<null>; pin every list column to strings.
+            schema = pa.schema(
+                [
+                    pa.field(field.name, pa.list_(pa.string()))
+                    if pa.types.is_list(field.type)
+                    else field
+                    for field in table.schema
+                ]
+            )
+            table = table.cast(schema)
+            if self._parquet_writer is None:
+                self._parquet_writer = pq.ParquetWriter(self.path, table.schema, compression="zstd")
+            self._parquet_writer.write_table(table.cast(self._parquet_writer.schema))
+        else:
+            frame.to_json(self._handle, orient="records", lines=True)
+
+    def close(self) -> None:
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+        if self._handle is not None:
+            self._handle.close()
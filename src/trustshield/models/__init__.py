@@ -1,3 +1,3 @@
-from .infer import explain_event, score_event
+from .infer import DETAIL_LEVELS, explain_event, score_event, score_frame
 
-__all__ = ["score_event", "explain_event"]
+__all__ = ["score_event", "explain_event", "score_frame", "DETAIL_LEVELS"]
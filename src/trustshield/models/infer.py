@@ -1,13 +1,39 @@
 from __future__ import annotations
 
+import threading
+import time
 from typing import Any
 
 import numpy as np
 import pandas as pd
 
-from trustshield.features import graph_features_for_payload
+from trustshield.features import enrich_with_graph_features, graph_features_for_payload
+from trustshield.features.velocity import VELOCITY_PREFIX
 from trustshield.preprocessing import normalize_text
 
+TABULAR_NUM_COLS = [
+    "payment_attempts",
+    "account_age_days",
+    "device_reuse_count",
+    "chargeback_history",
+    "graph_device_id_degree",
+    "graph_ip_id_degree",
+    "graph_card_id_degree",
+    "graph_device_id_pagerank",
+    "graph_ip_id_pagerank",
+    "graph_card_id_pagerank",
+    "graph_device_id_component_size",
+    "graph_ip_id_component_size",
+    "graph_card_id_component_size",
+    "graph_max_entity_fraud_rate",
+    "graph_mean_entity_degree",
+    "graph_max_entity_pagerank",
+    "graph_min_component_size",
+    "graph_max_hop1_fraud_rate",
+    "graph_max_hop2_fraud_rate",
+    "graph_max_label_prop_risk",
+]
+
 
 def _top_text_matches(text: str, ngrams: set[str], limit: int = 5) -> list[str]:
     text_tokens = text.split()
@@ -47,15 +73,58 @@ def _tabular_explain(
         return ({name: round(value, 4) for name, value in top}, "linear_coef")
 
 
-def explain_event(model_bundle: dict[str, Any], payload: dict[str, Any]) -> dict[str, Any]:
+DETAIL_LEVELS = ("score", "reasons", "full")
+# Optional stages in run order, and the lowest detail level that asks for each.
+OPTIONAL_STAGES = {"model_reasons": "reasons", "feature_contributions": "full"}
+# Running cost estimate per optional stage (ms), so a stage that cannot finish inside the
+# remaining budget is skipped up front instead of overrunning it. Shared by every request
+# thread, so the read-modify-write of an update holds the lock.
+_stage_cost_ms: dict[str, float] = {}
+_stage_cost_lock = threading.Lock()
+
+
+def _stage_fits(stage: str, detail: str, deadline: float | None) -> bool:
+    if DETAIL_LEVELS.index(detail) < DETAIL_LEVELS.index(OPTIONAL_STAGES[stage]):
+        return False
+    if deadline is None:
+        return True
+    with _stage_cost_lock:
+        expected_ms = _stage_cost_ms.get(stage, 0.0)
+    return (deadline - time.perf_counter()) * 1000.0 > expected_ms
+
+
+def _record_stage_cost(stage: str, started: float) -> None:
+    elapsed_ms = (time.perf_counter() - started) * 1000.0
+    with _stage_cost_lock:
+        previous = _stage_cost_ms.get(stage)
+        _stage_cost_ms[stage] = (
+            elapsed_ms if previous is None else 0.8 * previous + 0.2 * elapsed_ms
+        )
+
+
+def explain_event(
+    model_bundle: dict[str, Any],
+    payload: dict[str, Any],
+    detail: str = "full",
+    deadline: float | None = None,
+    live_graph: dict[str, float] | None = None,
+    velocity: dict[str, float] | None = None,
+) -> dict[str, Any]:
+    # `deadline` is a `time.perf_counter()` instant. Scoring always runs; the optional stages
+    # run only when `detail` asks for them and their expected cost fits before the deadline.
+    # `live_graph` holds this event's OnlineEntityGraph features, used for unseen entities.
+    # `velocity` holds its EntityFeatureStore aggregates; a bundle trained with velocity
+    # inputs scores them as zero when none are given.
+    if detail not in DETAIL_LEVELS:
+        raise ValueError(f"detail must be one of {DETAIL_LEVELS}, got {detail!r}")
     text_model = model_bundle["text_model"]
     tabular_model = model_bundle["tabular_model"]
     text_vectorizer = model_bundle["text_vectorizer"]
     country_encoder = model_bundle["country_encoder"]
     graph_stats = model_bundle["graph_stats"]
     weights = model_bundle["ensemble_weights"]
-    top_ngrams = set(model_bundle.get("top_ngrams", []))
     tabular_feature_names = model_bundle.get("tabular_feature_names", [])
+    num_cols = model_bundle.get("meta", {}).get("num_cols", TABULAR_NUM_COLS)
     model_version = str(model_bundle.get("model_version", "unknown"))
 
     text = normalize_text(str(payload.get("message_text", "")))
@@ -65,48 +134,49 @@ def explain_event(model_bundle: dict[str, Any], payload: dict[str, Any]) -> dict
     device_reuse_count = float(payload.get("device_reuse_count", 0))
     chargeback_history = float(payload.get("chargeback_history", 0))
 
-    x_text = text_vectorizer.transform([text]).toarray()
+    x_text = text_vectorizer.transform([text])
     country_encoded = country_encoder.transform([[country]])
-    graph_features = graph_features_for_payload(payload, graph_stats)
-
-    x_num = np.array(
-        [
-            [
-                payment_attempts,
-                account_age_days,
-                device_reuse_count,
-                chargeback_history,
-                graph_features["graph_device_id_degree"],
-                graph_features["graph_ip_id_degree"],
-                graph_features["graph_card_id_degree"],
-                graph_features["graph_device_id_pagerank"],
-                graph_features["graph_ip_id_pagerank"],
-                graph_features["graph_card_id_pagerank"],
-                graph_features["graph_device_id_component_size"],
-                graph_features["graph_ip_id_component_size"],
-                graph_features["graph_card_id_component_size"],
-                graph_features["graph_max_entity_fraud_rate"],
-                graph_features["graph_mean_entity_degree"],
-                graph_features["graph_max_entity_pagerank"],
-                graph_features["graph_min_component_size"],
-            ]
-        ],
-        dtype=float,
-    )
+    graph_features = graph_features_for_payload(payload, graph_stats, live=live_graph)
+
+    raw_features = {
+        "payment_attempts": payment_attempts,
+        "account_age_days": account_age_days,
+        "device_reuse_count": device_reuse_count,
+        "chargeback_history": chargeback_history,
+        **graph_features,
+        **{col: 0.0 for col in num_cols if col.startswith(VELOCITY_PREFIX)},
+        **(velocity or {}),
+    }
+    x_num = np.array([[raw_features[col] for col in num_cols]], dtype=float)
 
     tabular_features = np.hstack([country_encoded, x_num])
 
-    text_score = float(text_model.predict_proba(pd.DataFrame(x_text))[0][1])
-    tabular_score = float(tabular_model.predict_proba(pd.DataFrame(tabular_features))[0][1])
+    text_score = float(text_model.predict_proba(x_text)[0][1])
+    tabular_score = float(tabular_model.predict_proba(tabular_features)[0][1])
     risk_score = float(weights["text"] * text_score + weights["tabular"] * tabular_score)
+    stages = ["score"]
+    skipped_stages: list[str] = []
+
+    model_reasons: list[str] = []
+    if _stage_fits("model_reasons", detail, deadline):
+        started = time.perf_counter()
+        model_reasons = _top_text_matches(text, set(model_bundle.get("top_ngrams", [])), limit=5)
+        _record_stage_cost("model_reasons", started)
+        stages.append("model_reasons")
+    else:
+        skipped_stages.append("model_reasons")
 
-    model_reasons = _top_text_matches(text, top_ngrams, limit=5)
     feature_contributions: dict[str, float] = {}
     explanation_method = "none"
-    if tabular_feature_names:
+    if tabular_feature_names and _stage_fits("feature_contributions", detail, deadline):
+        started = time.perf_counter()
         feature_contributions, explanation_method = _tabular_explain(
             tabular_model, tabular_feature_names, tabular_features
         )
+        _record_stage_cost("feature_contributions", started)
+        stages.append("feature_contributions")
+    elif tabular_feature_names:
+        skipped_stages.append("feature_contributions")
 
     return {
         "model_version": model_version,
@@ -118,8 +188,90 @@ def explain_event(model_bundle: dict[str, Any], payload: dict[str, Any]) -> dict
         "model_reasons": model_reasons,
         "feature_contributions": feature_contributions,
         "explanation_method": explanation_method,
+        "features": raw_features,
+        "stages": stages,
+        "skipped_stages": skipped_stages,
     }
 
 
 def score_event(model_bundle: dict[str, Any], payload: dict[str, Any]) -> float:
     return float(explain_event(model_bundle, payload)["risk_score"])
+
+
+SCORE_COLUMNS = [
+    "risk_score",
+    "text_score",
+    "tabular_score",
+    "graph_max_entity_fraud_rate",
+    "graph_max_entity_pagerank",
+    "model_reasons",
+]
+_PAYLOAD_DEFAULTS = {
+    "message_text": "",
+    "country": "UNK",
+    "payment_attempts": 0,
+    "account_age_days": 0,
+    "device_reuse_count": 0,
+    "chargeback_history": 0,
+}
+
+
+def score_frame(
+    model_bundle: dict[str, Any],
+    df: pd.DataFrame,
+    with_features: bool = False,
+    live_graph: pd.DataFrame | None = None,
+    velocity: pd.DataFrame | None = None,
+) -> pd.DataFrame:
+    # Vectorized `explain_event` without per-row SHAP; texts and countries repeat heavily,
+    # so normalization, hashing and n-gram matching run once per distinct value.
+    text_model = model_bundle["text_model"]
+    tabular_model = model_bundle["tabular_model"]
+    weights = model_bundle["ensemble_weights"]
+    top_ngrams = set(model_bundle.get("top_ngrams", []))
+    num_cols = model_bundle.get("meta", {}).get("num_cols", TABULAR_NUM_COLS)
+
+    frame = df.copy()
+    for col, default in _PAYLOAD_DEFAULTS.items():
+        if col not in frame.columns:
+            frame[col] = default
+    for col in ("device_id", "ip_id", "card_id"):
+        if col not in frame.columns:
+            frame[col] = f"unknown_{col}"
+
+    codes, uniques = pd.factorize(frame["message_text"].astype(str))
+    texts = [normalize_text(text) for text in uniques]
+    x_text = model_bundle["text_vectorizer"].transform(texts)[codes]
+    reasons = np.empty(len(texts), dtype=object)
+    reasons[:] = [_top_text_matches(text, top_ngrams, limit=5) for text in texts]
+
+    countries = frame["country"].astype(str).str.upper().to_frame("country")
+    x_country = model_bundle["country_encoder"].transform(countries)
+    enriched = enrich_with_graph_features(frame, model_bundle["graph_stats"], live=live_graph)
+    velocity_cols = [col for col in num_cols if col.startswith(VELOCITY_PREFIX)]
+    if velocity_cols:
+        enriched = enriched.assign(**dict.fromkeys(velocity_cols, 0.0))
+        if velocity is not None:
+            known = [col for col in velocity_cols if col in velocity.columns]
+            enriched[known] = velocity[known].to_numpy(dtype=float)
+    x_num = enriched[num_cols].to_numpy(dtype=float)
+
+    text_score = text_model.predict_proba(x_text)[:, 1]
+    tabular_score = tabular_model.predict_proba(np.hstack([x_country, x_num]))[:, 1]
+    risk_score = weights["text"] * text_score + weights["tabular"] * tabular_score
+    out = pd.DataFrame(
+        {
+            "risk_score": risk_score,
+            "text_score": text_score,
+            "tabular_score": tabular_score,
+            "graph_max_entity_fraud_rate": enriched["graph_max_entity_fraud_rate"].to_numpy(float),
+            "graph_max_entity_pagerank": enriched["graph_max_entity_pagerank"].to_numpy(float),
+            "model_reasons": reasons[codes],
+        },
+        index=df.index,
+    )
+    if with_features:
+        # Model inputs as well, e.g. for drift sketches fed from batch traffic.
+        extra = [col for col in num_cols if col not in out.columns]
+        out = pd.concat([out, enriched[extra].set_axis(df.index)], axis=1)
+    return out
@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import time
+from typing import Any
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import SGDClassifier
+from sklearn.metrics import average_precision_score
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+from trustshield.features import GraphStatsAccumulator, enrich_with_graph_features
+from trustshield.ingestion.readers import iter_event_chunks, resolve_event_paths
+from trustshield.models.infer import TABULAR_NUM_COLS
+from trustshield.models.train import _recall_at_precision
+from trustshield.monitoring.drift import build_drift_baseline
+from trustshield.preprocessing import normalize_text, validate_events
+
+MAX_NGRAM_CANDIDATES = 50_000
+
+
+def _prepare_chunk(chunk: pd.DataFrame) -> pd.DataFrame:
+    chunk = chunk.copy()
+    # Message templates repeat heavily; normalize each distinct text once per chunk.
+    codes, uniques = pd.factorize(chunk["message_text"].astype(str))
+    normalized = np.array([normalize_text(text) for text in uniques], dtype=object)
+    chunk["message_text"] = normalized[codes]
+    validate_events(chunk)
+    return chunk
+
+
+def _hash_texts(vectorizer: HashingVectorizer, texts: pd.Series) -> csr_matrix:
+    codes, uniques = pd.factorize(texts)
+    return vectorizer.transform(uniques)[codes]
+
+
+def _holdout_mask(chunk: pd.DataFrame, holdout_mod: int) -> np.ndarray:
+    # Deterministic split on event_id, so every pass sees the same train/holdout rows.
+    return (chunk["event_id"].to_numpy(dtype=np.int64) % holdout_mod) == 0
+
+
+def _fold_scaler_into_model(model: SGDClassifier, scaler: StandardScaler, n_prefix: int) -> None:
+    # Rewrite coefficients for raw (unscaled) numeric inputs so the bundle stays a plain
+    # linear model for `explain_event` and `_tabular_explain`.
+    coef = model.coef_.copy()
+    num_coef = coef[:, n_prefix:] / scaler.scale_
+    model.intercept_ = model.intercept_ - (num_coef * scaler.mean_).sum(axis=1)
+    coef[:, n_prefix:] = num_coef
+    model.coef_ = coef
+
+
+def _top_hashed_ngrams(
+    vectorizer: HashingVectorizer, coef: np.ndarray, candidates: set[str], limit: int = 20
+) -> list[str]:
+    if not candidates:
+        return []
+    ordered = sorted(candidates)
+    probe = HashingVectorizer(
+        n_features=vectorizer.n_features, alternate_sign=False, norm=None, analyzer=lambda ng: [ng]
+    )
+    index = probe.transform(ordered).tocsr().indices
+    weights = coef[index]
+    top_idx = np.argsort(weights)[-limit:]
+    return [ordered[i] for i in top_idx]
+
+
+def train_streaming(cfg: dict[str, Any]) -> dict:
+    stream_cfg = cfg["streaming"]
+    paths = resolve_event_paths(str(stream_cfg["input_path"]))
+    chunk_size = int(stream_cfg.get("chunk_size", 50_000))
+    epochs = int(stream_cfg.get("epochs", 2))
+    holdout_mod = int(stream_cfg.get("holdout_mod", 5))
+    max_holdout_rows = int(stream_cfg.get("max_holdout_rows", 200_000))
+    alpha = float(stream_cfg.get("alpha", 1e-5))
+    random_state = int(cfg["dataset"]["random_state"])
+
+    text_vectorizer = HashingVectorizer(
+        ngram_range=(1, 2),
+        n_features=int(stream_cfg.get("hashing_features", 2**18)),
+        alternate_sign=False,
+        dtype=np.float32,
+    )
+    analyzer = text_vectorizer.build_analyzer()
+    num_cols = list(TABULAR_NUM_COLS)
+
+    # Pass 1: graph stats, country vocabulary, n-gram candidates and a bounded holdout.
+    graph_acc = GraphStatsAccumulator(target_col="is_fraud")
+    countries: set[str] = set()
+    ngram_candidates: set[str] = set()
+    holdout_parts: list[pd.DataFrame] = []
+    holdout_rows = 0
+    for raw_chunk in iter_event_chunks(paths, chunk_size=chunk_size):
+        chunk = _prepare_chunk(raw_chunk)
+        is_holdout = _holdout_mask(chunk, holdout_mod)
+        train_part = chunk[~is_holdout]
+        graph_acc.update(train_part)
+        countries.update(train_part["country"].astype(str).unique().tolist())
+        if len(ngram_candidates) < MAX_NGRAM_CANDIDATES:
+            for text in train_part["message_text"].unique()[:1000]:
+                ngram_candidates.update(analyzer(text))
+        if holdout_rows < max_holdout_rows:
+            part = chunk[is_holdout].head(max_holdout_rows - holdout_rows)
+            holdout_parts.append(part)
+            holdout_rows += len(part)
+    graph_stats = graph_acc.finalize()
+    if graph_acc.rows_seen == 0:
+        raise ValueError("Streaming training found no training rows.")
+
+    country_encoder = OneHotEncoder(handle_unknown="ignore", sparse_output=False)
+    country_encoder.fit(pd.DataFrame({"country": sorted(countries)}))
+
+    def _tabular_block(frame: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+        enriched = enrich_with_graph_features(frame, graph_stats)
+        x_country = country_encoder.transform(frame[["country"]].astype(str))
+        return x_country, enriched[num_cols].to_numpy(dtype=float)
+
+    # Pass 2: running mean/variance of the numeric block for SGD conditioning.
+    scaler = StandardScaler()
+    for raw_chunk in iter_event_chunks(paths, chunk_size=chunk_size):
+        chunk = _prepare_chunk(raw_chunk)
+        train_part = chunk[~_holdout_mask(chunk, holdout_mod)]
+        if not train_part.empty:
+            scaler.partial_fit(_tabular_block(train_part)[1])
+    scaler.scale_ = np.where(scaler.scale_ > 0, scaler.scale_, 1.0)
+
+    text_model = SGDClassifier(loss="log_loss", alpha=alpha, random_state=random_state)
+    tabular_model = SGDClassifier(loss="log_loss", alpha=alpha, random_state=random_state)
+    classes = np.array([0, 1])
+    for _ in range(epochs):
+        for raw_chunk in iter_event_chunks(paths, chunk_size=chunk_size):
+            chunk = _prepare_chunk(raw_chunk)
+            train_part = chunk[~_holdout_mask(chunk, holdout_mod)]
+            if train_part.empty:
+                continue
+            y = train_part["is_fraud"].to_numpy(dtype=int)
+            text_model.partial_fit(
+                _hash_texts(text_vectorizer, train_part["message_text"]), y, classes=classes
+            )
+            x_country, x_num = _tabular_block(train_part)
+            tabular_model.partial_fit(
+                np.hstack([x_country, scaler.transform(x_num)]), y, classes=classes
+            )
+
+    n_country = len(country_encoder.get_feature_names_out(["country"]))
+    _fold_scaler_into_model(tabular_model, scaler, n_prefix=n_country)
+
+    ensemble_weights = {"text": 0.45, "tabular": 0.55}
+    pr_auc = 0.0
+    recall_at_90p = 0.0
+    drift_baseline = build_drift_baseline({})
+    if holdout_parts:
+        holdout = pd.concat(holdout_parts, ignore_index=True)
+        y_test = holdout["is_fraud"].to_numpy(dtype=int)
+        x_country, x_num = _tabular_block(holdout)
+        x_text = _hash_texts(text_vectorizer, holdout["message_text"])
+        y_score_text = text_model.predict_proba(x_text)[:, 1]
+        y_score_tabular = tabular_model.predict_proba(np.hstack([x_country, x_num]))[:, 1]
+        y_score = (
+            ensemble_weights["text"] * y_score_text + ensemble_weights["tabular"] * y_score_tabular
+        )
+        if len(np.unique(y_test)) > 1:
+            pr_auc = float(average_precision_score(y_test, y_score))
+            recall_at_90p = _recall_at_precision(y_test, y_score, target_precision=0.9)
+        drift_baseline = build_drift_baseline(
+            {**{col: x_num[:, i] for i, col in enumerate(num_cols)}, "risk_score": y_score}
+        )
+
+    country_feature_names = [
+        str(name) for name in country_encoder.get_feature_names_out(["country"])
+    ]
+    return {
+        "text_model": text_model,
+        "tabular_model": tabular_model,
+        "text_vectorizer": text_vectorizer,
+        "country_encoder": country_encoder,
+        "graph_stats": graph_stats,
+        "ensemble_weights": ensemble_weights,
+        "top_ngrams": _top_hashed_ngrams(text_vectorizer, text_model.coef_[0], ngram_candidates),
+        "tabular_feature_names": country_feature_names + num_cols,
+        "model_version": f"ts-{int(time.time())}",
+        "metrics": {
+            "pr_auc": float(pr_auc),
+            "recall_at_precision_0_90": float(recall_at_90p),
+        },
+        "meta": {
+            "num_cols": num_cols,
+            "training_mode": "streaming",
+            "rows_seen": int(graph_acc.rows_seen),
+            "holdout_rows": int(holdout_rows),
+        },
+        "drift_baseline": drift_baseline,
+    }
@@ -14,7 +14,14 @@ from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import OneHotEncoder
 
 from trustshield.features import build_graph_stats, enrich_with_graph_features
-from trustshield.ingestion import generate_synthetic_events
+from trustshield.features.velocity import (
+    DEFAULT_BUCKETS_PER_WINDOW,
+    DEFAULT_WINDOWS_SECONDS,
+    replay_velocity_features,
+)
+from trustshield.ingestion import generate_synthetic_events, read_events
+from trustshield.models.infer import TABULAR_NUM_COLS
+from trustshield.monitoring.drift import build_drift_baseline
 from trustshield.preprocessing import normalize_text, validate_events
 
 
@@ -46,6 +53,7 @@ def _maybe_log_mlflow(cfg: dict, metrics: dict[str, float], artifact_path: Path)
     with mlflow.start_run(run_name="train_ensemble"):
         mlflow.log_params(
             {
+                "training_mode": cfg.get("training", {}).get("mode", "batch"),
                 "n_samples": cfg["dataset"]["n_samples"],
                 "random_state": cfg["dataset"]["random_state"],
                 "max_features_tfidf": cfg["model"]["max_features_tfidf"],
@@ -57,17 +65,29 @@ def _maybe_log_mlflow(cfg: dict, metrics: dict[str, float], artifact_path: Path)
             mlflow.log_artifact(str(artifact_path))
 
 
-def train() -> dict:
-    cfg = _load_training_config(Path("configs/training.yaml"))
-    n_samples = int(cfg["dataset"]["n_samples"])
-    random_state = int(cfg["dataset"]["random_state"])
-    max_features_tfidf = int(cfg["model"]["max_features_tfidf"])
-    c = float(cfg["model"]["c"])
-
-    df = generate_synthetic_events(n_samples=n_samples, random_state=random_state)
-    df["message_text"] = df["message_text"].map(normalize_text)
-    validate_events(df)
-
+def fit_ensemble(
+    df: pd.DataFrame,
+    max_features_tfidf: int = 3000,
+    c: float = 2.0,
+    random_state: int = 42,
+    velocity_windows_seconds: list[int] | None = None,
+    velocity_buckets: int = DEFAULT_BUCKETS_PER_WINDOW,
+) -> dict:
+    velocity_cols: list[str] = []
+    meta: dict = {}
+    if "event_ts" in df.columns:
+        # Replayed over all events in time order, before the split: at serving time the store
+        # sees every event, whichever side of the split it landed on here. The windows go into
+        # the bundle so serving builds its store the same way.
+        velocity = replay_velocity_features(df, velocity_windows_seconds, buckets=velocity_buckets)
+        velocity_cols = list(velocity.columns)
+        df = pd.concat([df, velocity], axis=1)
+        meta["velocity"] = {
+            "windows_seconds": [
+                int(window) for window in velocity_windows_seconds or DEFAULT_WINDOWS_SECONDS
+            ],
+            "buckets_per_window": int(velocity_buckets),
+        }
     x_train, x_test, y_train, y_test = train_test_split(
         df.drop(columns=["is_fraud", "event_id"]),
         df["is_fraud"],
@@ -82,63 +102,49 @@ def train() -> dict:
     x_train = enrich_with_graph_features(x_train, graph_stats)
     x_test = enrich_with_graph_features(x_test, graph_stats)
 
-    text_vectorizer = TfidfVectorizer(ngram_range=(1, 2), max_features=max_features_tfidf)
-    x_text_train = text_vectorizer.fit_transform(x_train["message_text"]).toarray()
-    x_text_test = text_vectorizer.transform(x_test["message_text"]).toarray()
+    # TF-IDF stays a float32 CSR matrix end to end; LogisticRegression fits it directly.
+    text_vectorizer = TfidfVectorizer(
+        ngram_range=(1, 2), max_features=max_features_tfidf, dtype=np.float32
+    )
+    x_text_train = text_vectorizer.fit_transform(x_train["message_text"])
+    x_text_test = text_vectorizer.transform(x_test["message_text"])
     text_model = LogisticRegression(C=c, max_iter=1000, n_jobs=None)
-    text_model.fit(pd.DataFrame(x_text_train), y_train)
+    text_model.fit(x_text_train, y_train)
 
     country_encoder = OneHotEncoder(handle_unknown="ignore", sparse_output=False)
     x_country_train = country_encoder.fit_transform(x_train[["country"]])
     x_country_test = country_encoder.transform(x_test[["country"]])
 
-    num_cols = [
-        "payment_attempts",
-        "account_age_days",
-        "device_reuse_count",
-        "chargeback_history",
-        "graph_device_id_degree",
-        "graph_ip_id_degree",
-        "graph_card_id_degree",
-        "graph_device_id_pagerank",
-        "graph_ip_id_pagerank",
-        "graph_card_id_pagerank",
-        "graph_device_id_component_size",
-        "graph_ip_id_component_size",
-        "graph_card_id_component_size",
-        "graph_max_entity_fraud_rate",
-        "graph_mean_entity_degree",
-        "graph_max_entity_pagerank",
-        "graph_min_component_size",
-    ]
+    num_cols = list(TABULAR_NUM_COLS) + velocity_cols
     x_num_train = x_train[num_cols].to_numpy(dtype=float)
     x_num_test = x_test[num_cols].to_numpy(dtype=float)
 
+    # The tabular block is a handful of dense columns; a plain ndarray is smaller than CSR here.
     x_train_all = np.hstack([x_country_train, x_num_train])
     x_test_all = np.hstack([x_country_test, x_num_test])
     country_feature_names = [str(name) for name in country_encoder.get_feature_names_out(["country"])]
     tabular_feature_names = country_feature_names + num_cols
 
     tabular_model = LogisticRegression(C=c, max_iter=1000, n_jobs=None)
-    tabular_model.fit(pd.DataFrame(x_train_all), y_train)
+    tabular_model.fit(x_train_all, y_train)
 
-    y_score_text = text_model.predict_proba(pd.DataFrame(x_text_test))[:, 1]
-    y_score_tabular = tabular_model.predict_proba(pd.DataFrame(x_test_all))[:, 1]
+    y_score_text = text_model.predict_proba(x_text_test)[:, 1]
+    y_score_tabular = tabular_model.predict_proba(x_test_all)[:, 1]
     ensemble_weights = {"text": 0.45, "tabular": 0.55}
     y_score = ensemble_weights["text"] * y_score_text + ensemble_weights["tabular"] * y_score_tabular
     pr_auc = average_precision_score(y_test, y_score)
     recall_at_90p = _recall_at_precision(y_test.to_numpy(), y_score, target_precision=0.9)
 
-    artifact_path = Path(cfg["output"]["artifact_path"])
-    artifact_path.parent.mkdir(parents=True, exist_ok=True)
-    model_version = f"ts-{int(time.time())}"
-
     ngram_names = np.array(text_vectorizer.get_feature_names_out())
     text_coef = text_model.coef_[0]
     top_idx = np.argsort(text_coef)[-20:]
     top_ngrams = [str(ngram_names[i]) for i in top_idx]
+    # Reference histograms for live drift; the holdout stands in for serving traffic.
+    drift_baseline = build_drift_baseline(
+        {**{col: x_num_test[:, i] for i, col in enumerate(num_cols)}, "risk_score": y_score}
+    )
 
-    bundle = {
+    return {
         "text_model": text_model,
         "tabular_model": tabular_model,
         "text_vectorizer": text_vectorizer,
@@ -147,15 +153,22 @@ def train() -> dict:
         "ensemble_weights": ensemble_weights,
         "top_ngrams": top_ngrams,
         "tabular_feature_names": tabular_feature_names,
-        "model_version": model_version,
+        "model_version": f"ts-{int(time.time())}",
         "metrics": {
             "pr_auc": float(pr_auc),
             "recall_at_precision_0_90": float(recall_at_90p),
         },
-        "meta": {"num_cols": num_cols},
+        "meta": {"num_cols": num_cols, **meta},
+        "drift_baseline": drift_baseline,
     }
+
+
+def _save_bundle(bundle: dict, artifact_path: Path) -> None:
+    artifact_path.parent.mkdir(parents=True, exist_ok=True)
     joblib.dump(bundle, artifact_path)
 
+    pr_auc = bundle["metrics"]["pr_auc"]
+    recall_at_90p = bundle["metrics"]["recall_at_precision_0_90"]
     metrics_path = Path("reports/metrics.json")
     metrics_path.parent.mkdir(parents=True, exist_ok=True)
     metrics_path.write_text(
@@ -170,12 +183,47 @@ def train() -> dict:
 
     print(f"Saved model bundle to {artifact_path}")
     print(f"PR-AUC: {pr_auc:.4f} | Recall@P>=0.90: {recall_at_90p:.4f}")
-    _maybe_log_mlflow(
-        cfg,
-        {"pr_auc": float(pr_auc), "recall_at_precision_0_90": float(recall_at_90p)},
-        artifact_path,
-    )
 
+
+def train() -> dict:
+    cfg = _load_training_config(Path("configs/training.yaml"))
+    mode = str(cfg.get("training", {}).get("mode", "batch"))
+    if mode == "streaming":
+        from trustshield.models.streaming import train_streaming
+
+        bundle = train_streaming(cfg)
+        artifact_path = Path(cfg["output"]["artifact_path"])
+        _save_bundle(bundle, artifact_path)
+        _maybe_log_mlflow(cfg, dict(bundle["metrics"]), artifact_path)
+        return bundle
+    if mode != "batch":
+        raise ValueError(f"Unknown training mode {mode!r}; expected 'batch' or 'streaming'.")
+
+    n_samples = int(cfg["dataset"]["n_samples"])
+    random_state = int(cfg["dataset"]["random_state"])
+    max_features_tfidf = int(cfg["model"]["max_features_tfidf"])
+    c = float(cfg["model"]["c"])
+
+    dataset_path = cfg["dataset"].get("path")
+    if dataset_path:
+        df = read_events(dataset_path)
+    else:
+        df = generate_synthetic_events(n_samples=n_samples, random_state=random_state)
+    df["message_text"] = df["message_text"].map(normalize_text)
+    validate_events(df)
+
+    velocity_cfg = cfg.get("velocity", {})
+    bundle = fit_ensemble(
+        df,
+        max_features_tfidf=max_features_tfidf,
+        c=c,
+        random_state=random_state,
+        velocity_windows_seconds=velocity_cfg.get("windows_seconds"),
+        velocity_buckets=int(velocity_cfg.get("buckets_per_window", DEFAULT_BUCKETS_PER_WINDOW)),
+    )
+    artifact_path = Path(cfg["output"]["artifact_path"])
+    _save_bundle(bundle, artifact_path)
+    _maybe_log_mlflow(cfg, dict(bundle["metrics"]), artifact_path)
     return bundle
 
 
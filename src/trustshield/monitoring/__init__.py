@@ -1,4 +1,26 @@
-from .dashboard import build_dashboard_html
-from .report import generate_monitoring_report
+from __future__ import annotations
 
-__all__ = ["generate_monitoring_report", "build_dashboard_html"]
+from typing import Any
+
+from .drift import StreamingDriftMonitor, build_drift_baseline
+
+__all__ = [
+    "generate_monitoring_report",
+    "build_dashboard_html",
+    "StreamingDriftMonitor",
+    "build_drift_baseline",
+]
+
+
+def __getattr__(name: str) -> Any:
+    # The report builders pull in sklearn.metrics; serving only needs the drift monitor at
+    # import time, so they load on first access.
+    if name == "generate_monitoring_report":
+        from .report import generate_monitoring_report
+
+        return generate_monitoring_report
+    if name == "build_dashboard_html":
+        from .dashboard import build_dashboard_html
+
+        return build_dashboard_html
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
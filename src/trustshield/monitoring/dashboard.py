@@ -10,9 +10,26 @@ def _read_json(path: Path) -> dict:
     return json.loads(path.read_text(encoding="utf-8"))
 
 
+def _slice_tables(cube: dict) -> str:
+    tables = []
+    for name, segments in cube.get("dimensions", {}).items():
+        rows = "".join(
+            f"<tr><td>{label}</td><td>{s['n']}</td><td>{s['fp']}</td><td>{s['fn']}</td>"
+            f"<td>{s['precision']}</td><td>{s['recall']}</td></tr>"
+            for label, s in segments.items()
+        )
+        tables.append(
+            f"<h3>{name}</h3><table><tr><th>segment</th><th>n</th><th>FP</th><th>FN</th>"
+            f"<th>precision</th><th>recall</th></tr>{rows}</table>"
+        )
+    return "".join(tables)
+
+
 def build_dashboard_html() -> Path:
     monitoring = _read_json(Path("reports/monitoring.json"))
     errors = _read_json(Path("reports/error_analysis.json"))
+    cube = errors.pop("cube", {})
+    slices = _slice_tables(cube) or "<p class='muted'>Run `make error-analysis` first.</p>"
 
     html = f"""<!doctype html>
 <html lang="en">
@@ -26,6 +43,8 @@ def build_dashboard_html() -> Path:
     .kpi {{ font-size: 20px; font-weight: 600; }}
     .muted {{ color: #6b7280; }}
     pre {{ white-space: pre-wrap; }}
+    table {{ border-collapse: collapse; margin-bottom: 12px; }}
+    td, th {{ border: 1px solid #e5e7eb; padding: 4px 8px; text-align: right; }}
   </style>
 </head>
 <body>
@@ -46,6 +65,11 @@ def build_dashboard_html() -> Path:
     <p>False negatives: {errors.get("counts", {}).get("false_negatives", "n/a")}</p>
     <pre>{json.dumps(errors, indent=2)}</pre>
   </div>
+
+  <div class="card">
+    <h2>Error Slices (threshold {cube.get("threshold", "n/a")})</h2>
+    {slices}
+  </div>
 </body>
 </html>
 """
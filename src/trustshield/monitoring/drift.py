@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import threading
+from bisect import bisect_right
+from typing import Any
+
+import numpy as np
+
+DEFAULT_DRIFT_BINS = 10
+DEFAULT_HALF_LIFE_EVENTS = 50_000
+DEFAULT_MIN_EVENTS = 200
+PSI_EPSILON = 1e-4
+
+
+def build_drift_baseline(
+    columns: dict[str, np.ndarray], n_bins: int = DEFAULT_DRIFT_BINS
+) -> dict[str, Any]:
+    # Quantile edges from the training reference; discrete features collapse duplicate edges,
+    # so a binary flag ends up with two bins instead of ten mostly empty ones.
+    features: dict[str, Any] = {}
+    for name, values in columns.items():
+        values = np.asarray(values, dtype=float)
+        values = values[np.isfinite(values)]
+        if len(values) == 0:
+            continue
+        edges = np.unique(np.quantile(values, np.linspace(0, 1, n_bins + 1)[1:-1]))
+        edges = edges[edges > values.min()]
+        bins = np.searchsorted(edges, values, side="right")
+        counts = np.bincount(bins, minlength=len(edges) + 1)
+        features[name] = {"edges": edges.tolist(), "counts": counts.astype(int).tolist()}
+    return {"n_bins": n_bins, "features": features}
+
+
+def _proportions(counts: np.ndarray) -> np.ndarray:
+    counts = np.asarray(counts, dtype=float)
+    return counts / max(float(counts.sum()), 1.0)
+
+
+def psi(expected: np.ndarray, actual: np.ndarray) -> float:
+    p = np.maximum(_proportions(expected), PSI_EPSILON)
+    q = np.maximum(_proportions(actual), PSI_EPSILON)
+    return float(np.sum((q - p) * np.log(q / p)))
+
+
+def binned_ks(expected: np.ndarray, actual: np.ndarray) -> float:
+    # KS over the shared bins: a lower bound on the exact statistic, exact at the bin edges.
+    p = np.cumsum(_proportions(expected))
+    q = np.cumsum(_proportions(actual))
+    return float(np.max(np.abs(p - q)))
+
+
+class StreamingDriftMonitor:
+    def __init__(
+        self,
+        baseline: dict[str, Any],
+        half_life_events: int = DEFAULT_HALF_LIFE_EVENTS,
+        min_events: int = DEFAULT_MIN_EVENTS,
+    ) -> None:
+        self.baseline = baseline
+        self.half_life_events = int(half_life_events)
+        self.min_events = int(min_events)
+        self._edges = {name: spec["edges"] for name, spec in baseline["features"].items()}
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts = {name: [0.0] * (len(edges) + 1) for name, edges in self._edges.items()}
+            self._weight = 0.0
+            self.events_seen = 0
+
+    def update(self, values: dict[str, float]) -> None:
+        # Per request: one bisect and one add per feature under the lock.
+        bins = [
+            (name, bisect_right(edges, float(values[name])))
+            for name, edges in self._edges.items()
+            if name in values
+        ]
+        with self._lock:
+            for name, idx in bins:
+                self._counts[name][idx] += 1.0
+            self._weight += 1.0
+            self.events_seen += 1
+            if self._weight >= 2 * self.half_life_events:
+                # Halving keeps memory fixed and lets old traffic fade instead of piling up.
+                for counts in self._counts.values():
+                    counts[:] = [count * 0.5 for count in counts]
+                self._weight *= 0.5
+
+    def update_batch(self, columns: dict[str, np.ndarray]) -> None:
+        # Whole columns at once: one searchsorted and bincount per feature, one lock round.
+        binned: dict[str, np.ndarray] = {}
+        n_events = 0
+        for name, edges in self._edges.items():
+            if name in columns:
+                values = np.asarray(columns[name], dtype=float)
+                bins = np.searchsorted(np.asarray(edges, dtype=float), values, side="right")
+                binned[name] = np.bincount(bins, minlength=len(edges) + 1)
+                n_events = len(values)
+        if not n_events:
+            return
+        with self._lock:
+            for name, counts in binned.items():
+                current = self._counts[name]
+                current[:] = [old + float(add) for old, add in zip(current, counts)]
+            self._weight += float(n_events)
+            self.events_seen += n_events
+            while self._weight >= 2 * self.half_life_events:
+                for counts in self._counts.values():
+                    counts[:] = [count * 0.5 for count in counts]
+                self._weight *= 0.5
+
+    def snapshot(self, psi_alert: float = 0.2) -> dict[str, Any]:
+        with self._lock:
+            counts = {name: np.array(values) for name, values in self._counts.items()}
+            weight = self._weight
+            events_seen = self.events_seen
+        features: dict[str, Any] = {}
+        for name, live in counts.items():
+            reference = np.asarray(self.baseline["features"][name]["counts"], dtype=float)
+            features[name] = {
+                "psi": round(psi(reference, live), 4),
+                "ks": round(binned_ks(reference, live), 4),
+            }
+        max_psi = max((f["psi"] for f in features.values()), default=0.0)
+        if events_seen < self.min_events:
+            status = "insufficient_data"
+        else:
+            status = "ok" if max_psi < psi_alert else "warn"
+        return {
+            "drift_status": status,
+            "events_seen": int(events_seen),
+            "effective_events": round(weight, 1),
+            "max_psi": round(max_psi, 4),
+            "psi_threshold": float(psi_alert),
+            "drifted_features": sorted(
+                (name for name, f in features.items() if f["psi"] >= psi_alert),
+                key=lambda name: features[name]["psi"],
+                reverse=True,
+            ),
+            "features": features,
+        }
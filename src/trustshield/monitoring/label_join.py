@@ -0,0 +1,645 @@
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import shutil
+import tempfile
+import time
+from collections.abc import Callable, Iterable, Iterator
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from trustshield.ingestion.readers import (
+    DEFAULT_CHUNK_SIZE,
+    iter_event_chunks,
+    resolve_event_paths,
+)
+from trustshield.ingestion.writers import FrameWriter
+from trustshield.serving.prediction_log import (
+    _parquet_available,
+    iter_prediction_log,
+    list_segments,
+)
+
+DECISIONS = ["allow", "review", "block"]
+DEFAULT_SCORE_BINS = 1000
+DEFAULT_STATE_PATH = "reports/label_join_state.npz"
+DEFAULT_PENDING_DIR = "reports/label_join_state_pending"
+SCAN_BLOCK_BYTES = 1 << 20
+DEFAULT_MAX_LABEL_DELAY_DAYS = 90
+SECONDS_PER_DAY = 86_400
+JOIN_COLUMNS = ["event_id", "logged_at", "risk_score", "decision"]
+PENDING_PREFIX = "pending-"
+# Arrays carried between runs: events already joined (kept sorted by id so retries are dropped)
+# and labels still waiting for a closed segment. Predictions still waiting for a label are
+# kept on disk, next to the state, in the pending files listed in its meta.
+STATE_ARRAYS = {
+    "matched_id": np.int64,
+    "matched_at": np.float64,
+    "label_id": np.int64,
+    "label_value": np.int8,
+}
+
+
+def load_labels(
+    path: str | Path | list[str | Path],
+    label_col: str = "is_fraud",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> tuple[np.ndarray, np.ndarray]:
+    # Labels shrink to two flat arrays sorted by event_id (9 bytes per label); the prediction
+    # side is never materialized. A relabel of the same event_id keeps the latest row.
+    ids: list[np.ndarray] = []
+    values: list[np.ndarray] = []
+    for chunk in iter_event_chunks(
+        path, chunk_size=chunk_size, columns=["event_id", label_col], compact=False
+    ):
+        ids.append(chunk["event_id"].to_numpy(dtype=np.int64))
+        values.append(chunk[label_col].to_numpy(dtype=np.int8))
+    if not ids:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int8)
+    return _keep_latest(np.concatenate(ids), np.concatenate(values))
+
+
+def _keep_latest(ids: np.ndarray, values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    order = np.argsort(ids, kind="stable")
+    sorted_ids = ids[order]
+    last_of_run = np.append(sorted_ids[1:] != sorted_ids[:-1], True)
+    return sorted_ids[last_of_run], values[order][last_of_run]
+
+
+def _empty_day(n_bins: int) -> dict[str, np.ndarray]:
+    return {
+        "hist": np.zeros((2, n_bins), dtype=np.int64),
+        "decisions": np.zeros((len(DECISIONS), 2), dtype=np.int64),
+    }
+
+
+def _fold(
+    days: dict[int, dict[str, np.ndarray]],
+    y: np.ndarray,
+    scores: np.ndarray,
+    decision: np.ndarray,
+    logged_at: np.ndarray,
+    n_bins: int,
+) -> None:
+    # Labeled predictions into per-day score histograms and decision x label counts; decision
+    # codes index DECISIONS, and -1 (unknown) only counts in the histogram.
+    y = y.astype(np.int64)
+    score_bin = np.clip((scores * n_bins).astype(np.int64), 0, n_bins - 1)
+    day = (logged_at // SECONDS_PER_DAY).astype(np.int64)
+    for day_key in np.unique(day):
+        in_day = day == day_key
+        acc = days.setdefault(int(day_key), _empty_day(n_bins))
+        acc["hist"] += np.bincount(
+            y[in_day] * n_bins + score_bin[in_day], minlength=2 * n_bins
+        ).reshape(2, n_bins)
+        known = in_day & (decision >= 0)
+        acc["decisions"] += np.bincount(
+            decision[known] * 2 + y[known], minlength=2 * len(DECISIONS)
+        ).reshape(len(DECISIONS), 2)
+
+
+def _decision_codes(values: np.ndarray) -> np.ndarray:
+    return pd.Categorical(values, categories=DECISIONS).codes.astype(np.int8)
+
+
+def join_predictions(
+    chunks: Iterable[pd.DataFrame],
+    label_ids: np.ndarray,
+    label_values: np.ndarray,
+    n_bins: int = DEFAULT_SCORE_BINS,
+    days: dict[int, dict[str, np.ndarray]] | None = None,
+    matched_at: np.ndarray | None = None,
+    joined_ids: np.ndarray | None = None,
+    unmatched: Callable[[pd.DataFrame], None] | None = None,
+) -> dict[str, Any]:
+    # Each prediction chunk is probed against the sorted label keys with one searchsorted;
+    # matches fold into per-day score histograms and decision x label counts. `matched_at`
+    # holds, per label, the logged_at of the prediction folded for it (NaN until then); pass
+    # the same array to several calls to join them against one label set. Predictions of an
+    # event in the sorted `joined_ids` were folded by an earlier run and count as duplicates;
+    # rows without a label go to `unmatched`.
+    if days is None:
+        days = {}
+    if matched_at is None:
+        matched_at = np.full(len(label_ids), np.nan)
+    scanned = 0
+    labeled = 0
+    duplicates = 0
+    for chunk in chunks:
+        scanned += len(chunk)
+        event_ids = chunk["event_id"].to_numpy(dtype=np.int64)
+        pos = np.searchsorted(label_ids, event_ids).clip(0, max(len(label_ids) - 1, 0))
+        hit = (label_ids[pos] == event_ids) if len(label_ids) else np.zeros(len(chunk), bool)
+        joined = np.zeros(len(chunk), dtype=bool)
+        if joined_ids is not None:
+            joined = ~hit & _in_sorted(joined_ids, event_ids)
+        rows = np.flatnonzero(hit)
+        # Keep the first logged prediction per event: that is the decision that was acted on.
+        _, first = np.unique(pos[rows], return_index=True)
+        first_rows = rows[first]
+        fresh = first_rows[np.isnan(matched_at[pos[first_rows]])]
+        duplicates += len(rows) - len(fresh) + int(joined.sum())
+        if unmatched is not None and not (hit | joined).all():
+            unmatched(chunk[~(hit | joined)])
+        if not len(fresh):
+            continue
+
+        logged_at = chunk["logged_at"].to_numpy(dtype=float)[fresh]
+        matched_at[pos[fresh]] = logged_at
+        labeled += len(fresh)
+        _fold(
+            days,
+            label_values[pos[fresh]],
+            chunk["risk_score"].to_numpy(dtype=float)[fresh],
+            _decision_codes(chunk["decision"].to_numpy()[fresh]),
+            logged_at,
+            n_bins,
+        )
+    return {
+        "scanned": scanned,
+        "labeled": labeled,
+        "duplicates": duplicates,
+        "days": days,
+    }
+
+
+def histogram_quality(
+    hist: np.ndarray, decisions: np.ndarray, target_precision: float = 0.9
+) -> dict[str, Any]:
+    # Every bin edge is a threshold; with 1000 bins this tracks sklearn's average precision
+    # to about three decimals without keeping any per-event scores.
+    legit = hist[0][::-1].cumsum()
+    fraud = hist[1][::-1].cumsum()
+    n_fraud = int(fraud[-1]) if len(fraud) else 0
+    n = int(hist.sum())
+    precision = fraud / np.maximum(fraud + legit, 1)
+    recall = fraud / max(n_fraud, 1)
+    pr_auc = float(np.sum(np.diff(np.concatenate([[0.0], recall])) * precision))
+    reachable = recall[precision >= target_precision]
+    out: dict[str, Any] = {
+        "n": n,
+        "fraud": n_fraud,
+        "fraud_rate": round(n_fraud / max(n, 1), 4),
+        "pr_auc": round(pr_auc, 4) if n_fraud else None,
+        f"recall_at_precision_{target_precision:.2f}".replace(".", "_"): (
+            round(float(reachable.max()), 4) if len(reachable) else 0.0
+        ),
+        "decisions": {},
+    }
+    for i, name in enumerate(DECISIONS):
+        total = int(decisions[i].sum())
+        out["decisions"][name] = {
+            "n": total,
+            "fraud": int(decisions[i][1]),
+            "precision": round(int(decisions[i][1]) / total, 4) if total else None,
+        }
+    return out
+
+
+def _sum_days(days: list[dict[str, np.ndarray]], n_bins: int) -> dict[str, np.ndarray]:
+    total = _empty_day(n_bins)
+    for day in days:
+        total["hist"] += day["hist"]
+        total["decisions"] += day["decisions"]
+    return total
+
+
+def _empty_state(n_bins: int) -> dict[str, Any]:
+    return {
+        "meta": {
+            "n_bins": int(n_bins),
+            "segments": [],
+            "label_files": {},
+            "pending": [],
+            "newest_logged_at": None,
+            "counters": {
+                "scanned": 0,
+                "labels_loaded": 0,
+                "labeled": 0,
+                "duplicates": 0,
+                "late_labels": 0,
+                "expired": 0,
+            },
+        },
+        "days": {},
+        "arrays": {name: np.zeros(0, dtype=dtype) for name, dtype in STATE_ARRAYS.items()},
+    }
+
+
+def load_join_state(path: str | Path, n_bins: int = DEFAULT_SCORE_BINS) -> dict[str, Any]:
+    path = Path(path)
+    if not path.exists():
+        return _empty_state(n_bins)
+    with np.load(path, allow_pickle=False) as data:
+        meta = json.loads(str(data["meta"]))
+        if meta["n_bins"] != n_bins:
+            raise ValueError(
+                f"{path} holds histograms with {meta['n_bins']} score bins, not {n_bins}; "
+                "rebuild the join state to change the bin count"
+            )
+        days = {
+            int(day): {"hist": hist, "decisions": decisions}
+            for day, hist, decisions in zip(
+                data["day_keys"].tolist(), data["day_hist"], data["day_decisions"]
+            )
+        }
+        arrays = {name: data[name] for name in STATE_ARRAYS}
+    return {"meta": meta, "days": days, "arrays": arrays}
+
+
+def save_join_state(state: dict[str, Any], path: str | Path) -> None:
+    # Written under a temporary name and renamed, so a crash never leaves a torn state behind.
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    n_bins = state["meta"]["n_bins"]
+    keys = sorted(state["days"])
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    with tmp_path.open("wb") as f:
+        np.savez(
+            f,
+            meta=np.array(json.dumps(state["meta"])),
+            day_keys=np.array(keys, dtype=np.int64),
+            day_hist=np.array([state["days"][day]["hist"] for day in keys], dtype=np.int64).reshape(
+                len(keys), 2, n_bins
+            ),
+            day_decisions=np.array(
+                [state["days"][day]["decisions"] for day in keys], dtype=np.int64
+            ).reshape(len(keys), len(DECISIONS), 2),
+            **state["arrays"],
+        )
+    tmp_path.replace(path)
+
+
+def pending_dir_for(state_path: str | Path) -> Path:
+    # Pending predictions live in a directory next to the state file they belong to.
+    path = Path(state_path)
+    return path.with_name(f"{path.stem}_pending")
+
+
+class _ByteRange(io.RawIOBase):
+    # A read-only view of `remaining` bytes from the current position of `handle`.
+    def __init__(self, handle: Any, remaining: int) -> None:
+        self._handle = handle
+        self._remaining = remaining
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        n = self._handle.readinto(memoryview(buffer)[: self._remaining])
+        self._remaining -= n
+        return n
+
+
+def _label_file_end(path: Path) -> int:
+    # Parquet files are counted in rows; CSV/JSONL files in bytes up to the last full line, so
+    # a line still being appended is left for the next run.
+    if path.suffix.lower() == ".parquet":
+        import pyarrow.parquet as pq
+
+        return int(pq.ParquetFile(path).metadata.num_rows)
+    with path.open("rb") as f:
+        end = f.seek(0, io.SEEK_END)
+        while end > 0:
+            start = f.seek(max(end - SCAN_BLOCK_BYTES, 0))
+            newline = f.read(end - start).rfind(b"\n")
+            if newline >= 0:
+                return start + newline + 1
+            end = start
+    return 0
+
+
+def _iter_label_chunks(
+    path: Path, start: int, end: int, columns: list[str], chunk_size: int
+) -> Iterator[pd.DataFrame]:
+    if path.suffix.lower() == ".parquet":
+        import pyarrow.parquet as pq
+
+        # Whole row groups before `start` are skipped without being read.
+        parquet_file = pq.ParquetFile(path)
+        row_groups = []
+        skip = start
+        for i in range(parquet_file.metadata.num_row_groups):
+            rows = parquet_file.metadata.row_group(i).num_rows
+            if skip >= rows and not row_groups:
+                skip -= rows
+            else:
+                row_groups.append(i)
+        for batch in parquet_file.iter_batches(
+            batch_size=chunk_size, row_groups=row_groups, columns=columns
+        ):
+            if skip:
+                dropped = min(skip, batch.num_rows)
+                batch, skip = batch.slice(dropped), skip - dropped
+            if batch.num_rows:
+                yield batch.to_pandas()
+        return
+    with path.open("rb") as f:
+        f.seek(start)
+        stream = io.BufferedReader(_ByteRange(f, end - start))
+        if path.suffix.lower() in {".jsonl", ".ndjson"}:
+            for chunk in pd.read_json(stream, lines=True, chunksize=chunk_size):
+                yield chunk[columns]
+        elif start == 0:
+            yield from pd.read_csv(stream, usecols=columns, chunksize=chunk_size)
+        else:
+            # Appended rows start on a data line; the header comes from the top of the file.
+            names = list(pd.read_csv(path, nrows=0).columns)
+            yield from pd.read_csv(
+                stream, header=None, names=names, usecols=columns, chunksize=chunk_size
+            )
+
+
+def _read_new_labels(
+    labels_path: str | Path | list[str | Path],
+    offsets: dict[str, int],
+    label_col: str = "is_fraud",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> tuple[np.ndarray, np.ndarray, int]:
+    # Only rows past the offset recorded for each file are read, so a label file that is
+    # appended to costs its new rows. A file shorter than its offset was replaced and is
+    # read again from the top.
+    ids: list[np.ndarray] = []
+    values: list[np.ndarray] = []
+    files = 0
+    for path in resolve_event_paths(labels_path):
+        end = _label_file_end(path)
+        start = offsets.get(str(path), 0)
+        if start > end:
+            start = 0
+        if start == end:
+            continue
+        files += 1
+        for chunk in _iter_label_chunks(path, start, end, ["event_id", label_col], chunk_size):
+            ids.append(chunk["event_id"].to_numpy(dtype=np.int64))
+            values.append(chunk[label_col].to_numpy(dtype=np.int8))
+        offsets[str(path)] = end
+    if not ids:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int8), files
+    label_id, label_value = _keep_latest(np.concatenate(ids), np.concatenate(values))
+    return label_id, label_value, files
+
+
+def _in_sorted(sorted_ids: np.ndarray, ids: np.ndarray) -> np.ndarray:
+    if not len(sorted_ids):
+        return np.zeros(len(ids), dtype=bool)
+    pos = np.searchsorted(sorted_ids, ids).clip(0, len(sorted_ids) - 1)
+    return sorted_ids[pos] == ids
+
+
+class _PendingWriter:
+    # Unlabeled predictions, narrowed to the join columns, streamed into one new pending file.
+    def __init__(self, directory: Path) -> None:
+        suffix = ".parquet" if _parquet_available() else ".jsonl"
+        self.name = f"{PENDING_PREFIX}{time.time_ns()}{suffix}"
+        self.path = directory / self.name
+        self.rows = 0
+        self.newest: float | None = None
+        self._writer: FrameWriter | None = None
+
+    def write(self, frame: pd.DataFrame) -> None:
+        if self._writer is None:
+            self._writer = FrameWriter(self.path.with_name(f".open-{self.name}"))
+        frame = frame[JOIN_COLUMNS]
+        self._writer.write(frame)
+        self.rows += len(frame)
+        newest = float(frame["logged_at"].max())
+        self.newest = newest if self.newest is None else max(self.newest, newest)
+
+    def close(self) -> dict[str, Any] | None:
+        if self._writer is None:
+            return None
+        self._writer.close()
+        self._writer.path.replace(self.path)
+        return {"name": self.name, "rows": self.rows, "newest": self.newest}
+
+
+def update_join_state(
+    state: dict[str, Any],
+    labels_path: str | Path | list[str | Path],
+    log_dir: str | Path = "reports/prediction_log",
+    pending_dir: str | Path = DEFAULT_PENDING_DIR,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    label_col: str = "is_fraud",
+    max_label_delay_days: float = DEFAULT_MAX_LABEL_DELAY_DAYS,
+) -> dict[str, int]:
+    # Folds only what arrived since the last run: label files not seen before and prediction
+    # segments closed since. Predictions without a label yet are streamed to pending files in
+    # `pending_dir` and probed again only when new labels arrive; labels whose prediction is
+    # still in an open segment wait in the state. Memory follows the chunk size and the label
+    # and joined-id arrays, never the log or the pending predictions.
+    meta, arrays, days = state["meta"], state["arrays"], state["days"]
+    counters = meta["counters"]
+    n_bins = meta["n_bins"]
+    pending_dir = Path(pending_dir)
+    pending_dir.mkdir(parents=True, exist_ok=True)
+
+    ids, values, new_files = _read_new_labels(
+        labels_path, meta["label_files"], label_col=label_col, chunk_size=chunk_size
+    )
+    label_id, label_value = arrays["label_id"], arrays["label_value"]
+    new_labels = 0
+    if len(ids):
+        counters["labels_loaded"] += len(ids)
+        # A relabel of an event already folded into the histograms cannot be taken back out.
+        late = _in_sorted(arrays["matched_id"], ids)
+        counters["late_labels"] += int(late.sum())
+        new_labels = int((~late).sum())
+        label_id, label_value = _keep_latest(
+            np.concatenate([label_id, ids[~late]]), np.concatenate([label_value, values[~late]])
+        )
+
+    matched_at = np.full(len(label_id), np.nan)
+    join = {
+        "label_ids": label_id,
+        "label_values": label_value,
+        "n_bins": n_bins,
+        "days": days,
+        "matched_at": matched_at,
+        "joined_ids": arrays["matched_id"],
+    }
+    # Older predictions go first, so the first logged prediction per event is the one folded.
+    # Pending files were already probed against every earlier label; only new labels can match.
+    pending: list[dict[str, Any]] = []
+    for entry in meta["pending"]:
+        path = pending_dir / entry["name"]
+        if not new_labels:
+            pending.append(entry)
+            continue
+        writer = _PendingWriter(pending_dir)
+        chunks = iter_event_chunks(path, chunk_size=chunk_size, columns=JOIN_COLUMNS, compact=False)
+        result = join_predictions(chunks, unmatched=writer.write, **join)
+        counters["duplicates"] += result["duplicates"]
+        rewritten = writer.close()
+        if rewritten is not None and rewritten["rows"] == entry["rows"]:
+            # Nothing in this file was joined; keep it and drop the copy.
+            (pending_dir / rewritten["name"]).unlink()
+            pending.append(entry)
+            continue
+        path.unlink()
+        if rewritten is not None:
+            pending.append(rewritten)
+
+    processed = set(meta["segments"])
+    segments = [path for path in list_segments(log_dir) if path.name not in processed]
+    writer = _PendingWriter(pending_dir)
+    chunks = iter_prediction_log(
+        log_dir, chunk_size=chunk_size, columns=JOIN_COLUMNS, segments=segments
+    )
+    result = join_predictions(chunks, unmatched=writer.write, **join)
+    counters["scanned"] += result["scanned"]
+    counters["duplicates"] += result["duplicates"]
+    if (entry := writer.close()) is not None:
+        pending.append(entry)
+    meta["segments"].extend(path.name for path in segments)
+
+    hit = ~np.isnan(matched_at)
+    counters["labeled"] += int(hit.sum())
+    matched_id = np.concatenate([arrays["matched_id"], label_id[hit]])
+    matched_at = np.concatenate([arrays["matched_at"], matched_at[hit]])
+    order = np.argsort(matched_id, kind="stable")
+    matched_id, matched_at = matched_id[order], matched_at[order]
+
+    # Predictions that never get a label (most legitimate traffic) would otherwise pile up;
+    # pending files whose newest prediction is older than the label delay are dropped, and the
+    # joined ids kept to drop retries age out the same way.
+    newest = [meta["newest_logged_at"], *(entry["newest"] for entry in pending)]
+    if len(matched_at):
+        newest.append(float(matched_at.max()))
+    if any(value is not None for value in newest):
+        meta["newest_logged_at"] = max(value for value in newest if value is not None)
+    horizon = (meta["newest_logged_at"] or 0.0) - max_label_delay_days * SECONDS_PER_DAY
+    meta["pending"] = []
+    for entry in pending:
+        if entry["newest"] >= horizon:
+            meta["pending"].append(entry)
+        else:
+            counters["expired"] += entry["rows"]
+            (pending_dir / entry["name"]).unlink()
+    recent = matched_at >= horizon
+
+    state["arrays"] = {
+        "matched_id": matched_id[recent],
+        "matched_at": matched_at[recent],
+        "label_id": label_id[~hit],
+        "label_value": label_value[~hit],
+    }
+    return {"new_segments": len(segments), "new_label_files": new_files}
+
+
+def _baseline_pr_auc(metrics_path: Path) -> float | None:
+    if not metrics_path.exists():
+        return None
+    return json.loads(metrics_path.read_text(encoding="utf-8")).get("pr_auc")
+
+
+def run_label_join(
+    labels_path: str | Path | list[str | Path],
+    log_dir: str | Path = "reports/prediction_log",
+    window_days: int = 7,
+    n_bins: int = DEFAULT_SCORE_BINS,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    label_col: str = "is_fraud",
+    state_path: str | Path | None = DEFAULT_STATE_PATH,
+    rebuild: bool = False,
+    max_label_delay_days: float = DEFAULT_MAX_LABEL_DELAY_DAYS,
+) -> dict[str, Any]:
+    # Each run folds new label files and newly closed segments into the persisted state, so the
+    # cost follows what arrived since the last run rather than the whole log. `rebuild` (or no
+    # `state_path`) starts over from every label file and segment.
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory() as scratch:
+        pending_dir = Path(scratch) if state_path is None else pending_dir_for(state_path)
+        if state_path is None or rebuild:
+            state = _empty_state(n_bins)
+            shutil.rmtree(pending_dir, ignore_errors=True)
+        else:
+            state = load_join_state(state_path, n_bins)
+        fresh = update_join_state(
+            state,
+            labels_path,
+            log_dir=log_dir,
+            pending_dir=pending_dir,
+            chunk_size=chunk_size,
+            label_col=label_col,
+            max_label_delay_days=max_label_delay_days,
+        )
+    if state_path is not None:
+        save_join_state(state, state_path)
+    counters = state["meta"]["counters"]
+    days = state["days"]
+    ordered = sorted(days)
+    # The rolling window ends at the newest labeled day, not wall-clock time: labels lag.
+    window = [days[day] for day in ordered if ordered and day > ordered[-1] - window_days]
+    overall = _sum_days(list(days.values()), n_bins)
+    rolling = _sum_days(window, n_bins)
+
+    report = {
+        "generated_at_epoch": int(time.time()),
+        "predictions_scanned": counters["scanned"],
+        "labels_loaded": counters["labels_loaded"],
+        "labeled_predictions": counters["labeled"],
+        "duplicate_predictions": counters["duplicates"],
+        "late_labels": counters["late_labels"],
+        "expired_predictions": counters["expired"],
+        "pending_predictions": sum(entry["rows"] for entry in state["meta"]["pending"]),
+        "pending_labels": int(len(state["arrays"]["label_id"])),
+        "new_segments": fresh["new_segments"],
+        "new_label_files": fresh["new_label_files"],
+        "label_coverage": round(counters["labeled"] / max(counters["scanned"], 1), 4),
+        "baseline_pr_auc": _baseline_pr_auc(Path("reports/metrics.json")),
+        "window_days": int(window_days),
+        "overall": histogram_quality(overall["hist"], overall["decisions"]),
+        "rolling": histogram_quality(rolling["hist"], rolling["decisions"]),
+        "daily": [
+            {
+                "day_start_epoch": day * SECONDS_PER_DAY,
+                **histogram_quality(days[day]["hist"], days[day]["decisions"]),
+            }
+            for day in ordered
+        ],
+        "elapsed_seconds": round(time.perf_counter() - start, 4),
+    }
+    out_path = Path("reports/live_quality.json")
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(
+        f"Folded {fresh['new_segments']} new segment(s) and {fresh['new_label_files']} new label "
+        f"file(s): {counters['labeled']} labeled predictions out of {counters['scanned']} logged "
+        f"in {report['elapsed_seconds']}s; report saved to {out_path}"
+    )
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Join delayed labels to logged predictions.")
+    parser.add_argument("--labels", required=True, help="Label file or glob with event_id")
+    parser.add_argument("--log-dir", default="reports/prediction_log")
+    parser.add_argument("--label-col", default="is_fraud")
+    parser.add_argument("--window-days", type=int, default=7)
+    parser.add_argument("--bins", type=int, default=DEFAULT_SCORE_BINS)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--state", default=DEFAULT_STATE_PATH, help="Join state between runs")
+    parser.add_argument("--max-label-delay-days", type=float, default=DEFAULT_MAX_LABEL_DELAY_DAYS)
+    parser.add_argument("--rebuild", action="store_true", help="Ignore the saved join state")
+    args = parser.parse_args()
+    run_label_join(
+        args.labels,
+        log_dir=args.log_dir,
+        window_days=args.window_days,
+        n_bins=args.bins,
+        chunk_size=args.chunk_size,
+        label_col=args.label_col,
+        state_path=args.state,
+        rebuild=args.rebuild,
+        max_label_delay_days=args.max_label_delay_days,
+    )
+
+
+if __name__ == "__main__":
+    main()
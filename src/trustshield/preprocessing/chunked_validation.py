@@ -0,0 +1,250 @@
+from __future__ import annotations
+
+import io
+import json
+import os
+import time
+from collections import Counter
+from collections.abc import Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from trustshield.ingestion.readers import DEFAULT_CHUNK_SIZE, resolve_event_paths
+from trustshield.preprocessing.validation import (
+    OPTIONAL_COLUMNS,
+    REQUIRED_COLUMNS,
+    event_rule_violations,
+)
+
+DEFAULT_MAX_SAMPLES = 20
+# CSV/JSONL files are cut into byte ranges of about this size, one unit of work each.
+DEFAULT_SPLIT_BYTES = 64 << 20
+SCAN_BLOCK_BYTES = 8 << 20
+
+
+@dataclass(frozen=True)
+class _WorkUnit:
+    path: str
+    start: int = 0
+    end: int | None = None
+    row_group: int | None = None
+
+
+def _line_split_offsets(path: Path, split_bytes: int, quoted: bool) -> list[int]:
+    # Line starts about every `split_bytes`, plus 0 and the file size. A CSV field may hold a
+    # quoted newline, so CSV splits only land after a newline with an even number of quotes
+    # before it (escaped quotes come in pairs). JSON lines never hold a raw newline.
+    size = path.stat().st_size
+    offsets = [0]
+    target = split_bytes
+    quotes = 0
+    position = 0
+    with path.open("rb") as f:
+        while target < size and (block := f.read(SCAN_BLOCK_BYTES)):
+            search = max(target - position, 0)
+            while search < len(block):
+                newline = block.find(b"\n", search)
+                if newline < 0:
+                    break
+                if quoted and (quotes + block.count(b'"', 0, newline)) % 2:
+                    search = newline + 1
+                    continue
+                offsets.append(position + newline + 1)
+                target = offsets[-1] + split_bytes
+                search = max(target - position, newline + 1)
+            quotes += block.count(b'"')
+            position += len(block)
+    if offsets[-1] < size:
+        offsets.append(size)
+    return offsets
+
+
+def _plan_units(paths: list[Path], split_bytes: int = DEFAULT_SPLIT_BYTES) -> list[_WorkUnit]:
+    # Parquet row groups are independently readable, and CSV/JSONL files are cut into line-
+    # aligned byte ranges, so one large file still fans out over the pool.
+    units: list[_WorkUnit] = []
+    for path in paths:
+        suffix = path.suffix.lower()
+        if suffix == ".parquet":
+            import pyarrow.parquet as pq
+
+            metadata = pq.ParquetFile(path).metadata
+            for row_group in range(metadata.num_row_groups):
+                units.append(_WorkUnit(str(path), row_group=row_group))
+        else:
+            quoted = suffix not in {".jsonl", ".ndjson"}
+            offsets = _line_split_offsets(path, max(int(split_bytes), 1), quoted)
+            for start, end in zip(offsets, offsets[1:]):
+                units.append(_WorkUnit(str(path), start=start, end=end))
+    return units
+
+
+def _iter_unit_chunks(unit: _WorkUnit, chunk_size: int) -> Iterator[pd.DataFrame]:
+    path = Path(unit.path)
+    suffix = path.suffix.lower()
+    if unit.row_group is not None:
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=chunk_size, row_groups=[unit.row_group]):
+            yield batch.to_pandas()
+        return
+    with path.open("rb") as f:
+        f.seek(unit.start)
+        buffer = io.BytesIO(f.read((unit.end or 0) - unit.start))
+    if suffix in {".jsonl", ".ndjson"}:
+        yield from pd.read_json(buffer, lines=True, chunksize=chunk_size)
+    elif unit.start == 0:
+        yield from pd.read_csv(buffer, chunksize=chunk_size)
+    else:
+        # Later ranges start on a data line; the header comes from the top of the file.
+        columns = list(pd.read_csv(path, nrows=0).columns)
+        yield from pd.read_csv(buffer, header=None, names=columns, chunksize=chunk_size)
+
+
+def check_event_chunk(
+    chunk: pd.DataFrame,
+    max_samples: int = DEFAULT_MAX_SAMPLES,
+    source: str | None = None,
+    row_offset: int = 0,
+) -> dict[str, Any]:
+    masks = event_rule_violations(chunk)
+    violations = {rule: int(mask.sum()) for rule, mask in masks.items() if mask.any()}
+    if masks:
+        stacked = np.column_stack(list(masks.values()))
+        invalid = stacked.any(axis=1)
+    else:
+        stacked = np.zeros((len(chunk), 0), dtype=bool)
+        invalid = np.zeros(len(chunk), dtype=bool)
+
+    samples: list[dict[str, Any]] = []
+    sample_rows = np.flatnonzero(invalid)[: max(max_samples, 0)]
+    if len(sample_rows):
+        rule_names = np.array(list(masks.keys()))
+        records = json.loads(chunk.iloc[sample_rows].to_json(orient="records"))
+        for row, record in zip(sample_rows.tolist(), records):
+            samples.append(
+                {
+                    "source": source,
+                    "row": row_offset + row,
+                    "rules": rule_names[stacked[row]].tolist(),
+                    "record": record,
+                }
+            )
+
+    known = set(REQUIRED_COLUMNS + OPTIONAL_COLUMNS)
+    return {
+        "rows": int(len(chunk)),
+        "invalid_rows": int(invalid.sum()),
+        "violations": violations,
+        "missing_columns": [col for col in REQUIRED_COLUMNS if col not in chunk.columns],
+        "unexpected_columns": [str(col) for col in chunk.columns if col not in known],
+        "samples": samples,
+    }
+
+
+def _validate_unit(unit: _WorkUnit, chunk_size: int, max_samples: int) -> dict[str, Any]:
+    # Sample rows are counted from the start of the unit; `validate_event_files` shifts them to
+    # rows of the file once the earlier units' row counts are known.
+    rows = 0
+    invalid_rows = 0
+    violations: Counter[str] = Counter()
+    missing: set[str] = set()
+    unexpected: set[str] = set()
+    samples: list[dict[str, Any]] = []
+    for chunk in _iter_unit_chunks(unit, chunk_size):
+        result = check_event_chunk(
+            chunk,
+            max_samples=max_samples - len(samples),
+            source=unit.path,
+            row_offset=rows,
+        )
+        rows += result["rows"]
+        invalid_rows += result["invalid_rows"]
+        violations.update(result["violations"])
+        missing.update(result["missing_columns"])
+        unexpected.update(result["unexpected_columns"])
+        samples.extend(result["samples"])
+    return {
+        "rows": rows,
+        "invalid_rows": invalid_rows,
+        "violations": dict(violations),
+        "missing_columns": sorted(missing),
+        "unexpected_columns": sorted(unexpected),
+        "samples": samples,
+    }
+
+
+def _run_units(
+    units: list[_WorkUnit], chunk_size: int, max_samples: int, workers: int
+) -> list[dict[str, Any]]:
+    if workers <= 1 or len(units) <= 1:
+        return [_validate_unit(unit, chunk_size, max_samples) for unit in units]
+
+    results: list[dict[str, Any] | None] = [None] * len(units)
+    pending: dict[Future, int] = {}
+    next_unit = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Keep a bounded number of units in flight so sampled rows never pile up unread.
+        while next_unit < len(units) or pending:
+            while next_unit < len(units) and len(pending) < 2 * workers:
+                future = pool.submit(_validate_unit, units[next_unit], chunk_size, max_samples)
+                pending[future] = next_unit
+                next_unit += 1
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                results[pending.pop(future)] = future.result()
+    return [result for result in results if result is not None]
+
+
+def validate_event_files(
+    path: str | Path | list[str | Path],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    workers: int | None = None,
+    max_samples: int = DEFAULT_MAX_SAMPLES,
+    split_bytes: int = DEFAULT_SPLIT_BYTES,
+) -> dict[str, Any]:
+    paths = resolve_event_paths(path)
+    units = _plan_units(paths, split_bytes)
+    n_workers = max(1, min(int(workers or os.cpu_count() or 1), len(units)))
+
+    start = time.perf_counter()
+    results = _run_units(units, chunk_size, max_samples, n_workers)
+    elapsed = time.perf_counter() - start
+
+    violations: Counter[str] = Counter()
+    missing: set[str] = set()
+    unexpected: set[str] = set()
+    samples: list[dict[str, Any]] = []
+    file_rows: Counter[str] = Counter()
+    for unit, result in zip(units, results):
+        for sample in result["samples"]:
+            sample["row"] += file_rows[unit.path]
+        file_rows[unit.path] += result["rows"]
+        violations.update(result["violations"])
+        missing.update(result["missing_columns"])
+        unexpected.update(result["unexpected_columns"])
+        samples.extend(result["samples"])
+
+    rows = sum(result["rows"] for result in results)
+    invalid_rows = sum(result["invalid_rows"] for result in results)
+    return {
+        "generated_at_epoch": int(time.time()),
+        "inputs": [str(p) for p in paths],
+        "rows": int(rows),
+        "invalid_rows": int(invalid_rows),
+        "valid": invalid_rows == 0 and not missing and not unexpected,
+        "violations": dict(sorted(violations.items())),
+        "missing_columns": sorted(missing),
+        "unexpected_columns": sorted(unexpected),
+        "samples": samples[:max_samples],
+        "units": len(units),
+        "workers": n_workers,
+        "elapsed_seconds": round(elapsed, 4),
+        "rows_per_second": round(rows / elapsed, 1) if elapsed > 0 else None,
+    }
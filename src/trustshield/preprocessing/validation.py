@@ -1,14 +1,11 @@
 from __future__ import annotations
 
-import pandas as pd
-
-try:
-    import pandera as pa
-    from pandera import Check
-except Exception:
-    pa = None
-    Check = None
+from functools import lru_cache
+from typing import Any
 
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_integer_dtype, is_string_dtype
 
 REQUIRED_COLUMNS = [
     "event_id",
@@ -25,23 +22,101 @@ REQUIRED_COLUMNS = [
     "chargeback_history",
     "is_fraud",
 ]
+OPTIONAL_COLUMNS = ["event_ts"]
+
+
+def _str_lengths(series: pd.Series) -> pd.Series:
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # Measure each dictionary entry once, then gather by code.
+        categories = series.cat.categories.astype(str)
+        lengths = np.append(categories.str.len().to_numpy(dtype=float), np.nan)
+        return pd.Series(lengths[series.cat.codes.to_numpy()], index=series.index)
+    return series.astype(str).str.len().where(series.notna())
+
+
+def _invalid_non_negative_int(series: pd.Series) -> np.ndarray:
+    values = pd.to_numeric(series, errors="coerce").to_numpy(dtype=float)
+    with np.errstate(invalid="ignore"):
+        return ~((values >= 0) & (np.mod(values, 1.0) == 0))
+
+
+def _invalid_binary(series: pd.Series) -> np.ndarray:
+    values = pd.to_numeric(series, errors="coerce").to_numpy(dtype=float)
+    return ~np.isin(values, [0.0, 1.0])
+
+
+def _invalid_length(min_len: int, max_len: int | None = None):
+    def check(series: pd.Series) -> np.ndarray:
+        lengths = _str_lengths(series).to_numpy(dtype=float)
+        with np.errstate(invalid="ignore"):
+            ok = lengths >= min_len
+            if max_len is not None:
+                ok &= lengths <= max_len
+        return ~ok
+
+    return check
+
+
+def _invalid_timestamp(series: pd.Series) -> np.ndarray:
+    values = pd.to_numeric(series, errors="coerce").to_numpy(dtype=float)
+    with np.errstate(invalid="ignore"):
+        return ~(values >= 0)
+
+
+# Vectorized mirror of the pandera event schema: rule name -> (column, violation mask builder).
+EVENT_RULES = {
+    "event_id:non_negative_int": ("event_id", _invalid_non_negative_int),
+    "message_text:non_empty": ("message_text", _invalid_length(1)),
+    "country:iso2": ("country", _invalid_length(2, 2)),
+    "user_id:non_empty": ("user_id", _invalid_length(1)),
+    "device_id:non_empty": ("device_id", _invalid_length(1)),
+    "ip_id:non_empty": ("ip_id", _invalid_length(1)),
+    "card_id:non_empty": ("card_id", _invalid_length(1)),
+    "merchant_id:non_empty": ("merchant_id", _invalid_length(1)),
+    "payment_attempts:non_negative_int": ("payment_attempts", _invalid_non_negative_int),
+    "account_age_days:non_negative_int": ("account_age_days", _invalid_non_negative_int),
+    "device_reuse_count:non_negative_int": ("device_reuse_count", _invalid_non_negative_int),
+    "chargeback_history:binary": ("chargeback_history", _invalid_binary),
+    "is_fraud:binary": ("is_fraud", _invalid_binary),
+    "event_ts:non_negative": ("event_ts", _invalid_timestamp),
+}
+
+
+def event_rule_violations(df: pd.DataFrame) -> dict[str, np.ndarray]:
+    return {
+        rule: np.asarray(check(df[col]), dtype=bool)
+        for rule, (col, check) in EVENT_RULES.items()
+        if col in df.columns
+    }
 
 
 def _fallback_validate(df: pd.DataFrame) -> pd.DataFrame:
     missing = [c for c in REQUIRED_COLUMNS if c not in df.columns]
     if missing:
         raise ValueError(f"Missing required columns: {missing}")
-    if (df["payment_attempts"] < 0).any() or (df["account_age_days"] < 0).any():
+    violations = event_rule_violations(df)
+    if (
+        violations["payment_attempts:non_negative_int"].any()
+        or violations["account_age_days:non_negative_int"].any()
+    ):
         raise ValueError("Negative values found in non-negative feature columns.")
-    if not set(df["chargeback_history"].unique()).issubset({0, 1}):
+    if violations["chargeback_history:binary"].any():
         raise ValueError("chargeback_history must be binary.")
-    if not set(df["is_fraud"].unique()).issubset({0, 1}):
+    if violations["is_fraud:binary"].any():
         raise ValueError("is_fraud must be binary.")
     return df
 
 
-if pa is not None:
-    EVENT_SCHEMA = pa.DataFrameSchema(
+@lru_cache(maxsize=1)
+def _event_schema() -> Any:
+    # pandera takes longer to import than the whole scoring path, so it loads on first
+    # validation instead of with every module that only needs the column lists.
+    try:
+        import pandera as pa
+        from pandera import Check
+    except Exception:
+        return None
+    return pa.DataFrameSchema(
         {
             "event_id": pa.Column(int, Check.ge(0)),
             "message_text": pa.Column(str, Check.str_length(min_value=1)),
@@ -56,14 +131,33 @@ if pa is not None:
             "device_reuse_count": pa.Column(int, Check.ge(0)),
             "chargeback_history": pa.Column(int, Check.isin([0, 1])),
             "is_fraud": pa.Column(int, Check.isin([0, 1])),
+            "event_ts": pa.Column(float, Check.ge(0), required=False),
         },
         strict=True,
     )
-else:
-    EVENT_SCHEMA = None
+
+
+def _compact_dtype_overrides(schema: Any, df: pd.DataFrame) -> dict[str, dict[str, None]]:
+    # Frames from `trustshield.ingestion.readers` carry categorical ids and downcast
+    # integers; accept those encodings while keeping the value checks.
+    overrides: dict[str, dict[str, None]] = {}
+    for col, column in schema.columns.items():
+        if col not in df.columns:
+            continue
+        dtype = df[col].dtype
+        if isinstance(dtype, pd.CategoricalDtype):
+            if column.dtype is not None and is_string_dtype(dtype.categories.dtype):
+                overrides[col] = {"dtype": None}
+        elif is_integer_dtype(dtype) and str(column.dtype) == "int64" and str(dtype) != "int64":
+            overrides[col] = {"dtype": None}
+    return overrides
 
 
 def validate_events(df: pd.DataFrame) -> pd.DataFrame:
-    if EVENT_SCHEMA is None:
+    schema = _event_schema()
+    if schema is None:
         return _fallback_validate(df)
-    return EVENT_SCHEMA.validate(df, lazy=True)
+    overrides = _compact_dtype_overrides(schema, df)
+    if overrides:
+        schema = schema.update_columns(overrides)
+    return schema.validate(df, lazy=True)
@@ -1,3 +1,15 @@
-from .app import app
+from __future__ import annotations
+
+from typing import Any
 
 __all__ = ["app"]
+
+
+def __getattr__(name: str) -> Any:
+    # Importing the app loads the bundle and report modules; keep `serving.policy` importable
+    # from evaluation code without pulling the whole API in (and without an import cycle).
+    if name == "app":
+        from .app import app
+
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
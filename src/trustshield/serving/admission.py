@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import contextvars
+import json
+import threading
+import time
+from typing import Any
+
+ADMITTED = "admitted"
+DEGRADE = "degrade"
+SHED = "shed"
+
+# Per-request admission ticket; the middleware sets it and the (threadpool) handler reads it.
+_ticket: contextvars.ContextVar[dict[str, Any] | None] = contextvars.ContextVar(
+    "admission_ticket", default=None
+)
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        max_in_flight: int = 64,
+        degrade_queue_ms: float | None = 50.0,
+        shed_queue_ms: float | None = 250.0,
+        retry_after_seconds: int = 1,
+    ) -> None:
+        self.max_in_flight = int(max_in_flight)
+        self.degrade_queue_ms = None if degrade_queue_ms is None else float(degrade_queue_ms)
+        self.shed_queue_ms = None if shed_queue_ms is None else float(shed_queue_ms)
+        self.retry_after_seconds = int(retry_after_seconds)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.counts = {"admitted": 0, "rejected": 0, "shed": 0, "degraded": 0}
+
+    def try_admit(self) -> bool:
+        with self._lock:
+            if self.in_flight >= self.max_in_flight:
+                self.counts["rejected"] += 1
+                return False
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            self.counts["admitted"] += 1
+            return True
+
+    def release(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+
+    def classify(self) -> tuple[str, float]:
+        # Queue delay is arrival -> first handler call. It is frozen on first use, so every
+        # item of a batch gets the same verdict instead of later items tipping into shedding.
+        ticket = _ticket.get()
+        if ticket is None:
+            return ADMITTED, 0.0
+        if ticket["queue_ms"] is None:
+            ticket["queue_ms"] = (time.perf_counter() - ticket["arrived_at"]) * 1000.0
+            queue_ms = ticket["queue_ms"]
+            if self.shed_queue_ms is not None and queue_ms > self.shed_queue_ms:
+                ticket["mode"] = SHED
+            elif self.degrade_queue_ms is not None and queue_ms > self.degrade_queue_ms:
+                ticket["mode"] = DEGRADE
+            with self._lock:
+                if ticket["mode"] == SHED:
+                    self.counts["shed"] += 1
+                elif ticket["mode"] == DEGRADE:
+                    self.counts["degraded"] += 1
+        return ticket["mode"], ticket["queue_ms"]
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "in_flight": self.in_flight,
+                "peak_in_flight": self.peak_in_flight,
+                "max_in_flight": self.max_in_flight,
+                "degrade_queue_ms": self.degrade_queue_ms,
+                "shed_queue_ms": self.shed_queue_ms,
+                **self.counts,
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self.peak_in_flight = self.in_flight
+            self.counts = {key: 0 for key in self.counts}
+
+
+class AdmissionMiddleware:
+    # Plain ASGI middleware: rejecting happens before the body is read or a threadpool slot
+    # is taken, which is the point when the pool itself is what is overloaded.
+    def __init__(self, app: Any, controller: AdmissionController, paths: tuple[str, ...]) -> None:
+        self.app = app
+        self.controller = controller
+        self.paths = paths
+
+    async def __call__(self, scope: dict, receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith(self.paths):
+            await self.app(scope, receive, send)
+            return
+        if not self.controller.try_admit():
+            await _reject(send, self.controller.retry_after_seconds)
+            return
+        token = _ticket.set({"arrived_at": time.perf_counter(), "queue_ms": None, "mode": ADMITTED})
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _ticket.reset(token)
+            self.controller.release()
+
+
+async def _reject(send: Any, retry_after_seconds: int) -> None:
+    body = json.dumps(
+        {"status": "rejected", "reason": "too_many_in_flight", "retry_after": retry_after_seconds}
+    ).encode("utf-8")
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(retry_after_seconds).encode()),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
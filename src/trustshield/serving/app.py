@@ -1,28 +1,59 @@
 from __future__ import annotations
 
+import atexit
 import json
 import threading
 import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from pathlib import Path
 from typing import Any
 
-import joblib
-from fastapi import FastAPI, Query
-from fastapi.responses import HTMLResponse
+import numpy as np
+import pandas as pd
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import HTMLResponse, JSONResponse, Response
+from pydantic import ValidationError
 
-from trustshield.evaluation.cost_report import generate_cost_report
-from trustshield.evaluation.error_analysis import generate_error_analysis_report
-from trustshield.evaluation.policy_simulation import run_policy_simulation
+# Only the scoring path is imported eagerly. Report and evaluation modules (sklearn.metrics,
+# scipy.stats) load inside their endpoints, and the model bundle loads after startup.
+from trustshield.features import EntityFeatureStore, NearDuplicateIndex, OnlineEntityGraph
 from trustshield.models import explain_event
-from trustshield.monitoring.dashboard import build_dashboard_html
-from trustshield.monitoring.report import generate_monitoring_report
+from trustshield.models.infer import score_frame
+from trustshield.monitoring.drift import StreamingDriftMonitor
+from trustshield.serving.admission import (
+    ADMITTED,
+    DEGRADE,
+    SHED,
+    AdmissionController,
+    AdmissionMiddleware,
+)
+from trustshield.serving.columnar import (
+    MAX_COLUMNAR_ROWS,
+    decode_columns,
+    encode_columns,
+    validate_columns,
+)
+from trustshield.serving.entity_lists import EntityLists
+from trustshield.serving.ndjson import (
+    DEFAULT_STREAM_BATCH_SIZE,
+    NDJSONStreamingResponse,
+    iter_ndjson_lines,
+)
 from trustshield.serving.policy import (
     decide,
+    decide_batch,
     init_policy_state,
     load_policy,
     policy_state_summary,
     reset_policy_state,
 )
+from trustshield.serving.prediction_log import (
+    PREDICTION_LOG_COLUMNS,
+    PredictionLog,
+    prediction_record,
+)
 from trustshield.serving.schemas import (
     BatchPredictRequest,
     BatchPredictResponse,
@@ -45,16 +76,201 @@ class HeuristicFallbackModel:
         return float(min(score, 0.99))
 
 
-def _load_model_bundle(path: str = "reports/artifacts/model_bundle.joblib") -> dict[str, Any] | None:
+MODEL_BUNDLE_PATH = "reports/artifacts/model_bundle.joblib"
+WARMUP_PAYLOAD = {
+    "message_text": "urgent verify your otp and transfer now",
+    "country": "US",
+    "user_id": "warmup_user",
+    "device_id": "warmup_device",
+    "ip_id": "warmup_ip",
+    "card_id": "warmup_card",
+    "merchant_id": "warmup_merchant",
+    "event_ts": None,
+    "payment_attempts": 1,
+    "account_age_days": 30,
+    "device_reuse_count": 1,
+    "chargeback_history": 0,
+}
+
+
+def _load_model_bundle(path: str) -> dict[str, Any] | None:
     artifact = Path(path)
     if artifact.exists():
+        import joblib
+
         return joblib.load(artifact)
     return None
 
 
-app = FastAPI(title="TrustShield API", version="0.1.0")
+def _warm_up(model_bundle: dict[str, Any], rounds: int = 3) -> None:
+    # First calls pay for lazy imports, sklearn's input checks and the stage cost estimates
+    # used by latency budgets; take that hit before readiness instead of on live traffic.
+    for _ in range(rounds):
+        for detail in ("score", "reasons", "full"):
+            explain_event(model_bundle, WARMUP_PAYLOAD, detail=detail)
+    score_frame(model_bundle, pd.DataFrame([WARMUP_PAYLOAD] * 8))
+
+
+def _init_drift_monitor(
+    model_bundle: dict[str, Any] | None, policy: dict[str, Any]
+) -> StreamingDriftMonitor | None:
+    baseline = (model_bundle or {}).get("drift_baseline")
+    if not baseline or not baseline.get("features"):
+        return None
+    monitoring_cfg = policy.get("monitoring", {})
+    return StreamingDriftMonitor(
+        baseline,
+        half_life_events=int(monitoring_cfg.get("drift_half_life_events", 50_000)),
+        min_events=int(monitoring_cfg.get("drift_min_events", 200)),
+    )
+
+
+def _init_prediction_log(policy: dict[str, Any]) -> PredictionLog | None:
+    log_cfg = policy.get("prediction_log", {})
+    if not log_cfg.get("enabled", False):
+        return None
+    log = PredictionLog(
+        log_cfg.get("directory", "reports/prediction_log"),
+        capacity=int(log_cfg.get("capacity", 50_000)),
+        flush_rows=int(log_cfg.get("flush_rows", 1_000)),
+        flush_interval_seconds=float(log_cfg.get("flush_interval_seconds", 1.0)),
+        segment_max_rows=int(log_cfg.get("segment_max_rows", 200_000)),
+        segment_max_seconds=float(log_cfg.get("segment_max_seconds", 300)),
+        fmt=str(log_cfg.get("format", "parquet")),
+    ).start()
+    # Flush the buffer and seal the open segment on interpreter exit.
+    atexit.register(log.close)
+    return log
+
+
+def _init_admission(policy: dict[str, Any]) -> AdmissionController | None:
+    admission_cfg = policy.get("admission", {})
+    if not admission_cfg.get("enabled", False):
+        return None
+    return AdmissionController(
+        max_in_flight=int(admission_cfg.get("max_in_flight", 64)),
+        degrade_queue_ms=admission_cfg.get("degrade_queue_ms"),
+        shed_queue_ms=admission_cfg.get("shed_queue_ms"),
+        retry_after_seconds=int(admission_cfg.get("retry_after_seconds", 1)),
+    )
+
+
+def _init_live_graph(policy: dict[str, Any]) -> OnlineEntityGraph | None:
+    graph_cfg = policy.get("live_graph", {})
+    if not graph_cfg.get("enabled", False):
+        return None
+    return OnlineEntityGraph(
+        window_seconds=float(graph_cfg.get("window_seconds", 3_600)),
+        max_nodes=int(graph_cfg.get("max_nodes", 1_000_000)),
+        max_hub_degree=int(graph_cfg.get("max_hub_degree", 200)),
+        link_columns=graph_cfg.get("link_columns"),
+        max_clock_skew_seconds=graph_cfg.get("max_clock_skew_seconds", 300),
+    )
+
+
+def _init_feature_store(
+    policy: dict[str, Any], model_bundle: dict[str, Any] | None = None
+) -> EntityFeatureStore | None:
+    # A bundle trained with velocity inputs fixes the windows and buckets, so its features
+    # mean at serving what they meant in training; the policy only sizes the store.
+    velocity_cfg = policy.get("velocity", {})
+    if not velocity_cfg.get("enabled", False):
+        return None
+    trained = (model_bundle or {}).get("meta", {}).get("velocity", {})
+    return EntityFeatureStore(
+        windows_seconds=trained.get("windows_seconds", velocity_cfg.get("windows_seconds")),
+        buckets=int(trained.get("buckets_per_window", velocity_cfg.get("buckets_per_window", 6))),
+        max_entities=int(velocity_cfg.get("max_entities", 500_000)),
+        distinct_bits=int(velocity_cfg.get("distinct_bits", 256)),
+        max_clock_skew_seconds=velocity_cfg.get("max_clock_skew_seconds", 300),
+    )
+
+
+def _init_near_duplicates(policy: dict[str, Any]) -> NearDuplicateIndex | None:
+    campaign_cfg = policy.get("near_duplicates", {})
+    if not campaign_cfg.get("enabled", False):
+        return None
+    return NearDuplicateIndex(
+        window_seconds=float(campaign_cfg.get("window_seconds", 3_600)),
+        recent_seconds=float(campaign_cfg.get("recent_seconds", 300)),
+        buckets=int(campaign_cfg.get("buckets", 12)),
+        bands=int(campaign_cfg.get("bands", 8)),
+        rows_per_band=int(campaign_cfg.get("rows_per_band", 4)),
+        shingle_tokens=int(campaign_cfg.get("shingle_tokens", 2)),
+        min_tokens=int(campaign_cfg.get("min_tokens", 4)),
+        max_clusters=int(campaign_cfg.get("max_clusters", 200_000)),
+        distinct_bits=int(campaign_cfg.get("distinct_bits", 256)),
+        max_clock_skew_seconds=campaign_cfg.get("max_clock_skew_seconds", 300),
+    )
+
+
+def _init_entity_lists(policy: dict[str, Any]) -> EntityLists | None:
+    lists_cfg = policy.get("entity_lists", {})
+    if not lists_cfg.get("enabled", False):
+        return None
+    return EntityLists(lists_cfg.get("lists"))
+
+
+def load_model(path: str | None = None) -> dict[str, Any] | None:
+    # Loads and warms the bundle, then swaps it in; until then requests use the heuristic
+    # fallback and /health/ready reports not_ready.
+    global bundle, drift_monitor, feature_store
+    model_state.update({"status": "loading", "error": None})
+    started = time.perf_counter()
+    try:
+        loaded = _load_model_bundle(path or MODEL_BUNDLE_PATH)
+        load_seconds = time.perf_counter() - started
+        if loaded is not None:
+            _warm_up(loaded)
+    except Exception as exc:
+        model_state.update({"status": "failed", "error": f"{type(exc).__name__}: {exc}"})
+        return None
+    drift_monitor = _init_drift_monitor(loaded, policy_cfg)
+    trained = (loaded or {}).get("meta", {}).get("velocity")
+    if feature_store is not None and trained is not None:
+        windows = [int(window) for window in trained["windows_seconds"]]
+        if (feature_store.windows, feature_store.buckets) != (
+            windows,
+            int(trained["buckets_per_window"]),
+        ):
+            feature_store = _init_feature_store(policy_cfg, loaded)
+    bundle = loaded
+    model_state.update(
+        {
+            "status": "ready" if loaded is not None else "missing",
+            "load_seconds": round(load_seconds, 4),
+            "warmup_seconds": round(time.perf_counter() - started - load_seconds, 4),
+        }
+    )
+    return loaded
+
+
+@asynccontextmanager
+async def _lifespan(_: FastAPI) -> AsyncIterator[None]:
+    # The server starts accepting connections right away; the model loads on a thread.
+    threading.Thread(target=load_model, name="model-loader", daemon=True).start()
+    yield
+
+
+app = FastAPI(title="TrustShield API", version="0.1.0", lifespan=_lifespan)
 policy_cfg = load_policy()
-bundle = _load_model_bundle()
+admission = _init_admission(policy_cfg)
+if admission is not None:
+    # Scoring routes only; /explain serves review tooling and never degrades.
+    app.add_middleware(AdmissionMiddleware, controller=admission, paths=("/predict",))
+bundle: dict[str, Any] | None = None
+drift_monitor: StreamingDriftMonitor | None = None
+model_state: dict[str, Any] = {
+    "status": "not_started",
+    "load_seconds": None,
+    "warmup_seconds": None,
+    "error": None,
+}
+prediction_log = _init_prediction_log(policy_cfg)
+live_graph = _init_live_graph(policy_cfg)
+feature_store = _init_feature_store(policy_cfg)
+entity_lists = _init_entity_lists(policy_cfg)
+near_duplicates = _init_near_duplicates(policy_cfg)
 fallback = HeuristicFallbackModel()
 policy_runtime_state = init_policy_state()
 serving_stats_lock = threading.Lock()
@@ -62,6 +278,8 @@ serving_stats: dict[str, Any] = {
     "total_requests": 0,
     "predict_requests": 0,
     "batch_requests": 0,
+    "stream_requests": 0,
+    "columnar_requests": 0,
     "predicted_items": 0,
     "decision_counts": {"allow": 0, "review": 0, "block": 0},
     "latency_ms_window": [],
@@ -74,6 +292,7 @@ def health() -> dict[str, Any]:
     return {
         "status": "ok",
         "model_loaded": bundle is not None,
+        "model_status": model_state["status"],
         "policy_loaded": bool(policy_cfg),
     }
 
@@ -85,6 +304,8 @@ def serving_stats_snapshot() -> dict[str, Any]:
             "total_requests": int(serving_stats["total_requests"]),
             "predict_requests": int(serving_stats["predict_requests"]),
             "batch_requests": int(serving_stats["batch_requests"]),
+            "stream_requests": int(serving_stats["stream_requests"]),
+            "columnar_requests": int(serving_stats["columnar_requests"]),
             "predicted_items": int(serving_stats["predicted_items"]),
             "decision_counts": dict(serving_stats["decision_counts"]),
         }
@@ -121,6 +342,8 @@ def serving_stats_reset() -> dict[str, str]:
         serving_stats["total_requests"] = 0
         serving_stats["predict_requests"] = 0
         serving_stats["batch_requests"] = 0
+        serving_stats["stream_requests"] = 0
+        serving_stats["columnar_requests"] = 0
         serving_stats["predicted_items"] = 0
         serving_stats["decision_counts"] = {"allow": 0, "review": 0, "block": 0}
         serving_stats["latency_ms_window"] = []
@@ -132,11 +355,12 @@ def health_ready() -> dict[str, Any]:
     checks = {
         "policy_loaded": bool(policy_cfg),
         "model_loaded": bundle is not None,
-        "model_artifact_exists": Path("reports/artifacts/model_bundle.joblib").exists(),
+        "model_warmed_up": model_state["status"] == "ready",
+        "model_artifact_exists": Path(MODEL_BUNDLE_PATH).exists(),
         "training_metrics_exists": Path("reports/metrics.json").exists(),
     }
     ready = all(checks.values())
-    return {"status": "ready" if ready else "not_ready", "checks": checks}
+    return {"status": "ready" if ready else "not_ready", "checks": checks, "model": model_state}
 
 
 @app.get("/openapi/tags-summary", tags=["health"])
@@ -157,7 +381,7 @@ def openapi_tags_summary() -> dict[str, Any]:
 
 @app.get("/model/info", tags=["model"])
 def model_info() -> dict[str, Any]:
-    artifact_path = Path("reports/artifacts/model_bundle.joblib")
+    artifact_path = Path(MODEL_BUNDLE_PATH)
     if bundle is None:
         return {"status": "missing", "message": "Run `make train` to generate model artifact."}
 
@@ -244,8 +468,37 @@ def alerts_latest() -> dict[str, Any]:
     }
 
 
+def _live_quality() -> dict[str, Any] | None:
+    report_path = Path("reports/live_quality.json")
+    if not report_path.exists():
+        return None
+    report = json.loads(report_path.read_text(encoding="utf-8"))
+    if report.get("rolling", {}).get("pr_auc") is None:
+        return None
+    return report
+
+
 @app.get("/quality/latest", tags=["monitoring"])
 def quality_latest() -> dict[str, Any]:
+    # Labels joined onto logged predictions beat the synthetic monitoring sample when present.
+    live = _live_quality()
+    quality_ratio_threshold = policy_cfg.get("monitoring", {}).get("quality_drop_ratio_alert")
+    if live is not None and live.get("baseline_pr_auc") is not None and quality_ratio_threshold:
+        ratio = float(live["rolling"]["pr_auc"]) / max(float(live["baseline_pr_auc"]), 1e-9)
+        return {
+            "status": "ok",
+            "source": "live",
+            "quality_status": "ok" if ratio >= float(quality_ratio_threshold) else "warn",
+            "baseline_pr_auc": float(live["baseline_pr_auc"]),
+            "recent_pr_auc": float(live["rolling"]["pr_auc"]),
+            "quality_ratio": ratio,
+            "threshold_ratio": float(quality_ratio_threshold),
+            "window_days": live["window_days"],
+            "labeled_predictions": live["labeled_predictions"],
+            "recall_at_precision_0_90": live["rolling"]["recall_at_precision_0_90"],
+            "decisions": live["rolling"]["decisions"],
+        }
+
     report_path = Path("reports/monitoring.json")
     if not report_path.exists():
         return {"status": "missing", "message": "Run `make monitor` to generate quality metrics."}
@@ -253,7 +506,6 @@ def quality_latest() -> dict[str, Any]:
     report = json.loads(report_path.read_text(encoding="utf-8"))
     baseline_pr_auc = report.get("baseline_pr_auc")
     recent_pr_auc = report.get("recent_pr_auc")
-    quality_ratio_threshold = policy_cfg.get("monitoring", {}).get("quality_drop_ratio_alert")
     if baseline_pr_auc is None or recent_pr_auc is None or quality_ratio_threshold is None:
         return {"status": "missing", "message": "Quality fields are missing in monitoring config/report."}
 
@@ -261,6 +513,7 @@ def quality_latest() -> dict[str, Any]:
     quality_status = "ok" if ratio >= float(quality_ratio_threshold) else "warn"
     return {
         "status": "ok",
+        "source": "report",
         "quality_status": quality_status,
         "baseline_pr_auc": float(baseline_pr_auc),
         "recent_pr_auc": float(recent_pr_auc),
@@ -269,8 +522,21 @@ def quality_latest() -> dict[str, Any]:
     }
 
 
+@app.get("/quality/live", tags=["monitoring"])
+def quality_live() -> dict[str, Any]:
+    report_path = Path("reports/live_quality.json")
+    if not report_path.exists():
+        return {"status": "missing", "message": "Run `make label-join` to join labels to predictions."}
+    return {"status": "ok", "report": json.loads(report_path.read_text(encoding="utf-8"))}
+
+
 @app.get("/drift/latest", tags=["monitoring"])
 def drift_latest() -> dict[str, Any]:
+    # Live sketches fed by /predict take precedence over the offline monitoring report.
+    if drift_monitor is not None and drift_monitor.events_seen > 0:
+        psi_alert = float(policy_cfg.get("monitoring", {}).get("drift_psi_alert", 0.2))
+        return {"status": "ok", "source": "live", **drift_monitor.snapshot(psi_alert=psi_alert)}
+
     report_path = Path("reports/monitoring.json")
     if not report_path.exists():
         return {"status": "missing", "message": "Run `make monitor` to generate drift metrics."}
@@ -285,6 +551,7 @@ def drift_latest() -> dict[str, Any]:
     drift_status = "ok" if float(score_shift_abs) <= float(score_shift_threshold) else "warn"
     return {
         "status": "ok",
+        "source": "report",
         "drift_status": drift_status,
         "score_shift_abs": float(score_shift_abs),
         "threshold_abs": float(score_shift_threshold),
@@ -292,6 +559,96 @@ def drift_latest() -> dict[str, Any]:
     }
 
 
+@app.post("/drift/reset", tags=["monitoring"])
+def drift_reset() -> dict[str, Any]:
+    if drift_monitor is None:
+        return {"status": "missing", "message": "Model bundle has no drift baseline."}
+    drift_monitor.reset()
+    return {"status": "ok"}
+
+
+@app.get("/admission/stats", tags=["serving"])
+def admission_stats() -> dict[str, Any]:
+    if admission is None:
+        return {"status": "disabled", "message": "Enable `admission` in configs/policy.yaml."}
+    return {"status": "ok", "stats": admission.stats()}
+
+
+@app.post("/admission/reset", tags=["serving"])
+def admission_reset() -> dict[str, str]:
+    if admission is not None:
+        admission.reset()
+    return {"status": "ok"}
+
+
+@app.get("/graph/live/stats", tags=["monitoring"])
+def live_graph_stats() -> dict[str, Any]:
+    if live_graph is None:
+        return {"status": "disabled", "message": "Enable `live_graph` in configs/policy.yaml."}
+    return {"status": "ok", "stats": live_graph.stats()}
+
+
+@app.post("/graph/live/reset", tags=["monitoring"])
+def live_graph_reset() -> dict[str, str]:
+    if live_graph is not None:
+        live_graph.reset()
+    return {"status": "ok"}
+
+
+@app.get("/feature-store/stats", tags=["monitoring"])
+def feature_store_stats() -> dict[str, Any]:
+    if feature_store is None:
+        return {"status": "disabled", "message": "Enable `velocity` in configs/policy.yaml."}
+    return {"status": "ok", "stats": feature_store.stats()}
+
+
+@app.post("/feature-store/reset", tags=["monitoring"])
+def feature_store_reset() -> dict[str, str]:
+    if feature_store is not None:
+        feature_store.reset()
+    return {"status": "ok"}
+
+
+@app.get("/campaigns/stats", tags=["monitoring"])
+def campaigns_stats() -> dict[str, Any]:
+    if near_duplicates is None:
+        return {"status": "disabled", "message": "Enable `near_duplicates` in configs/policy.yaml."}
+    return {"status": "ok", "stats": near_duplicates.stats()}
+
+
+@app.post("/campaigns/reset", tags=["monitoring"])
+def campaigns_reset() -> dict[str, str]:
+    if near_duplicates is not None:
+        near_duplicates.reset()
+    return {"status": "ok"}
+
+
+@app.get("/entity-lists/stats", tags=["policy"])
+def entity_lists_stats() -> dict[str, Any]:
+    if entity_lists is None:
+        return {"status": "disabled", "message": "Enable `entity_lists` in configs/policy.yaml."}
+    return {"status": "ok", "stats": entity_lists.stats()}
+
+
+@app.post("/entity-lists/reload", tags=["policy"])
+def entity_lists_reload() -> dict[str, Any]:
+    # Runs on a worker thread; requests keep matching against the old lists until the swap.
+    if entity_lists is None:
+        return {"status": "disabled", "message": "Enable `entity_lists` in configs/policy.yaml."}
+    try:
+        stats = entity_lists.reload()
+    except (OSError, ValueError) as exc:
+        raise HTTPException(status_code=422, detail=f"{type(exc).__name__}: {exc}") from exc
+    return {"status": "ok", "stats": stats}
+
+
+@app.get("/prediction-log/stats", tags=["monitoring"])
+def prediction_log_stats() -> dict[str, Any]:
+    if prediction_log is None:
+        return {"status": "disabled", "message": "Enable `prediction_log` in configs/policy.yaml."}
+    return {"status": "ok", "stats": prediction_log.stats()}
+
+
 @app.get("/decision-mix/latest", tags=["policy"])
 def decision_mix_latest() -> dict[str, Any]:
     report_path = Path("reports/policy_simulation.json")
@@ -373,6 +730,34 @@ def error_analysis_latest() -> dict[str, Any]:
     return {"status": "ok", "report": json.loads(report_path.read_text(encoding="utf-8"))}
 
 
+@app.get("/error-analysis/slices", tags=["reports"])
+def error_analysis_slices(
+    dimension: str | None = Query(default=None),
+    include_exemplars: bool = Query(default=False),
+) -> dict[str, Any]:
+    report_path = Path("reports/error_analysis.json")
+    if not report_path.exists():
+        return {"status": "missing", "message": "Run `make error-analysis` to generate report."}
+    cube = json.loads(report_path.read_text(encoding="utf-8")).get("cube")
+    if not cube:
+        return {"status": "missing", "message": "Segment cube is missing in error analysis report."}
+    dimensions = cube["dimensions"]
+    if dimension is not None:
+        if dimension not in dimensions:
+            message = f"Unknown dimension. Available: {sorted(dimensions)}"
+            return {"status": "missing", "message": message}
+        dimensions = {dimension: dimensions[dimension]}
+    if not include_exemplars:
+        dimensions = {
+            name: {
+                label: {key: value for key, value in summary.items() if not key.startswith("top_")}
+                for label, summary in segments.items()
+            }
+            for name, segments in dimensions.items()
+        }
+    return {"status": "ok", "threshold": cube["threshold"], "dimensions": dimensions}
+
+
 @app.get("/reports/status", tags=["reports"])
 def reports_status() -> dict[str, Any]:
     paths = {
@@ -381,6 +766,7 @@ def reports_status() -> dict[str, Any]:
         "policy_simulation": Path("reports/policy_simulation.json"),
         "error_analysis": Path("reports/error_analysis.json"),
         "cost_report": Path("reports/cost_report.json"),
+        "live_quality": Path("reports/live_quality.json"),
         "dashboard": Path("reports/dashboard.html"),
     }
     status: dict[str, dict[str, Any]] = {}
@@ -515,6 +901,8 @@ def reports_generate(req: ReportsGenerateRequest) -> dict[str, Any]:
 
     if req.monitoring:
         try:
+            from trustshield.monitoring.report import generate_monitoring_report
+
             report = generate_monitoring_report()
             results["monitoring"] = {"ok": True, "alert": report.get("alert", False)}
         except Exception as exc:
@@ -522,6 +910,8 @@ def reports_generate(req: ReportsGenerateRequest) -> dict[str, Any]:
 
     if req.error_analysis:
         try:
+            from trustshield.evaluation.error_analysis import generate_error_analysis_report
+
             report = generate_error_analysis_report()
             results["error_analysis"] = {"ok": True, "samples": report.get("counts", {}).get("samples")}
         except Exception as exc:
@@ -529,6 +919,8 @@ def reports_generate(req: ReportsGenerateRequest) -> dict[str, Any]:
 
     if req.policy_simulation:
         try:
+            from trustshield.evaluation.policy_simulation import run_policy_simulation
+
             report = run_policy_simulation()
             results["policy_simulation"] = {
                 "ok": True,
@@ -540,6 +932,8 @@ def reports_generate(req: ReportsGenerateRequest) -> dict[str, Any]:
 
     if req.dashboard:
         try:
+            from trustshield.monitoring.dashboard import build_dashboard_html
+
             path = build_dashboard_html()
             results["dashboard"] = {"ok": True, "path": str(path)}
         except Exception as exc:
@@ -547,6 +941,8 @@ def reports_generate(req: ReportsGenerateRequest) -> dict[str, Any]:
 
     if req.cost_report:
         try:
+            from trustshield.evaluation.cost_report import generate_cost_report
+
             report = generate_cost_report()
             results["cost_report"] = {
                 "ok": True,
@@ -601,6 +997,10 @@ def policy_config() -> dict[str, Any]:
         "score_thresholds": policy_cfg.get("score_thresholds", {}),
         "hard_rules": policy_cfg.get("hard_rules", {}),
         "rate_limits": policy_cfg.get("rate_limits", {}),
+        "live_graph": policy_cfg.get("live_graph", {}),
+        "velocity": policy_cfg.get("velocity", {}),
+        "entity_lists": policy_cfg.get("entity_lists", {}),
+        "near_duplicates": policy_cfg.get("near_duplicates", {}),
         "monitoring": policy_cfg.get("monitoring", {}),
     }
 
@@ -608,9 +1008,45 @@ def policy_config() -> dict[str, Any]:
 @app.post("/predict", response_model=PredictResponse, tags=["serving"])
 def predict(req: PredictRequest) -> PredictResponse:
     started_at = time.perf_counter()
-    payload = req.model_dump()
-    if bundle is not None:
-        model_output = explain_event(bundle, payload)
+    payload = req.model_dump(exclude={"detail", "latency_budget_ms"})
+    mode, queue_ms = admission.classify() if admission is not None else (ADMITTED, 0.0)
+    if mode == SHED:
+        # The caller's deadline has most likely passed already; scoring now only adds load.
+        raise HTTPException(
+            status_code=503,
+            detail={"status": "shed", "reason": "queue_delay", "queue_ms": round(queue_ms, 1)},
+            headers={"Retry-After": str(admission.retry_after_seconds)},
+        )
+    deadline = None
+    if req.latency_budget_ms is not None:
+        # The budget is end to end, so time already spent queueing comes out of it.
+        deadline = started_at + (req.latency_budget_ms - queue_ms) / 1000.0
+    # Ingested before scoring, so the event's own links count; degraded requests too.
+    live_features = live_graph.update(payload) if live_graph is not None else None
+    velocity = feature_store.update(payload) if feature_store is not None else None
+    campaign = near_duplicates.update(payload) if near_duplicates is not None else None
+    list_match = entity_lists.match(payload) if entity_lists is not None else None
+    if list_match is not None:
+        # Listed entities skip the model; `decide` still applies its rules to allow hits.
+        model_version = "entity-list"
+        score = 1.0 if list_match[0] == "block" else 0.0
+        model_reasons = []
+        feature_contributions = {}
+        explanation_method = "entity_list"
+        stages = ["entity_list"]
+        skipped_stages = []
+        components = {}
+    elif bundle is not None and mode != DEGRADE:
+        model_output = explain_event(
+            bundle,
+            payload,
+            detail=req.detail,
+            deadline=deadline,
+            live_graph=live_features,
+            velocity=velocity,
+        )
+        stages = model_output["stages"]
+        skipped_stages = model_output["skipped_stages"]
         model_version = str(model_output.get("model_version", "unknown"))
         score = model_output["risk_score"]
         model_reasons = model_output["model_reasons"]
@@ -622,14 +1058,28 @@ def predict(req: PredictRequest) -> PredictResponse:
             "graph_max_entity_fraud_rate": round(float(model_output["graph_max_entity_fraud_rate"]), 4),
             "graph_max_entity_pagerank": round(float(model_output["graph_max_entity_pagerank"]), 8),
         }
+        if drift_monitor is not None:
+            drift_monitor.update({**model_output["features"], "risk_score": score})
     else:
-        model_version = "fallback-heuristic"
+        degraded = bundle is not None
+        model_version = "degraded-heuristic" if degraded else "fallback-heuristic"
         score = fallback.predict(payload)
         model_reasons = []
         feature_contributions = {}
-        explanation_method = "fallback"
+        explanation_method = "degraded" if degraded else "fallback"
+        stages = ["heuristic_score"]
+        skipped_stages = []
         components = {"text_score": round(score, 4), "tabular_score": round(score, 4)}
-    decision, reasons, policy_triggers = decide(score, payload, policy_cfg, state=policy_runtime_state)
+    decision, reasons, policy_triggers = decide(
+        score,
+        payload,
+        policy_cfg,
+        state=policy_runtime_state,
+        live_graph=live_features,
+        velocity=velocity,
+        list_match=list_match,
+        campaign=campaign,
+    )
     with serving_stats_lock:
         serving_stats["total_requests"] += 1
         serving_stats["predict_requests"] += 1
@@ -639,6 +1089,12 @@ def predict(req: PredictRequest) -> PredictResponse:
         serving_stats["latency_ms_window"].append(float(elapsed_ms))
         if len(serving_stats["latency_ms_window"]) > LATENCY_WINDOW_SIZE:
             serving_stats["latency_ms_window"] = serving_stats["latency_ms_window"][-LATENCY_WINDOW_SIZE:]
+    if prediction_log is not None:
+        prediction_log.append(
+            prediction_record(
+                payload, model_version, score, decision, reasons, policy_triggers, elapsed_ms
+            )
+        )
     return PredictResponse(
         model_version=model_version,
         risk_score=round(score, 4),
@@ -649,6 +1105,10 @@ def predict(req: PredictRequest) -> PredictResponse:
         feature_contributions=feature_contributions,
         policy_triggers=policy_triggers,
         explanation_method=explanation_method,
+        stages=stages,
+        skipped_stages=skipped_stages,
+        live_graph=live_features or {},
+        campaign=campaign or {},
     )
 
 
@@ -661,6 +1121,210 @@ def predict_batch(req: BatchPredictRequest) -> BatchPredictResponse:
     return BatchPredictResponse(items=results)
 
 
+def _score_stream_batch(batch: list[tuple[int, bytes | None]], mode: str) -> bytes:
+    # Lines are validated one by one so each bad line gets its own error, then the valid ones
+    # are scored together through the columnar path.
+    results: dict[int, dict[str, Any]] = {}
+    payloads: list[dict[str, Any]] = []
+    scored_lines: list[int] = []
+    for line_no, raw in batch:
+        if raw is None:
+            results[line_no] = {"line": line_no, "error": "line_too_long"}
+            continue
+        try:
+            req = PredictRequest.model_validate_json(raw)
+        except ValidationError as exc:
+            detail = json.loads(exc.json(include_url=False))
+            results[line_no] = {"line": line_no, "error": "invalid_request", "detail": detail}
+            continue
+        payloads.append(req.model_dump(exclude={"detail", "latency_budget_ms"}))
+        scored_lines.append(line_no)
+    if payloads:
+        # Already valid; this only gives the frame the column dtypes /predict/columnar uses.
+        frame, _ = validate_columns(pd.DataFrame.from_records(payloads))
+        out = _score_columnar(frame, mode)
+        records = out.astype(object).where(out.notna(), None).to_dict(orient="records")
+        for line_no, record in zip(scored_lines, records):
+            results[line_no] = {"line": line_no, **record}
+    lines = [json.dumps(results[line_no]) for line_no, _ in batch]
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+@app.post("/predict/stream", tags=["serving"])
+async def predict_stream(
+    request: Request,
+    batch_size: int = Query(default=DEFAULT_STREAM_BATCH_SIZE, ge=1, le=10_000),
+) -> NDJSONStreamingResponse:
+    # Freeze the admission verdict before any body is read, so a slow upload is not
+    # mistaken for queueing delay halfway through the stream.
+    mode, queue_ms = admission.classify() if admission is not None else (ADMITTED, 0.0)
+    if mode == SHED:
+        return JSONResponse(
+            status_code=503,
+            content={"status": "shed", "reason": "queue_delay", "queue_ms": round(queue_ms, 1)},
+            headers={"Retry-After": str(admission.retry_after_seconds)},
+        )
+    with serving_stats_lock:
+        serving_stats["total_requests"] += 1
+        serving_stats["stream_requests"] += 1
+
+    async def _results():
+        # Input is pulled one micro-batch at a time and only after the previous results were
+        # handed to the server, so memory stays at one batch and a slow reader slows intake.
+        batch: list[tuple[int, bytes | None]] = []
+        async for item in iter_ndjson_lines(request.stream()):
+            batch.append(item)
+            if len(batch) >= batch_size:
+                yield await run_in_threadpool(_score_stream_batch, batch, mode)
+                batch = []
+        if batch:
+            yield await run_in_threadpool(_score_stream_batch, batch, mode)
+
+    return NDJSONStreamingResponse(_results())
+
+
+def _score_columnar(frame: pd.DataFrame, mode: str) -> pd.DataFrame:
+    # Shared by /predict/columnar and /predict/stream; callers count their own requests.
+    started_at = time.perf_counter()
+    live = live_graph.update_frame(frame) if live_graph is not None else None
+    velocity = feature_store.update_frame(frame) if feature_store is not None else None
+    campaign = near_duplicates.update_frame(frame) if near_duplicates is not None else None
+    listed = entity_lists.match_frame(frame) if entity_lists is not None else None
+    unlisted = np.ones(len(frame), dtype=bool)
+    if listed is not None:
+        unlisted = listed["list_action"].isna().to_numpy()
+    # Listed rows skip the model; only the others are scored.
+    to_score = frame if unlisted.all() else frame[unlisted]
+    if bundle is not None and mode != DEGRADE:
+        model_version = str(bundle.get("model_version", "unknown"))
+        if len(to_score):
+            scores = score_frame(
+                bundle,
+                to_score,
+                with_features=drift_monitor is not None,
+                live_graph=None if live is None else live[unlisted],
+                velocity=None if velocity is None else velocity[unlisted],
+            )
+            if drift_monitor is not None:
+                drift_monitor.update_batch(
+                    {name: scores[name].to_numpy() for name in scores.columns}
+                )
+        else:
+            scores = pd.DataFrame(columns=["risk_score", "text_score", "tabular_score"])
+    else:
+        model_version = "degraded-heuristic" if bundle is not None else "fallback-heuristic"
+        heuristic = np.array([fallback.predict(row) for row in to_score.to_dict(orient="records")])
+        scores = pd.DataFrame(
+            {"risk_score": heuristic, "text_score": heuristic}, index=to_score.index
+        )
+        scores["tabular_score"] = heuristic
+        scores["model_reasons"] = [[] for _ in range(len(to_score))]
+    if not unlisted.all():
+        # Listed rows score 1.0 when blocked and 0.0 when allowed, without model reasons.
+        scores = scores.reindex(frame.index)
+        listed_score = (listed["list_action"] == "block").to_numpy(dtype=float)
+        for name in ("risk_score", "text_score", "tabular_score"):
+            scores[name] = np.where(unlisted, scores[name].to_numpy(dtype=float), listed_score)
+        model_reasons = np.empty(len(frame), dtype=object)
+        model_reasons[:] = [[] for _ in range(len(frame))]
+        if "model_reasons" in scores.columns:
+            model_reasons[unlisted] = scores["model_reasons"].to_numpy()[unlisted]
+        scores["model_reasons"] = model_reasons
+        model_version = np.where(unlisted, model_version, "entity-list").astype(object)
+    decisions = decide_batch(
+        scores["risk_score"].to_numpy(),
+        frame,
+        policy_cfg,
+        state=policy_runtime_state,
+        live_graph=live,
+        velocity=velocity,
+        list_match=listed,
+        campaign=campaign,
+    )
+    elapsed_ms = (time.perf_counter() - started_at) * 1000.0
+    counts = decisions["decision"].value_counts()
+    with serving_stats_lock:
+        serving_stats["predicted_items"] += len(frame)
+        for decision, count in counts.items():
+            serving_stats["decision_counts"][decision] = (
+                serving_stats["decision_counts"].get(decision, 0) + int(count)
+            )
+        serving_stats["latency_ms_window"].append(float(elapsed_ms))
+        if len(serving_stats["latency_ms_window"]) > LATENCY_WINDOW_SIZE:
+            serving_stats["latency_ms_window"] = serving_stats["latency_ms_window"][
+                -LATENCY_WINDOW_SIZE:
+            ]
+
+    out = pd.DataFrame(
+        {
+            "event_id": frame["event_id"],
+            "model_version": model_version,
+            "risk_score": scores["risk_score"].to_numpy().round(4),
+            "decision": decisions["decision"].to_numpy(),
+            "reasons": decisions["reasons"].to_numpy(),
+            "model_reasons": scores["model_reasons"].to_numpy(),
+            "policy_triggers": decisions["policy_triggers"].to_numpy(),
+            "text_score": scores["text_score"].to_numpy().round(4),
+            "tabular_score": scores["tabular_score"].to_numpy().round(4),
+        }
+    )
+    for name in ("graph_max_entity_fraud_rate", "graph_max_entity_pagerank"):
+        if name in scores.columns:
+            out[name] = scores[name].to_numpy()
+    if live is not None:
+        for name in ("live_component_size", "live_component_users"):
+            out[name] = live[name].to_numpy()
+    if campaign is not None:
+        for name in ("campaign_cluster_messages", "campaign_cluster_users"):
+            out[name] = campaign[name].to_numpy()
+    if prediction_log is not None:
+        logged = frame.assign(
+            logged_at=time.time(),
+            event_id=frame["event_id"].fillna(-1).astype("int64"),
+            model_version=model_version,
+            risk_score=scores["risk_score"].to_numpy(),
+            decision=out["decision"],
+            reasons=out["reasons"],
+            policy_triggers=out["policy_triggers"],
+            latency_ms=elapsed_ms,
+        )
+        prediction_log.append_many(logged[PREDICTION_LOG_COLUMNS].to_dict(orient="records"))
+    return out
+
+
+@app.post("/predict/columnar", tags=["serving"])
+async def predict_columnar(request: Request) -> Response:
+    # Whole columns in, whole columns out: no per-item request/response models. Bodies are
+    # JSON ({"columns": {...}}) or an Arrow IPC stream; the reply uses the request's format.
+    mode, queue_ms = admission.classify() if admission is not None else (ADMITTED, 0.0)
+    if mode == SHED:
+        return JSONResponse(
+            status_code=503,
+            content={"status": "shed", "reason": "queue_delay", "queue_ms": round(queue_ms, 1)},
+            headers={"Retry-After": str(admission.retry_after_seconds)},
+        )
+    content_type = request.headers.get("content-type", "application/json")
+    try:
+        frame = decode_columns(await request.body(), content_type)
+    except ImportError as exc:
+        raise HTTPException(status_code=415, detail="Arrow payloads require pyarrow.") from exc
+    except Exception as exc:
+        raise HTTPException(status_code=400, detail=f"Unreadable columnar payload: {exc}") from exc
+    if len(frame) > MAX_COLUMNAR_ROWS:
+        raise HTTPException(
+            status_code=413, detail=f"At most {MAX_COLUMNAR_ROWS} rows per request."
+        )
+    frame, errors = validate_columns(frame)
+    if errors:
+        raise HTTPException(status_code=422, detail=errors)
+    with serving_stats_lock:
+        serving_stats["total_requests"] += 1
+        serving_stats["columnar_requests"] += 1
+    result = await run_in_threadpool(_score_columnar, frame, mode)
+    body, media_type = encode_columns(result, content_type)
+    return Response(content=body, media_type=media_type)
+
+
 @app.post("/explain", response_model=PredictResponse, tags=["serving"])
 def explain(req: PredictRequest) -> PredictResponse:
     return predict(req)
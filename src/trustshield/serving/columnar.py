@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import json
+import types
+import typing
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from trustshield.serving.schemas import PredictRequest
+
+ARROW_STREAM_TYPE = "application/vnd.apache.arrow.stream"
+MAX_COLUMNAR_ROWS = 100_000
+MAX_ERROR_ROWS = 10
+# Per-request knobs of the single-item endpoint; columnar requests score at detail="reasons".
+_REQUEST_ONLY_FIELDS = {"detail", "latency_budget_ms"}
+
+
+def _field_spec(field: Any) -> dict[str, Any]:
+    args = typing.get_args(field.annotation)
+    optional = field.annotation is None or (
+        typing.get_origin(field.annotation) in (typing.Union, types.UnionType)
+        and type(None) in args
+    )
+    kind = next((arg for arg in args if arg is not type(None)), field.annotation)
+    bounds = {
+        attr: getattr(item, attr)
+        for item in field.metadata
+        for attr in ("ge", "gt", "le", "lt", "min_length")
+        if getattr(item, attr, None) is not None
+    }
+    return {
+        "kind": kind,
+        "optional": optional,
+        "required": field.is_required(),
+        "default": field.default,
+        "bounds": bounds,
+    }
+
+
+# Derived from the pydantic model so the vectorized checks cannot drift from `/predict`.
+COLUMN_SPECS = {
+    name: _field_spec(field)
+    for name, field in PredictRequest.model_fields.items()
+    if name not in _REQUEST_ONLY_FIELDS
+}
+
+
+def decode_columns(body: bytes, content_type: str) -> pd.DataFrame:
+    if content_type.startswith(ARROW_STREAM_TYPE):
+        import pyarrow as pa
+
+        return pa.ipc.open_stream(body).read_all().to_pandas()
+    payload = json.loads(body)
+    columns = payload.get("columns") if isinstance(payload, dict) else None
+    if not isinstance(columns, dict) or not all(isinstance(v, list) for v in columns.values()):
+        raise ValueError('Expected {"columns": {"<name>": [...], ...}}.')
+    if len({len(values) for values in columns.values()}) > 1:
+        raise ValueError("All columns must have the same length.")
+    return pd.DataFrame(columns)
+
+
+def _column_error(name: str, mask: np.ndarray, error_type: str, msg: str) -> dict[str, Any]:
+    rows = np.flatnonzero(mask)
+    return {
+        "loc": ["columns", name],
+        "type": error_type,
+        "msg": msg,
+        "count": int(len(rows)),
+        "rows": rows[:MAX_ERROR_ROWS].tolist(),
+    }
+
+
+_BOUND_CHECKS = {
+    "ge": ("lt", "greater_than_equal", "Input should be greater than or equal to"),
+    "gt": ("le", "greater_than", "Input should be greater than"),
+    "le": ("gt", "less_than_equal", "Input should be less than or equal to"),
+    "lt": ("ge", "less_than", "Input should be less than"),
+}
+
+
+def _validate_column(
+    name: str, spec: dict[str, Any], column: pd.Series
+) -> tuple[pd.Series, list[dict[str, Any]]]:
+    # Checks run in pydantic's order and each row reports only its first failure, as
+    # `/predict` would for that item.
+    errors: list[dict[str, Any]] = []
+    bad = column.isna().to_numpy(dtype=bool, copy=True)
+    null = bad.copy()
+    if not spec["optional"] and null.any():
+        errors.append(_column_error(name, null, "missing", "Input should not be null"))
+
+    def _fail(mask: np.ndarray, error_type: str, msg: str) -> None:
+        mask = mask & ~bad
+        if mask.any():
+            errors.append(_column_error(name, mask, error_type, msg))
+            np.logical_or(bad, mask, out=bad)
+
+    if spec["kind"] is str:
+        if pd.api.types.infer_dtype(column, skipna=True) not in {"string", "empty"}:
+            is_str = column.map(lambda value: isinstance(value, str)).to_numpy(dtype=bool)
+            _fail(~is_str, "string_type", "Input should be a string")
+        column = column.astype(object)
+        min_length = spec["bounds"].get("min_length")
+        if min_length is not None:
+            lengths = column.map(lambda value: len(value) if isinstance(value, str) else 0)
+            msg = f"String should have at least {min_length} character"
+            _fail(lengths.lt(min_length).to_numpy(dtype=bool), "string_too_short", msg)
+        return column, errors
+
+    if pd.api.types.is_bool_dtype(column):
+        numeric = column.astype(float)
+    else:
+        numeric = pd.to_numeric(column, errors="coerce").astype(float)
+    values = numeric.to_numpy()
+    error_type = "int_parsing" if spec["kind"] is int else "float_parsing"
+    _fail(np.isnan(values), error_type, "Input should be a valid number")
+    if spec["kind"] is int:
+        msg = "Input should be a valid integer, got a number with a fractional part"
+        with np.errstate(invalid="ignore"):
+            _fail(values != np.floor(values), "int_from_float", msg)
+    for attr, limit in spec["bounds"].items():
+        if attr in _BOUND_CHECKS:
+            op, bound_type, msg = _BOUND_CHECKS[attr]
+            violates = getattr(numeric, op)(limit).to_numpy(dtype=bool, na_value=False)
+            _fail(violates, bound_type, f"{msg} {limit}")
+    if spec["kind"] is int and spec["optional"]:
+        return numeric.astype("Int64"), errors
+    if spec["kind"] is int:
+        # Rows that failed are dropped with the whole request; zero only keeps the cast valid.
+        return numeric.fillna(0).astype(np.int64), errors
+    return numeric, errors
+
+
+def validate_columns(frame: pd.DataFrame) -> tuple[pd.DataFrame, list[dict[str, Any]]]:
+    # One pass per column instead of one model per row. Error types and messages follow
+    # pydantic's, with offending row indices instead of one entry per row.
+    out: dict[str, pd.Series] = {}
+    errors: list[dict[str, Any]] = []
+    n_rows = len(frame)
+    for name, spec in COLUMN_SPECS.items():
+        if name in frame.columns:
+            out[name], column_errors = _validate_column(
+                name, spec, frame[name].reset_index(drop=True)
+            )
+            errors.extend(column_errors)
+        elif spec["required"]:
+            missing = np.ones(n_rows, dtype=bool)
+            errors.append(_column_error(name, missing, "missing", "Field required"))
+        else:
+            default = np.nan if spec["default"] is None else spec["default"]
+            out[name] = pd.Series(default, index=range(n_rows))
+            if spec["kind"] is int and spec["optional"]:
+                out[name] = out[name].astype("Int64")
+    return pd.DataFrame(out, index=range(n_rows)), errors
+
+
+def encode_columns(frame: pd.DataFrame, content_type: str) -> tuple[bytes, str]:
+    if content_type.startswith(ARROW_STREAM_TYPE):
+        import pyarrow as pa
+
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes(), ARROW_STREAM_TYPE
+    columns = {
+        name: frame[name].astype(object).where(frame[name].notna(), None).tolist()
+        if frame[name].dtype != object
+        else frame[name].tolist()
+        for name in frame.columns
+    }
+    body = json.dumps({"n_rows": len(frame), "columns": columns})
+    return body.encode("utf-8"), "application/json"
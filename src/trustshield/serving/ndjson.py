@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from collections.abc import AsyncIterator
+from typing import Any
+
+from starlette.requests import ClientDisconnect
+from starlette.responses import StreamingResponse
+
+MAX_LINE_BYTES = 64 * 1024
+DEFAULT_STREAM_BATCH_SIZE = 256
+
+
+async def iter_ndjson_lines(
+    chunks: AsyncIterator[bytes], max_line_bytes: int = MAX_LINE_BYTES
+) -> AsyncIterator[tuple[int, bytes | None]]:
+    # Yields (line number, raw line) for non-blank lines as body chunks arrive. A line longer
+    # than `max_line_bytes` yields (line number, None) and is skipped up to its newline, so
+    # one oversized record cannot grow the buffer without bound.
+    buffer = b""
+    line_no = 0
+    oversized = False
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_no += 1
+            if oversized:
+                oversized = False
+                yield line_no, None
+            elif len(line) > max_line_bytes:
+                yield line_no, None
+            elif line.strip():
+                yield line_no, line
+        if len(buffer) > max_line_bytes:
+            oversized = True
+            buffer = b""
+    if oversized:
+        yield line_no + 1, None
+    elif buffer.strip():
+        yield line_no + 1, buffer
+
+
+class NDJSONStreamingResponse(StreamingResponse):
+    # The stock response listens for disconnects by calling receive(), which would swallow the
+    # request body this endpoint is still reading. Here the body reader is the only consumer;
+    # a disconnect surfaces from request.stream() as ClientDisconnect instead.
+    media_type = "application/x-ndjson"
+
+    async def __call__(self, scope: dict, receive: Any, send: Any) -> None:
+        try:
+            await self.stream_response(send)
+        except OSError as exc:
+            raise ClientDisconnect() from exc
+        if self.background is not None:
+            await self.background()
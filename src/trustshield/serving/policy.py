@@ -1,13 +1,17 @@
 from __future__ import annotations
 
-import time
-from collections import defaultdict, deque
+import threading
+from collections import OrderedDict
 from pathlib import Path
 from typing import Any
 
+import numpy as np
+import pandas as pd
 import yaml
 
-from trustshield.features import extract_reason_flags
+from trustshield.features import extract_reason_flags, reason_flag_masks
+from trustshield.features.event_time import DEFAULT_MAX_CLOCK_SKEW_SECONDS, event_time
+from trustshield.features.risk_rules import _int_column
 
 
 def load_policy(config_path: str = "configs/policy.yaml") -> dict[str, Any]:
@@ -16,11 +20,20 @@ def load_policy(config_path: str = "configs/policy.yaml") -> dict[str, Any]:
         return yaml.safe_load(f)
 
 
+DEFAULT_RATE_LIMIT_BUCKETS = 12
+# The flat `rate_limits` keys (`window_seconds`, `user_review_events`, ...) cover these three.
+LEGACY_RATE_LIMIT_ENTITIES = {"user": "user_id", "device": "device_id", "ip": "ip_id"}
+
+
 class PolicyState:
     def __init__(self) -> None:
-        self.user_events: dict[str, deque[float]] = defaultdict(deque)
-        self.device_events: dict[str, deque[float]] = defaultdict(deque)
-        self.ip_events: dict[str, deque[float]] = defaultdict(deque)
+        # (key columns, windows in seconds) -> key value -> [last event time, one
+        # [bucket, total, ring] counter per window], least recently seen first.
+        self.counters: dict[tuple[Any, ...], OrderedDict[str, list[Any]]] = {}
+        # (rate_limits section, compiled plan): rules are compiled once per policy, not per event.
+        self.plan: tuple[Any, tuple[Any, ...]] | None = None
+        # Request threads share the counters; every read or update of them holds the lock.
+        self.lock = threading.Lock()
 
 
 def init_policy_state() -> PolicyState:
@@ -28,75 +41,276 @@ def init_policy_state() -> PolicyState:
 
 
 def reset_policy_state(state: PolicyState) -> None:
-    state.user_events.clear()
-    state.device_events.clear()
-    state.ip_events.clear()
+    with state.lock:
+        state.counters.clear()
 
 
 def policy_state_summary(state: PolicyState) -> dict[str, Any]:
+    tracked: dict[str, int] = {}
+    with state.lock:
+        for (keys, _), table in state.counters.items():
+            name = "+".join(keys)
+            tracked[name] = max(tracked.get(name, 0), len(table))
     return {
-        "tracked_users": len(state.user_events),
-        "tracked_devices": len(state.device_events),
-        "tracked_ips": len(state.ip_events),
-        "user_event_points": sum(len(v) for v in state.user_events.values()),
-        "device_event_points": sum(len(v) for v in state.device_events.values()),
-        "ip_event_points": sum(len(v) for v in state.ip_events.values()),
+        "tracked_users": tracked.get("user_id", 0),
+        "tracked_devices": tracked.get("device_id", 0),
+        "tracked_ips": tracked.get("ip_id", 0),
+        "tracked_keys": tracked,
     }
 
 
-def _push_event(queue: deque[float], event_ts: float, window_seconds: int) -> int:
-    queue.append(event_ts)
-    min_allowed = event_ts - float(window_seconds)
-    while queue and queue[0] < min_allowed:
-        queue.popleft()
-    return len(queue)
+def rate_limit_rules(policy: dict[str, Any]) -> list[dict[str, Any]]:
+    # One entry per (key columns, window): thresholds on the event count and the trigger prefix.
+    cfg = policy.get("rate_limits") or {}
+    rules: list[dict[str, Any]] = []
+    if "window_seconds" in cfg:
+        for entity, col in LEGACY_RATE_LIMIT_ENTITIES.items():
+            rules.append(
+                {
+                    "keys": (col,),
+                    "window_seconds": int(cfg["window_seconds"]),
+                    "review": cfg.get(f"{entity}_review_events"),
+                    "block": cfg.get(f"{entity}_block_events"),
+                    "trigger": f"rate_limit:{entity}",
+                }
+            )
+    for rule in cfg.get("rules") or []:
+        keys = tuple(rule["keys"])
+        name = rule.get("name") or "+".join(keys)
+        for window in rule["windows"]:
+            rules.append(
+                {
+                    "keys": keys,
+                    "window_seconds": int(window["seconds"]),
+                    "review": window.get("review"),
+                    "block": window.get("block"),
+                    "trigger": f"rate_limit:{name}:{int(window['seconds'])}s",
+                }
+            )
+    return rules
 
 
-def _rate_limit_triggers(payload: dict[str, Any], policy: dict[str, Any], state: PolicyState) -> list[str]:
-    cfg = policy.get("rate_limits", {})
-    if not cfg:
-        return []
+def rate_limit_clock_skew(policy: dict[str, Any]) -> float | None:
+    # Client event times are capped this far ahead of the server clock (None: no cap).
+    cfg = policy.get("rate_limits") or {}
+    skew = cfg.get("max_clock_skew_seconds", DEFAULT_MAX_CLOCK_SKEW_SECONDS)
+    return None if skew is None else float(skew)
 
-    raw_event_ts = payload.get("event_ts")
-    event_ts = float(raw_event_ts) if raw_event_ts is not None else float(time.time())
-    window_seconds = int(cfg["window_seconds"])
 
-    user_id = str(payload.get("user_id", "unknown_user"))
-    device_id = str(payload.get("device_id", "unknown_device"))
-    ip_id = str(payload.get("ip_id", "unknown_ip"))
+def _rate_limit_plan(policy: dict[str, Any]) -> tuple[int, list[tuple[Any, ...]], float | None]:
+    # Rules grouped by key columns, so each key is counted once for all of its windows.
+    rules = rate_limit_rules(policy)
+    cfg = policy.get("rate_limits") or {}
+    buckets = int(cfg.get("buckets_per_window", DEFAULT_RATE_LIMIT_BUCKETS))
+    groups: dict[tuple[str, ...], list[dict[str, Any]]] = {}
+    for rule in rules:
+        groups.setdefault(rule["keys"], []).append(rule)
+    plan = []
+    for keys, group in groups.items():
+        windows = sorted({rule["window_seconds"] for rule in group})
+        # (window position, review, block, review trigger, block trigger) per rule.
+        checks = [
+            (
+                windows.index(rule["window_seconds"]),
+                None if rule["review"] is None else int(rule["review"]),
+                None if rule["block"] is None else int(rule["block"]),
+                f"{rule['trigger']}:review",
+                f"{rule['trigger']}:block",
+            )
+            for rule in group
+        ]
+        widths = [window / buckets for window in windows]
+        plan.append(((keys, tuple(windows)), keys, widths, checks))
+    return buckets, plan, rate_limit_clock_skew(policy)
 
-    user_count = _push_event(state.user_events[user_id], event_ts, window_seconds)
-    device_count = _push_event(state.device_events[device_id], event_ts, window_seconds)
-    ip_count = _push_event(state.ip_events[ip_id], event_ts, window_seconds)
 
-    triggers: list[str] = []
-    if user_count >= int(cfg["user_block_events"]):
-        triggers.append("rate_limit:user:block")
-    elif user_count >= int(cfg["user_review_events"]):
-        triggers.append("rate_limit:user:review")
+def rate_limit_key(payload: dict[str, Any], keys: tuple[str, ...]) -> str | None:
+    # Missing and placeholder ("unknown_*") values are not entities and are never counted.
+    parts = []
+    for col in keys:
+        value = payload.get(col)
+        if value is None or value != value:
+            return None
+        value = str(value)
+        if value.startswith("unknown_"):
+            return None
+        parts.append(value)
+    return parts[0] if len(parts) == 1 else "|".join(parts)
+
+
+def _count_windows(
+    table: OrderedDict[str, list[Any]],
+    key: str,
+    event_ts: float,
+    windows: tuple[int, ...],
+    widths: list[float],
+    buckets: int,
+) -> list[int]:
+    # Each window is a ring of `buckets` counters of width window / buckets with a running
+    # total, so an update costs O(1) per window and memory does not grow with window length.
+    # A window covers between (buckets - 1) / buckets and all of its length.
+    state = table.get(key)
+    if state is None:
+        state = [event_ts, [[int(event_ts // width), 0, [0] * buckets] for width in widths]]
+        table[key] = state
+        # Tables only grow here. Keys idle for longer than the largest window count zero
+        # everywhere, so dropping them changes no count.
+        horizon = event_ts - windows[-1]
+        while table:
+            oldest = next(iter(table.values()))
+            if oldest[0] >= horizon:
+                break
+            table.popitem(last=False)
+    else:
+        if event_ts > state[0]:
+            state[0] = event_ts
+        table.move_to_end(key)
+    counts = []
+    for width, counter in zip(widths, state[1]):
+        current = int(event_ts // width)
+        bucket, total, ring = counter
+        if current > bucket:
+            if current - bucket >= buckets:
+                ring[:] = [0] * buckets
+                total = 0
+            else:
+                for stale in range(bucket + 1, current + 1):
+                    total -= ring[stale % buckets]
+                    ring[stale % buckets] = 0
+            bucket = current
+        # Late events land in the newest bucket: a window never moves backwards.
+        ring[bucket % buckets] += 1
+        counter[0], counter[1] = bucket, total + 1
+        counts.append(total + 1)
+    return counts
+
+
+def _rate_limit_triggers(
+    payload: dict[str, Any],
+    policy: dict[str, Any],
+    state: PolicyState,
+    plan: tuple[int, list[tuple[Any, ...]], float | None] | None = None,
+) -> list[str]:
+    if plan is None:
+        cfg = policy.get("rate_limits")
+        if state.plan is None or state.plan[0] is not cfg:
+            state.plan = (cfg, _rate_limit_plan(policy))
+        plan = state.plan[1]
+    buckets, groups, max_skew_seconds = plan
+    if not groups:
+        return []
 
-    if device_count >= int(cfg["device_block_events"]):
-        triggers.append("rate_limit:device:block")
-    elif device_count >= int(cfg["device_review_events"]):
-        triggers.append("rate_limit:device:review")
+    # Capped like the other online stores: one far-future `event_ts` would otherwise evict
+    # every other key of its group and pin its own ring to a bucket real time never reaches.
+    event_ts = event_time(payload.get("event_ts"), max_skew_seconds)
 
-    if ip_count >= int(cfg["ip_block_events"]):
-        triggers.append("rate_limit:ip:block")
-    elif ip_count >= int(cfg["ip_review_events"]):
-        triggers.append("rate_limit:ip:review")
+    triggers: list[str] = []
+    for table_key, keys, widths, checks in groups:
+        key = rate_limit_key(payload, keys)
+        if key is None:
+            continue
+        with state.lock:
+            table = state.counters.get(table_key)
+            if table is None:
+                table = state.counters[table_key] = OrderedDict()
+            counts = _count_windows(table, key, event_ts, table_key[1], widths, buckets)
+        for position, review, block, review_name, block_name in checks:
+            count = counts[position]
+            if block is not None and count >= block:
+                triggers.append(block_name)
+            elif review is not None and count >= review:
+                triggers.append(review_name)
 
     return sorted(set(triggers))
 
 
+def _threshold_rules(policy: dict[str, Any]) -> list[tuple[str, str, Any, Any]]:
+    # (feature, trigger prefix, review threshold, block threshold); unset thresholds never fire.
+    live_cfg = policy.get("live_graph", {})
+    rules = [
+        (
+            "live_component_users",
+            "live_graph:component_users",
+            live_cfg.get("component_users_review"),
+            live_cfg.get("component_users_block"),
+        )
+    ]
+    for rule in policy.get("velocity", {}).get("rules") or []:
+        feature = rule["feature"]
+        rules.append((feature, f"velocity:{feature}", rule.get("review"), rule.get("block")))
+    for rule in policy.get("near_duplicates", {}).get("rules") or []:
+        feature = rule["feature"]
+        rules.append((feature, f"campaign:{feature}", rule.get("review"), rule.get("block")))
+    return rules
+
+
+def _threshold_triggers(features: dict[str, float], policy: dict[str, Any]) -> list[str]:
+    triggers: list[str] = []
+    for feature, name, review, block in _threshold_rules(policy):
+        value = features.get(feature)
+        if value is None:
+            continue
+        if block is not None and value >= float(block):
+            triggers.append(f"{name}:block")
+        elif review is not None and value >= float(review):
+            triggers.append(f"{name}:review")
+    return triggers
+
+
+def _threshold_triggers_batch(features: pd.DataFrame, policy: dict[str, Any]) -> np.ndarray:
+    triggers = np.empty(len(features), dtype=object)
+    triggers[:] = [[] for _ in range(len(features))]
+    for feature, name, review, block in _threshold_rules(policy):
+        if feature not in features.columns:
+            continue
+        values = features[feature].to_numpy(dtype=float)
+        blocked = np.zeros(len(values), dtype=bool)
+        reviewed = np.zeros(len(values), dtype=bool)
+        if block is not None:
+            blocked = values >= float(block)
+        if review is not None:
+            reviewed = ~blocked & (values >= float(review))
+        for i in np.flatnonzero(blocked):
+            triggers[i].append(f"{name}:block")
+        for i in np.flatnonzero(reviewed):
+            triggers[i].append(f"{name}:review")
+    return triggers
+
+
 def decide(
-    score: float, payload: dict[str, Any], policy: dict[str, Any], state: PolicyState | None = None
+    score: float,
+    payload: dict[str, Any],
+    policy: dict[str, Any],
+    state: PolicyState | None = None,
+    live_graph: dict[str, float] | None = None,
+    velocity: dict[str, float] | None = None,
+    list_match: tuple[str, str] | None = None,
+    campaign: dict[str, float] | None = None,
 ) -> tuple[str, list[str], list[str]]:
+    # `live_graph`, `velocity` and `campaign` hold the event's OnlineEntityGraph,
+    # EntityFeatureStore and NearDuplicateIndex features; their threshold triggers rank with the
+    # rate limits, below the hard rules and above the score thresholds. `list_match` is the
+    # event's EntityLists hit, (action, list name). A block hit decides alone and is not counted
+    # by the rate limits; an allow hit only replaces the score with 0, so hard rules, rate
+    # limits and online triggers still apply.
+    if list_match is not None:
+        action, name = list_match
+        if action == "block":
+            reasons = extract_reason_flags(payload) + [f"entity_list:{name}"]
+            return "block", sorted(set(reasons)), [f"entity_list:{name}:block"]
+        decision, reasons, policy_triggers = decide(
+            0.0, payload, policy, state, live_graph, velocity, campaign=campaign
+        )
+        return decision, reasons, sorted({*policy_triggers, f"entity_list:{name}:allow"})
     reasons = extract_reason_flags(payload)
     thresholds = policy["score_thresholds"]
     hard_rules = policy["hard_rules"]
     policy_triggers: list[str] = []
     if state is not None:
         policy_triggers.extend(_rate_limit_triggers(payload, policy, state))
+    if live_graph is not None or velocity is not None or campaign is not None:
+        features = {**(live_graph or {}), **(velocity or {}), **(campaign or {})}
+        policy_triggers.extend(_threshold_triggers(features, policy))
 
     if int(payload.get("payment_attempts", 0)) >= int(hard_rules["max_payment_attempts"]):
         reasons.append("hard_rule:max_payment_attempts")
@@ -106,13 +320,13 @@ def decide(
     if int(payload.get("account_age_days", 0)) <= int(hard_rules["min_account_age_days"]):
         reasons.append("hard_rule:min_account_age_days")
         policy_triggers.append("hard_rule:min_account_age_days")
-        if any("block" in trigger for trigger in policy_triggers):
+        if any(trigger.endswith(":block") for trigger in policy_triggers):
             return "block", sorted(set(reasons)), sorted(set(policy_triggers))
         return "review", sorted(set(reasons)), sorted(set(policy_triggers))
 
-    if any("block" in trigger for trigger in policy_triggers):
+    if any(trigger.endswith(":block") for trigger in policy_triggers):
         return "block", sorted(set(reasons)), sorted(set(policy_triggers))
-    if any("review" in trigger for trigger in policy_triggers):
+    if any(trigger.endswith(":review") for trigger in policy_triggers):
         return "review", sorted(set(reasons)), sorted(set(policy_triggers))
 
     if score >= float(thresholds["block"]):
@@ -122,3 +336,145 @@ def decide(
         policy_triggers.append("score:review_threshold")
         return "review", sorted(set(reasons)), sorted(set(policy_triggers))
     return "allow", sorted(set(reasons)), sorted(set(policy_triggers))
+
+
+def _lists_from_bits(bits: np.ndarray, names: list[str]) -> np.ndarray:
+    # Few distinct flag combinations exist, so build each sorted list once and gather.
+    uniques, inverse = np.unique(bits, return_inverse=True)
+    lists = np.empty(len(uniques), dtype=object)
+    lists[:] = [sorted(name for i, name in enumerate(names) if value >> i & 1) for value in uniques]
+    return lists[inverse.reshape(-1)]
+
+
+def _rate_limit_triggers_batch(
+    df: pd.DataFrame, policy: dict[str, Any], state: PolicyState, skip: np.ndarray | None = None
+) -> np.ndarray:
+    # Rows go through the same per-key counters as `decide`, in frame order; `skip` rows are
+    # not counted.
+    n_rows = len(df)
+    plan = _rate_limit_plan(policy)
+    key_cols = sorted({col for _, keys, _, _ in plan[1] for col in keys})
+    columns = {col: df[col].tolist() if col in df.columns else [None] * n_rows for col in key_cols}
+    event_ts = (
+        df["event_ts"].astype(float).tolist() if "event_ts" in df.columns else [None] * n_rows
+    )
+    if skip is None:
+        skip = np.zeros(n_rows, dtype=bool)
+    triggers = np.empty(n_rows, dtype=object)
+    triggers[:] = [
+        []
+        if skipped
+        else _rate_limit_triggers(
+            {
+                **{col: columns[col][i] for col in key_cols},
+                "event_ts": None if ts is None or ts != ts else ts,
+            },
+            policy,
+            state,
+            plan=plan,
+        )
+        for i, (ts, skipped) in enumerate(zip(event_ts, skip.tolist()))
+    ]
+    return triggers
+
+
+def decide_batch(
+    scores: np.ndarray,
+    df: pd.DataFrame,
+    policy: dict[str, Any],
+    state: PolicyState | None = None,
+    live_graph: pd.DataFrame | None = None,
+    velocity: pd.DataFrame | None = None,
+    list_match: pd.DataFrame | None = None,
+    campaign: pd.DataFrame | None = None,
+) -> pd.DataFrame:
+    # `decide` over a whole frame. Without `state` it is stateless and rate limits are skipped
+    # (offline scoring has no per-entity history); with it, rate limits apply as online.
+    # `live_graph`, `velocity` and `campaign` hold online features row-aligned with `df`, and
+    # `list_match` the `EntityLists.match_frame` output.
+    scores = np.asarray(scores, dtype=float)
+    thresholds = policy["score_thresholds"]
+    hard_rules = policy["hard_rules"]
+    # Block hits decide alone; allow hits are scored 0 and go through every other rule.
+    blocked = np.zeros(len(scores), dtype=bool)
+    allowed = np.zeros(len(scores), dtype=bool)
+    if list_match is not None:
+        actions = list_match["list_action"].to_numpy()
+        blocked = actions == "block"
+        allowed = actions == "allow"
+        scores = np.where(allowed, 0.0, scores)
+
+    rate_triggers = None
+    if state is not None:
+        rate_triggers = _rate_limit_triggers_batch(df, policy, state, skip=blocked)
+    online = [frame for frame in (live_graph, velocity, campaign) if frame is not None]
+    if online:
+        features = pd.concat([frame.set_axis(df.index) for frame in online], axis=1)
+        threshold_triggers = _threshold_triggers_batch(features, policy)
+        if rate_triggers is None:
+            rate_triggers = threshold_triggers
+        else:
+            for i in np.flatnonzero([bool(triggers) for triggers in threshold_triggers]):
+                rate_triggers[i] = sorted([*rate_triggers[i], *threshold_triggers[i]])
+    rate_block = np.zeros(len(scores), dtype=bool)
+    rate_review = np.zeros(len(scores), dtype=bool)
+    if rate_triggers is not None:
+        rate_block[:] = [any(t.endswith(":block") for t in triggers) for triggers in rate_triggers]
+        rate_review[:] = [
+            any(t.endswith(":review") for t in triggers) for triggers in rate_triggers
+        ]
+        rate_block &= ~blocked
+        rate_review &= ~blocked
+
+    masks = reason_flag_masks(df)
+    max_attempts = ~blocked & (
+        _int_column(df, "payment_attempts") >= int(hard_rules["max_payment_attempts"])
+    )
+    min_age = (
+        ~blocked
+        & ~max_attempts
+        & (_int_column(df, "account_age_days") <= int(hard_rules["min_account_age_days"]))
+    )
+    by_score = ~blocked & ~max_attempts & ~min_age & ~rate_block & ~rate_review
+    score_block = by_score & (scores >= float(thresholds["block"]))
+    score_review = by_score & ~score_block & (scores >= float(thresholds["review"]))
+
+    decision = np.full(len(scores), "allow", dtype=object)
+    decision[score_review | min_age | rate_review] = "review"
+    decision[score_block | max_attempts | (rate_block & ~max_attempts)] = "block"
+
+    trigger_names = [
+        "hard_rule:max_payment_attempts",
+        "hard_rule:min_account_age_days",
+        "score:block_threshold",
+        "score:review_threshold",
+    ]
+    reason_names = list(masks.keys()) + trigger_names[:2]
+    reason_bits = np.zeros(len(scores), dtype=np.int64)
+    for i, mask in enumerate([*masks.values(), max_attempts, min_age]):
+        reason_bits |= mask.astype(np.int64) << i
+    trigger_bits = np.zeros(len(scores), dtype=np.int64)
+    for i, mask in enumerate([max_attempts, min_age, score_block, score_review]):
+        trigger_bits |= mask.astype(np.int64) << i
+
+    policy_triggers = _lists_from_bits(trigger_bits, trigger_names)
+    if rate_triggers is not None:
+        for i in np.flatnonzero(rate_block | rate_review):
+            policy_triggers[i] = sorted(set(policy_triggers[i]) | set(rate_triggers[i]))
+    reasons = _lists_from_bits(reason_bits, reason_names)
+    if blocked.any() or allowed.any():
+        names = list_match["list_name"].to_numpy()
+        for i in np.flatnonzero(blocked):
+            decision[i] = "block"
+            policy_triggers[i] = [f"entity_list:{names[i]}:block"]
+            reasons[i] = sorted({*reasons[i], f"entity_list:{names[i]}"})
+        for i in np.flatnonzero(allowed):
+            policy_triggers[i] = sorted({*policy_triggers[i], f"entity_list:{names[i]}:allow"})
+    return pd.DataFrame(
+        {
+            "decision": decision,
+            "reasons": reasons,
+            "policy_triggers": policy_triggers,
+        },
+        index=df.index,
+    )
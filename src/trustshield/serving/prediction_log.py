@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+
+from trustshield.ingestion.readers import iter_event_chunks
+from trustshield.ingestion.writers import FrameWriter
+
+SEGMENT_PREFIX = "predictions-"
+# Segments are written under a hidden name and renamed once complete, so readers only ever
+# see closed files (a Parquet footer is written last).
+OPEN_SEGMENT_PREFIX = ".open-"
+PREDICTION_LOG_COLUMNS = [
+    "logged_at",
+    "event_id",
+    "event_ts",
+    "message_text",
+    "country",
+    "user_id",
+    "device_id",
+    "ip_id",
+    "card_id",
+    "merchant_id",
+    "payment_attempts",
+    "account_age_days",
+    "device_reuse_count",
+    "chargeback_history",
+    "model_version",
+    "risk_score",
+    "decision",
+    "reasons",
+    "policy_triggers",
+    "latency_ms",
+]
+
+
+def _parquet_available() -> bool:
+    try:
+        import pyarrow.parquet  # noqa: F401
+    except Exception:
+        return False
+    return True
+
+
+class PredictionLog:
+    def __init__(
+        self,
+        directory: str | Path,
+        capacity: int = 50_000,
+        flush_rows: int = 1_000,
+        flush_interval_seconds: float = 1.0,
+        segment_max_rows: int = 200_000,
+        segment_max_seconds: float = 300.0,
+        fmt: str = "parquet",
+    ) -> None:
+        # Absolute so a later chdir in the process cannot redirect the writer thread.
+        self.directory = Path(directory).absolute()
+        self.capacity = int(capacity)
+        self.flush_rows = int(flush_rows)
+        self.flush_interval_seconds = float(flush_interval_seconds)
+        self.segment_max_rows = int(segment_max_rows)
+        self.segment_max_seconds = float(segment_max_seconds)
+        self.suffix = ".parquet" if fmt == "parquet" and _parquet_available() else ".jsonl"
+        self._buffer: list[dict[str, Any]] = []
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._thread: threading.Thread | None = None
+        self._writer: Any = None
+        self._segment_path: Path | None = None
+        self._segment_rows = 0
+        self._segment_opened_at = 0.0
+        self._segment_seq = 0
+        self.appended = 0
+        self.dropped = 0
+        self.written = 0
+        self.segments_closed = 0
+        self.write_errors = 0
+
+    def start(self) -> PredictionLog:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="prediction-log", daemon=True)
+        self._thread.start()
+        return self
+
+    def append(self, record: dict[str, Any]) -> bool:
+        # The request path only takes the lock and appends; all I/O is on the writer thread.
+        # A full buffer sheds the record instead of stalling the request.
+        with self._cond:
+            if len(self._buffer) >= self.capacity:
+                self.dropped += 1
+                return False
+            self._buffer.append(record)
+            self.appended += 1
+            if len(self._buffer) >= self.flush_rows:
+                self._cond.notify()
+        return True
+
+    def append_many(self, records: list[dict[str, Any]]) -> int:
+        # Batch endpoints take the lock once; records past capacity are dropped and counted.
+        with self._cond:
+            accepted = records[: max(self.capacity - len(self._buffer), 0)]
+            self._buffer.extend(accepted)
+            self.appended += len(accepted)
+            self.dropped += len(records) - len(accepted)
+            if len(self._buffer) >= self.flush_rows:
+                self._cond.notify()
+        return len(accepted)
+
+    def close(self, timeout: float = 10.0) -> None:
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def stats(self) -> dict[str, Any]:
+        with self._cond:
+            buffered = len(self._buffer)
+        return {
+            "directory": str(self.directory),
+            "format": self.suffix.lstrip("."),
+            "appended": self.appended,
+            "dropped": self.dropped,
+            "written": self.written,
+            "buffered": buffered,
+            "capacity": self.capacity,
+            "segments_closed": self.segments_closed,
+            "open_segment_rows": self._segment_rows,
+            "write_errors": self.write_errors,
+        }
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if not self._stopping and len(self._buffer) < self.flush_rows:
+                    self._cond.wait(timeout=self.flush_interval_seconds)
+                # Swap the whole buffer out so appends never wait on disk writes.
+                batch, self._buffer = self._buffer, []
+                stopping = self._stopping
+            if batch:
+                self._write(batch)
+            if self._writer is not None and (
+                stopping or time.time() - self._segment_opened_at >= self.segment_max_seconds
+            ):
+                self._close_segment()
+            if stopping:
+                return
+
+    def _write(self, batch: list[dict[str, Any]]) -> None:
+        # A large batch is split at the segment boundary so segments stay bounded in size.
+        while batch:
+            room = self.segment_max_rows - self._segment_rows
+            part, batch = batch[:room], batch[room:]
+            try:
+                self._write_part(part)
+            except Exception:
+                self.write_errors += 1
+                self.dropped += len(part)
+                continue
+            if self._segment_rows >= self.segment_max_rows:
+                self._close_segment()
+
+    def _write_part(self, part: list[dict[str, Any]]) -> None:
+        if self._writer is None:
+            self._segment_seq += 1
+            name = f"{SEGMENT_PREFIX}{int(time.time() * 1000)}-{self._segment_seq:05d}"
+            self._segment_path = self.directory / f"{name}{self.suffix}"
+            self._writer = FrameWriter(self.directory / f"{OPEN_SEGMENT_PREFIX}{name}{self.suffix}")
+            self._segment_opened_at = time.time()
+        self._writer.write(pd.DataFrame.from_records(part, columns=PREDICTION_LOG_COLUMNS))
+        self.written += len(part)
+        self._segment_rows += len(part)
+
+    def _close_segment(self) -> None:
+        writer, self._writer = self._writer, None
+        try:
+            writer.close()
+            writer.path.replace(self._segment_path)
+            self.segments_closed += 1
+        except Exception:
+            self.write_errors += 1
+        self._segment_rows = 0
+
+
+def prediction_record(
+    payload: dict[str, Any],
+    model_version: str,
+    risk_score: float,
+    decision: str,
+    reasons: list[str],
+    policy_triggers: list[str],
+    latency_ms: float,
+) -> dict[str, Any]:
+    event_ts = payload.get("event_ts")
+    event_id = payload.get("event_id")
+    return {
+        **payload,
+        "logged_at": time.time(),
+        # Fixed column types across batches: -1 / NaN stand in for values the caller omitted.
+        "event_id": -1 if event_id is None else int(event_id),
+        "event_ts": float("nan") if event_ts is None else float(event_ts),
+        "model_version": model_version,
+        "risk_score": float(risk_score),
+        "decision": decision,
+        "reasons": list(reasons),
+        "policy_triggers": list(policy_triggers),
+        "latency_ms": float(latency_ms),
+    }
+
+
+def list_segments(directory: str | Path) -> list[Path]:
+    root = Path(directory)
+    return sorted(
+        path
+        for pattern in (f"{SEGMENT_PREFIX}*.parquet", f"{SEGMENT_PREFIX}*.jsonl")
+        for path in root.glob(pattern)
+    )
+
+
+def iter_prediction_log(
+    directory: str | Path,
+    chunk_size: int = 100_000,
+    columns: list[str] | None = None,
+    segments: list[Path] | None = None,
+) -> Iterator[pd.DataFrame]:
+    # Closed segments only, streamed batch by batch; open segments are still being written.
+    # `segments` narrows the scan to a subset of `list_segments`.
+    if segments is None:
+        segments = list_segments(directory)
+    if not segments:
+        return
+    yield from iter_event_chunks(
+        segments, chunk_size=chunk_size, columns=columns or PREDICTION_LOG_COLUMNS, compact=False
+    )
@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+from typing import Literal
+
 from pydantic import BaseModel, Field
 
 
 class PredictRequest(BaseModel):
+    event_id: int | None = Field(default=None, ge=0)
     message_text: str = Field(..., min_length=1)
     country: str = Field(default="US")
     user_id: str = Field(default="unknown_user")
@@ -16,6 +19,9 @@ class PredictRequest(BaseModel):
     account_age_days: int = Field(default=30, ge=0)
     device_reuse_count: int = Field(default=1, ge=0)
     chargeback_history: int = Field(default=0, ge=0, le=1)
+    # "score" skips n-gram reasons and feature contributions, "reasons" skips contributions.
+    detail: Literal["score", "reasons", "full"] = Field(default="full")
+    latency_budget_ms: float | None = Field(default=None, gt=0)
 
 
 class PredictResponse(BaseModel):
@@ -28,6 +34,10 @@ class PredictResponse(BaseModel):
     feature_contributions: dict[str, float] = Field(default_factory=dict)
     policy_triggers: list[str] = Field(default_factory=list)
     explanation_method: str = Field(default="none")
+    stages: list[str] = Field(default_factory=list)
+    skipped_stages: list[str] = Field(default_factory=list)
+    live_graph: dict[str, float] = Field(default_factory=dict)
+    campaign: dict[str, float] = Field(default_factory=dict)
 
 
 class ReportsGenerateRequest(BaseModel):
@@ -0,0 +1,296 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from trustshield.ingestion import generate_synthetic_events
+from trustshield.ingestion.readers import iter_event_chunks
+from trustshield.serving.schemas import BatchPredictRequest
+
+PAYLOAD_FIELDS = [
+    "event_id",
+    "message_text",
+    "country",
+    "user_id",
+    "device_id",
+    "ip_id",
+    "card_id",
+    "merchant_id",
+    "event_ts",
+    "payment_attempts",
+    "account_age_days",
+    "device_reuse_count",
+    "chargeback_history",
+]
+# Log-spaced latency buckets from 0.1 ms to ~100 s, ~10% apart: a fixed-size histogram that
+# keeps p99 within one bucket width no matter how many requests a level sends.
+HISTOGRAM_EDGES_MS = np.geomspace(0.1, 100_000.0, 146)
+
+
+def load_payloads(capture_path: str | None = None, n: int = 5_000, seed: int = 42) -> list[dict]:
+    # Captured traffic can be an event file, a JSONL of request bodies or prediction log
+    # segments; anything else falls back to synthetic events.
+    if capture_path:
+        payloads: list[dict] = []
+        for chunk in iter_event_chunks(capture_path, columns=PAYLOAD_FIELDS, compact=False):
+            payloads.extend(chunk.to_dict(orient="records"))
+            if len(payloads) >= n:
+                break
+        payloads = payloads[:n]
+    else:
+        frame = generate_synthetic_events(n_samples=n, random_state=seed)
+        payloads = frame[[col for col in PAYLOAD_FIELDS if col in frame.columns]].to_dict(
+            orient="records"
+        )
+    for payload in payloads:
+        for key, value in list(payload.items()):
+            if isinstance(value, float) and np.isnan(value):
+                payload[key] = None
+            elif isinstance(value, np.generic):
+                payload[key] = value.item()
+        if payload.get("event_id") is not None and payload["event_id"] < 0:
+            payload["event_id"] = None
+    if not payloads:
+        raise ValueError("No payloads to replay.")
+    return payloads
+
+
+def _batch_max_items() -> int | None:
+    # Read from the request schema, so the tool never builds batches the API would reject.
+    for constraint in BatchPredictRequest.model_fields["items"].metadata:
+        if getattr(constraint, "max_length", None) is not None:
+            return int(constraint.max_length)
+    return None
+
+
+def _request_bodies(payloads: list[dict], batch_size: int) -> list[dict]:
+    if not payloads:
+        raise ValueError("No payloads to send; the capture or synthetic sample is empty.")
+    if batch_size <= 1:
+        return payloads
+    max_items = _batch_max_items()
+    if max_items is not None and batch_size > max_items:
+        raise ValueError(
+            f"batch_size {batch_size} exceeds the /predict/batch limit of {max_items}."
+        )
+    # The last batch may be partial; dropping it would skip payloads or leave no bodies at all.
+    return [{"items": payloads[i : i + batch_size]} for i in range(0, len(payloads), batch_size)]
+
+
+async def _send(client: Any, path: str, body: dict, started: float) -> tuple[float, bool]:
+    try:
+        response = await client.post(path, json=body)
+        ok = response.status_code < 400
+    except Exception:
+        ok = False
+    return time.perf_counter() - started, ok
+
+
+async def _closed_loop(
+    client: Any, path: str, bodies: list[dict], concurrency: int, duration: float
+) -> tuple[list[float], list[bool], float]:
+    latencies: list[float] = []
+    oks: list[bool] = []
+    cursor = 0
+    deadline = time.perf_counter() + duration
+
+    async def _worker() -> None:
+        nonlocal cursor
+        while time.perf_counter() < deadline:
+            body = bodies[cursor % len(bodies)]
+            cursor += 1
+            latency, ok = await _send(client, path, body, time.perf_counter())
+            latencies.append(latency)
+            oks.append(ok)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(_worker() for _ in range(concurrency)))
+    return latencies, oks, time.perf_counter() - started
+
+
+async def _open_loop(
+    client: Any, path: str, bodies: list[dict], rate: float, duration: float
+) -> tuple[list[float], list[bool], float]:
+    # Requests go out on a fixed schedule whether or not earlier ones finished; latency counts
+    # from the scheduled send time, so a stalled server cannot hide queueing delay.
+    n_requests = max(1, int(rate * duration))
+    started = time.perf_counter()
+    tasks = []
+    for i in range(n_requests):
+        scheduled = started + i / rate
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(_send(client, path, bodies[i % len(bodies)], scheduled)))
+    results = await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+    return [latency for latency, _ in results], [ok for _, ok in results], elapsed
+
+
+def summarize_level(
+    mode: str, level: float, latencies_s: list[float], oks: list[bool], elapsed: float, batch: int
+) -> dict[str, Any]:
+    latency_ms = np.asarray(latencies_s, dtype=float) * 1000.0
+    ok = np.asarray(oks, dtype=bool)
+    counts = np.bincount(
+        np.searchsorted(HISTOGRAM_EDGES_MS, latency_ms), minlength=len(HISTOGRAM_EDGES_MS) + 1
+    )
+    upper = np.append(HISTOGRAM_EDGES_MS, np.inf)
+    n = len(latency_ms)
+    percentiles = (
+        dict(zip(("p50", "p90", "p95", "p99"), np.percentile(latency_ms, [50, 90, 95, 99])))
+        if n
+        else {}
+    )
+    return {
+        "mode": mode,
+        "level": level,
+        "requests": n,
+        "events": n * batch,
+        "errors": int((~ok).sum()),
+        "error_rate": round(float((~ok).mean()), 4) if n else 0.0,
+        "elapsed_seconds": round(elapsed, 4),
+        "achieved_rps": round(n / elapsed, 2) if elapsed > 0 else 0.0,
+        "achieved_events_per_second": round(n * batch / elapsed, 2) if elapsed > 0 else 0.0,
+        "latency_ms": {
+            **{name: round(float(value), 3) for name, value in percentiles.items()},
+            "mean": round(float(latency_ms.mean()), 3) if n else None,
+            "max": round(float(latency_ms.max()), 3) if n else None,
+        },
+        # Only occupied buckets: [upper edge in ms, count].
+        "histogram": [
+            [round(float(upper[i]), 3) if np.isfinite(upper[i]) else None, int(counts[i])]
+            for i in np.flatnonzero(counts)
+        ],
+    }
+
+
+async def _run_levels(
+    client: Any,
+    path: str,
+    bodies: list[dict],
+    mode: str,
+    levels: list[float],
+    duration: float,
+    warmup: float,
+    batch: int,
+) -> list[dict[str, Any]]:
+    results = []
+    for level in levels:
+        runner = _closed_loop if mode == "concurrency" else _open_loop
+        run_level = int(level) if mode == "concurrency" else float(level)
+        if warmup > 0:
+            await runner(client, path, bodies, run_level, warmup)
+        latencies, oks, elapsed = await runner(client, path, bodies, run_level, duration)
+        summary = summarize_level(mode, run_level, latencies, oks, elapsed, batch)
+        results.append(summary)
+        print(
+            f"{mode}={run_level}: {summary['achieved_rps']} req/s, "
+            f"p99 {summary['latency_ms'].get('p99')} ms, error rate {summary['error_rate']}"
+        )
+    return results
+
+
+def run_load_test(
+    levels: list[float],
+    mode: str = "concurrency",
+    duration: float = 10.0,
+    warmup: float = 1.0,
+    url: str | None = None,
+    endpoint: str = "/predict",
+    batch_size: int = 1,
+    capture_path: str | None = None,
+    n_payloads: int = 5_000,
+) -> dict[str, Any]:
+    import httpx
+
+    if mode not in {"concurrency", "rate"}:
+        raise ValueError("mode must be `concurrency` or `rate`.")
+    bodies = _request_bodies(load_payloads(capture_path, n=n_payloads), batch_size)
+    path = "/predict/batch" if batch_size > 1 and endpoint == "/predict" else endpoint
+
+    async def _main() -> list[dict[str, Any]]:
+        if url:
+            client = httpx.AsyncClient(base_url=url, timeout=30.0)
+        else:
+            # In-process: the ASGI app runs in this event loop; no socket or server involved.
+            # The transport skips lifespan startup, so the model is loaded here instead.
+            import trustshield.serving.app as serving_app
+
+            if serving_app.model_state["status"] == "not_started":
+                serving_app.load_model()
+            app = serving_app.app
+            client = httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app), base_url="http://loadtest", timeout=30.0
+            )
+        async with client:
+            return await _run_levels(
+                client, path, bodies, mode, levels, duration, warmup, max(batch_size, 1)
+            )
+
+    results = asyncio.run(_main())
+    report = {
+        "generated_at_epoch": int(time.time()),
+        "target": url or "in-process",
+        "endpoint": path,
+        "mode": mode,
+        "batch_size": batch_size,
+        "duration_seconds": duration,
+        "payload_source": capture_path or "synthetic",
+        "levels": results,
+        "curve": [
+            {
+                "level": row["level"],
+                "achieved_rps": row["achieved_rps"],
+                "p99_ms": row["latency_ms"].get("p99"),
+                "error_rate": row["error_rate"],
+            }
+            for row in results
+        ],
+    }
+    out_path = Path("reports/load_test.json")
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"Load test report saved to {out_path}")
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay payload streams against the API.")
+    parser.add_argument("--mode", choices=["concurrency", "rate"], default="concurrency")
+    parser.add_argument(
+        "--levels",
+        type=float,
+        nargs="+",
+        default=[1, 2, 4, 8, 16],
+        help="Concurrency levels (closed loop) or target request rates (open loop)",
+    )
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per level")
+    parser.add_argument("--warmup", type=float, default=1.0, help="Unrecorded seconds per level")
+    parser.add_argument("--url", default=None, help="Running server, e.g. http://127.0.0.1:8000")
+    parser.add_argument("--endpoint", default="/predict")
+    parser.add_argument("--batch-size", type=int, default=1)
+    parser.add_argument("--capture", default=None, help="Event/JSONL/prediction-log file or glob")
+    parser.add_argument("--payloads", type=int, default=5_000)
+    args = parser.parse_args()
+    run_load_test(
+        args.levels,
+        mode=args.mode,
+        duration=args.duration,
+        warmup=args.warmup,
+        url=args.url,
+        endpoint=args.endpoint,
+        batch_size=args.batch_size,
+        capture_path=args.capture,
+        n_payloads=args.payloads,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,70 @@
 from __future__ import annotations
 
+import argparse
+import json
+from pathlib import Path
+
 from trustshield.ingestion import generate_synthetic_events
+from trustshield.ingestion.readers import DEFAULT_CHUNK_SIZE
 from trustshield.preprocessing import normalize_text, validate_events
+from trustshield.preprocessing.chunked_validation import (
+    DEFAULT_MAX_SAMPLES,
+    DEFAULT_SPLIT_BYTES,
+    validate_event_files,
+)
 
 
-def main() -> None:
+def _validate_synthetic() -> None:
     df = generate_synthetic_events(n_samples=1000, random_state=42)
     df["message_text"] = df["message_text"].map(normalize_text)
     validate_events(df)
     print("Validation passed: synthetic training frame is schema-compliant.")
 
 
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Validate event data against the event schema.")
+    parser.add_argument("--input", default=None, help="Event file or glob")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--max-samples", type=int, default=DEFAULT_MAX_SAMPLES)
+    parser.add_argument(
+        "--split-bytes",
+        type=int,
+        default=DEFAULT_SPLIT_BYTES,
+        help="Approximate bytes of CSV/JSONL per unit of work",
+    )
+    parser.add_argument("--output", default="reports/validation.json")
+    args = parser.parse_args()
+
+    if args.input is None:
+        _validate_synthetic()
+        return
+
+    report = validate_event_files(
+        args.input,
+        chunk_size=args.chunk_size,
+        workers=args.workers,
+        max_samples=args.max_samples,
+        split_bytes=args.split_bytes,
+    )
+    output_path = Path(args.output)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    output_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    print(
+        f"Validated {report['rows']} rows from {len(report['inputs'])} file(s) "
+        f"with {report['workers']} worker(s) in {report['elapsed_seconds']}s"
+    )
+    for rule, count in report["violations"].items():
+        print(f"  {rule}: {count}")
+    if report["missing_columns"]:
+        print(f"  missing columns: {report['missing_columns']}")
+    if report["unexpected_columns"]:
+        print(f"  unexpected columns: {report['unexpected_columns']}")
+    print(f"Saved validation report to {output_path}")
+    if not report["valid"]:
+        raise SystemExit(1)
+
+
 if __name__ == "__main__":
     main()
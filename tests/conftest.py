@@ -0,0 +1,21 @@
+import joblib
+import pytest
+
+from trustshield.ingestion import generate_synthetic_events
+from trustshield.models.train import fit_ensemble
+from trustshield.preprocessing import normalize_text
+
+
+@pytest.fixture(scope="session")
+def bundle() -> dict:
+    # A small trained bundle shared by tests that score with a model rather than test training.
+    df = generate_synthetic_events(n_samples=400, random_state=5)
+    df["message_text"] = df["message_text"].map(normalize_text)
+    return fit_ensemble(df, max_features_tfidf=200, random_state=5)
+
+
+@pytest.fixture(scope="session")
+def bundle_path(bundle, tmp_path_factory) -> str:
+    path = tmp_path_factory.mktemp("bundle") / "model_bundle.joblib"
+    joblib.dump(bundle, path)
+    return str(path)
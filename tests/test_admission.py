@@ -0,0 +1,50 @@
+from fastapi.testclient import TestClient
+
+import trustshield.serving.app as serving_app
+from trustshield.serving.admission import AdmissionController
+
+client = TestClient(serving_app.app)
+PAYLOAD = {"message_text": "hello there", "account_age_days": 30}
+
+
+def test_controller_caps_in_flight_work() -> None:
+    controller = AdmissionController(max_in_flight=2)
+    assert controller.try_admit() and controller.try_admit()
+    assert not controller.try_admit()
+    controller.release()
+    assert controller.try_admit()
+    stats = controller.stats()
+    assert stats["in_flight"] == 2
+    assert stats["peak_in_flight"] == 2
+    assert stats["rejected"] == 1
+    # Outside the middleware there is no ticket: always admitted with no queue delay.
+    assert controller.classify() == ("admitted", 0.0)
+
+
+def test_predict_rejects_with_429_over_in_flight_limit(monkeypatch) -> None:
+    monkeypatch.setattr(serving_app.admission, "max_in_flight", 0)
+    response = client.post("/predict", json=PAYLOAD)
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "1"
+    assert client.post("/explain", json=PAYLOAD).status_code == 200
+
+
+def test_predict_sheds_with_503_when_queue_delay_exceeds_budget(monkeypatch) -> None:
+    monkeypatch.setattr(serving_app.admission, "shed_queue_ms", 0.0)
+    response = client.post("/predict", json=PAYLOAD)
+    assert response.status_code == 503
+    assert response.json()["detail"]["status"] == "shed"
+
+
+def test_predict_degrades_to_heuristic_when_queue_delay_exceeds_budget(monkeypatch) -> None:
+    monkeypatch.setattr(serving_app.admission, "shed_queue_ms", None)
+    monkeypatch.setattr(serving_app.admission, "degrade_queue_ms", 0.0)
+    monkeypatch.setattr(serving_app, "bundle", {"model_version": "ts-test"})
+    serving_app.admission.reset()
+    response = client.post("/predict/batch", json={"items": [PAYLOAD, PAYLOAD]})
+    assert response.status_code == 200
+    items = response.json()["items"]
+    assert {item["model_version"] for item in items} == {"degraded-heuristic"}
+    assert {item["explanation_method"] for item in items} == {"degraded"}
+    # One verdict per request, however many items it carries.
+    assert serving_app.admission.stats()["degraded"] == 1
@@ -1,5 +1,10 @@
+import json
+
+import numpy as np
 from fastapi.testclient import TestClient
 
+from trustshield.evaluation.error_cube import build_error_cube
+from trustshield.ingestion import generate_synthetic_events
 from trustshield.serving.app import app
 
 
@@ -321,3 +326,38 @@ def test_explain() -> None:
     assert "tabular_score" in body["components"]
     assert "feature_contributions" in body
     assert body["explanation_method"] in {"shap", "linear_coef", "fallback", "none"}
+
+
+def test_error_analysis_slices_endpoint(tmp_path, monkeypatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    missing = client.get("/error-analysis/slices", params={"dimension": "country"}).json()
+    assert missing["status"] == "missing"
+
+    events = generate_synthetic_events(n_samples=300, random_state=3)
+    scores = np.linspace(0.0, 1.0, len(events))
+    cube = build_error_cube(events, scores, events["is_fraud"].to_numpy(), threshold=0.5, top_k=2)
+    (tmp_path / "reports").mkdir()
+    (tmp_path / "reports" / "error_analysis.json").write_text(json.dumps({"cube": cube}))
+
+    response = client.get("/error-analysis/slices", params={"dimension": "country"})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "ok"
+    assert body["threshold"] == 0.5
+    assert list(body["dimensions"]) == ["country"]
+    slices = body["dimensions"]["country"]
+    assert set(slices) == set(events["country"].unique())
+    for country, summary in slices.items():
+        in_country = (events["country"] == country).to_numpy()
+        flagged = in_country & (scores >= 0.5)
+        assert summary["n"] == int(in_country.sum())
+        assert summary["fp"] == int((flagged & (events["is_fraud"] == 0)).sum())
+        assert not any(key.startswith("top_") for key in summary)
+    assert sum(summary["n"] for summary in slices.values()) == len(events)
+
+    detailed = client.get(
+        "/error-analysis/slices", params={"dimension": "country", "include_exemplars": True}
+    ).json()
+    assert detailed["dimensions"]["country"] == cube["dimensions"]["country"]
+    unknown = client.get("/error-analysis/slices", params={"dimension": "planet"}).json()
+    assert unknown["status"] == "missing"
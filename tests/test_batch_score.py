@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+
+from trustshield.ingestion import generate_synthetic_events
+from trustshield.models import explain_event, score_frame
+from trustshield.models.batch_score import run_batch_scoring
+from trustshield.serving.policy import decide, decide_batch, load_policy
+
+
+def test_score_frame_and_decide_batch_match_per_event_path(bundle) -> None:
+    policy = load_policy()
+    events = generate_synthetic_events(n_samples=120, random_state=6)
+    scored = score_frame(bundle, events)
+    decided = decide_batch(scored["risk_score"].to_numpy(), events, policy)
+
+    for i, row in enumerate(events.to_dict(orient="records")):
+        expected = explain_event(bundle, row)
+        assert np.isclose(scored["risk_score"].iloc[i], expected["risk_score"])
+        assert scored["model_reasons"].iloc[i] == expected["model_reasons"]
+        decision, reasons, triggers = decide(expected["risk_score"], row, policy)
+        assert decided["decision"].iloc[i] == decision
+        assert decided["reasons"].iloc[i] == reasons
+        assert decided["policy_triggers"].iloc[i] == triggers
+
+
+def test_run_batch_scoring_writes_jsonl(tmp_path, bundle_path) -> None:
+    events = generate_synthetic_events(n_samples=250, random_state=7)
+    events.to_csv(tmp_path / "events.csv", index=False)
+
+    summary = run_batch_scoring(
+        tmp_path / "events.csv",
+        tmp_path / "scores.jsonl",
+        bundle_path=bundle_path,
+        chunk_size=100,
+        workers=1,
+        progress_every=0,
+    )
+    out = pd.read_json(tmp_path / "scores.jsonl", lines=True)
+    assert summary["rows"] == 250
+    assert summary["chunks"] == 3
+    assert sum(summary["decisions"].values()) == 250
+    assert out["event_id"].tolist() == events["event_id"].tolist()
+    assert {"risk_score", "decision", "reasons", "policy_triggers"} <= set(out.columns)
+
+
+def test_run_batch_scoring_workers_match_single_process(tmp_path, bundle_path) -> None:
+    generate_synthetic_events(n_samples=300, random_state=8).to_csv(
+        tmp_path / "events.csv", index=False
+    )
+
+    outputs = {}
+    for workers in (1, 2):
+        summary = run_batch_scoring(
+            tmp_path / "events.csv",
+            tmp_path / f"scores_{workers}.jsonl",
+            bundle_path=bundle_path,
+            chunk_size=64,
+            workers=workers,
+            progress_every=0,
+        )
+        assert summary["workers"] == workers
+        outputs[workers] = pd.read_json(tmp_path / f"scores_{workers}.jsonl", lines=True)
+    pd.testing.assert_frame_equal(outputs[2], outputs[1])
@@ -0,0 +1,86 @@
+import pandas as pd
+import pytest
+
+from trustshield.ingestion import generate_synthetic_events
+from trustshield.preprocessing.chunked_validation import check_event_chunk, validate_event_files
+from trustshield.preprocessing.validation import _fallback_validate
+
+
+def _dirty_events() -> pd.DataFrame:
+    df = generate_synthetic_events(n_samples=400, random_state=5)
+    df.loc[[3, 150, 399], "payment_attempts"] = -1
+    df.loc[[10, 150], "country"] = "USA"
+    df.loc[20, "is_fraud"] = 2
+    return df
+
+
+def test_check_event_chunk_counts_rules_and_bounds_samples() -> None:
+    result = check_event_chunk(_dirty_events(), max_samples=2, source="mem")
+    assert result["rows"] == 400
+    assert result["invalid_rows"] == 5
+    assert result["violations"] == {
+        "country:iso2": 2,
+        "payment_attempts:non_negative_int": 3,
+        "is_fraud:binary": 1,
+    }
+    assert [sample["row"] for sample in result["samples"]] == [3, 10]
+    assert result["samples"][0]["rules"] == ["payment_attempts:non_negative_int"]
+    assert result["samples"][0]["record"]["payment_attempts"] == -1
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_validate_event_files_aggregates_across_files(tmp_path, workers) -> None:
+    df = _dirty_events()
+    df.iloc[:200].to_csv(tmp_path / "events_00.csv", index=False)
+    df.iloc[200:].to_json(tmp_path / "events_01.jsonl", orient="records", lines=True)
+
+    report = validate_event_files(
+        str(tmp_path / "events_*"), chunk_size=64, workers=workers, max_samples=3
+    )
+    assert report["rows"] == 400
+    assert report["invalid_rows"] == 5
+    assert report["violations"]["payment_attempts:non_negative_int"] == 3
+    assert not report["valid"]
+    assert len(report["samples"]) == 3
+    assert report["samples"][-1]["row"] == 20
+
+
+@pytest.mark.parametrize("suffix", ["csv", "jsonl"])
+def test_single_file_splits_into_byte_ranges(tmp_path, suffix) -> None:
+    df = _dirty_events()
+    # A quoted newline in a CSV field must never become a split point.
+    df["message_text"] = df["message_text"] + '\nsee "attached"'
+    path = tmp_path / f"events.{suffix}"
+    if suffix == "csv":
+        df.to_csv(path, index=False)
+    else:
+        df.to_json(path, orient="records", lines=True)
+
+    single = validate_event_files(path, chunk_size=64, workers=1, max_samples=5)
+    split = validate_event_files(path, chunk_size=64, workers=2, max_samples=5, split_bytes=4_096)
+    assert single["units"] == 1
+    assert split["units"] > 2
+    assert split["workers"] == 2
+    for key in ("rows", "invalid_rows", "violations", "unexpected_columns"):
+        assert split[key] == single[key]
+    assert [sample["row"] for sample in split["samples"]] == [3, 10, 20, 150, 399]
+    assert split["samples"] == single["samples"]
+
+
+def test_validate_event_files_reports_clean_parquet_row_groups(tmp_path) -> None:
+    pytest.importorskip("pyarrow")
+    df = generate_synthetic_events(n_samples=300, random_state=8)
+    path = tmp_path / "events.parquet"
+    df.to_parquet(path, index=False, row_group_size=100)
+
+    report = validate_event_files(path, workers=1)
+    assert report["valid"]
+    assert report["units"] == 3
+    assert report["rows"] == 300
+
+
+def test_fallback_validate_uses_rule_masks() -> None:
+    df = generate_synthetic_events(n_samples=50, random_state=1)
+    df.loc[0, "chargeback_history"] = 3
+    with pytest.raises(ValueError, match="chargeback_history"):
+        _fallback_validate(df)
@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+import trustshield.serving.app as serving_app
+from trustshield.ingestion import generate_synthetic_events
+from trustshield.serving.columnar import ARROW_STREAM_TYPE
+from trustshield.serving.policy import init_policy_state
+
+client = TestClient(serving_app.app)
+FIELDS = ["message_text", "country", "user_id", "device_id", "ip_id", "card_id", "event_ts"]
+FIELDS += ["payment_attempts", "account_age_days", "device_reuse_count", "chargeback_history"]
+# Online feature state enabled whatever configs/policy.yaml says, so it is compared too.
+POLICY = {
+    **serving_app.policy_cfg,
+    "live_graph": {"enabled": True},
+    "velocity": {**serving_app.policy_cfg.get("velocity", {}), "enabled": True},
+}
+
+
+def _items(n: int) -> list[dict]:
+    events = generate_synthetic_events(n_samples=n, random_state=22)
+    events["event_ts"] = 1_700_000_000.0 + np.arange(n) * 3.0
+    return events[FIELDS].to_dict(orient="records")
+
+
+def test_columnar_matches_per_item_batch(monkeypatch, bundle) -> None:
+    monkeypatch.setattr(serving_app, "bundle", bundle)
+    items = _items(60)
+    monkeypatch.setattr(serving_app, "policy_runtime_state", init_policy_state())
+    monkeypatch.setattr(serving_app, "live_graph", serving_app._init_live_graph(POLICY))
+    monkeypatch.setattr(serving_app, "feature_store", serving_app._init_feature_store(POLICY))
+    expected = client.post("/predict/batch", json={"items": items}).json()["items"]
+
+    monkeypatch.setattr(serving_app, "policy_runtime_state", init_policy_state())
+    monkeypatch.setattr(serving_app, "live_graph", serving_app._init_live_graph(POLICY))
+    monkeypatch.setattr(serving_app, "feature_store", serving_app._init_feature_store(POLICY))
+    columns = {name: [item[name] for item in items] for name in FIELDS}
+    response = client.post("/predict/columnar", json={"columns": columns})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["n_rows"] == 60
+    got = body["columns"]
+    assert np.allclose(got["risk_score"], [item["risk_score"] for item in expected], atol=1e-4)
+    assert got["decision"] == [item["decision"] for item in expected]
+    assert got["reasons"] == [item["reasons"] for item in expected]
+    assert got["policy_triggers"] == [item["policy_triggers"] for item in expected]
+    assert got["model_reasons"] == [item["model_reasons"] for item in expected]
+    users = [item["live_graph"]["live_component_users"] for item in expected]
+    assert got["live_component_users"] == users
+
+
+def test_columnar_arrow_round_trip(monkeypatch, bundle) -> None:
+    pa = pytest.importorskip("pyarrow")
+    monkeypatch.setattr(serving_app, "bundle", bundle)
+    items = _items(10)
+    table = pa.table({name: [item[name] for item in items] for name in FIELDS})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    response = client.post(
+        "/predict/columnar",
+        content=sink.getvalue().to_pybytes(),
+        headers={"content-type": ARROW_STREAM_TYPE},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith(ARROW_STREAM_TYPE)
+    result = pa.ipc.open_stream(response.content).read_all()
+    assert result.num_rows == 10
+    assert set(result.column("decision").to_pylist()) <= {"allow", "review", "block"}
+
+
+def test_columnar_validation_reports_rows_per_constraint() -> None:
+    columns = {
+        "message_text": ["ok", "", None, "ok"],
+        "payment_attempts": [1, -1, 2, 1.5],
+        "chargeback_history": [0, 1, 2, 0],
+    }
+    response = client.post("/predict/columnar", json={"columns": columns})
+    assert response.status_code == 422
+    errors = {(e["loc"][1], e["type"]): e["rows"] for e in response.json()["detail"]}
+    assert errors == {
+        ("message_text", "missing"): [2],
+        ("message_text", "string_too_short"): [1],
+        ("payment_attempts", "greater_than_equal"): [1],
+        ("payment_attempts", "int_from_float"): [3],
+        ("chargeback_history", "less_than_equal"): [2],
+    }
+    ragged = {"columns": {"message_text": ["a"], "country": []}}
+    assert client.post("/predict/columnar", json=ragged).status_code == 400
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from trustshield.evaluation.cost_curve import (
+    best_block_only,
+    cost_curve,
+    curve_points,
+    optimize_thresholds,
+    segment_cost_curves,
+)
+from trustshield.evaluation.metrics import cost_saved_metric
+
+
+def _brute_force(y, s, fraud_cost, review_cost, block_fp_cost, thresholds) -> float:
+    best = -np.inf
+    for r in thresholds:
+        for b in thresholds:
+            if b < r:
+                continue
+            value = (
+                fraud_cost * ((s >= r) & (y == 1)).sum()
+                - review_cost * ((s >= r) & (s < b)).sum()
+                - block_fp_cost * ((s >= b) & (y == 0)).sum()
+            )
+            best = max(best, value)
+    return float(best)
+
+
+def test_cost_curve_matches_pointwise_metric() -> None:
+    rng = np.random.default_rng(0)
+    y = rng.integers(0, 2, 400)
+    s = np.round(rng.random(400), 2)
+    curve = cost_curve(y, s, fraud_cost=100.0, review_cost=2.0)
+    for threshold, saved in zip(curve["thresholds"], curve["cost_saved_block"]):
+        assert saved == cost_saved_metric(y, (s >= threshold).astype(int), 100.0, 2.0)
+    block_only = best_block_only(curve)
+    assert block_only["cost_saved"] == curve["cost_saved_block"].max()
+
+
+def test_optimize_thresholds_is_exact() -> None:
+    rng = np.random.default_rng(1)
+    for _ in range(20):
+        n = int(rng.integers(1, 40))
+        y = rng.integers(0, 2, n)
+        s = np.round(rng.random(n), 1)
+        costs = {"fraud_cost": 10.0, "review_cost": 1.5, "block_fp_cost": 12.0}
+        curve = cost_curve(y, s, **costs)
+        best = optimize_thresholds(curve)
+        assert best["block_threshold"] >= best["review_threshold"]
+        assert np.isclose(
+            best["cost_saved"],
+            _brute_force(y, s, thresholds=curve["thresholds"], **costs),
+        )
+
+
+def test_segment_curves_and_points_are_bounded() -> None:
+    rng = np.random.default_rng(2)
+    y = rng.integers(0, 2, 5_000)
+    s = rng.random(5_000)
+    segments = pd.Series(rng.choice(["US", "DE", "NG"], size=5_000, p=[0.6, 0.39, 0.01]))
+    per_segment = segment_cost_curves(segments, y, s, min_events=100)
+    assert set(per_segment) == {"US", "DE"}
+    assert per_segment["US"]["n_events"] > per_segment["DE"]["n_events"]
+    points = curve_points(cost_curve(y, s), max_points=50)
+    assert len(points) <= 50
+    assert points[0]["flagged"] == 0
+
+
+def test_empty_input_gives_a_flag_nothing_curve() -> None:
+    curve = cost_curve(np.array([]), np.array([]))
+    assert curve["thresholds"].tolist() == [1.0]
+    assert curve["flagged"].tolist() == [0]
+    assert curve["cost_saved_block"].tolist() == [0.0]
+    optimal = optimize_thresholds(curve)
+    assert optimal["cost_saved"] == 0.0
+    assert optimal["review_load"] == optimal["block_volume"] == 0
+    assert best_block_only(curve)["block_volume"] == 0
+    assert len(curve_points(curve)) == 1
+    with pytest.raises(ValueError, match="scores has 2"):
+        cost_curve(np.array([1]), np.array([0.2, 0.4]))
@@ -0,0 +1,80 @@
+import numpy as np
+
+from trustshield.ingestion import generate_synthetic_events
+from trustshield.models import explain_event
+from trustshield.models.train import fit_ensemble
+from trustshield.monitoring.drift import StreamingDriftMonitor, build_drift_baseline, psi
+from trustshield.preprocessing import normalize_text
+
+
+def _feed(monitor: StreamingDriftMonitor, values: np.ndarray, flags: np.ndarray) -> None:
+    for value, flag in zip(values, flags):
+        monitor.update({"amount": float(value), "flag": float(flag)})
+
+
+def test_baseline_collapses_discrete_bins() -> None:
+    rng = np.random.default_rng(0)
+    baseline = build_drift_baseline(
+        {"amount": rng.normal(size=5000), "flag": rng.integers(0, 2, 5000)}, n_bins=10
+    )
+    assert len(baseline["features"]["amount"]["edges"]) == 9
+    assert len(baseline["features"]["flag"]["counts"]) == 2
+    assert sum(baseline["features"]["amount"]["counts"]) == 5000
+
+
+def test_update_batch_matches_per_event_updates() -> None:
+    rng = np.random.default_rng(2)
+    baseline = build_drift_baseline(
+        {"amount": rng.normal(size=5000), "flag": rng.integers(0, 2, 5000)}
+    )
+    values, flags = rng.normal(size=500), rng.integers(0, 2, 500)
+    one_by_one = StreamingDriftMonitor(baseline, min_events=100)
+    _feed(one_by_one, values, flags)
+    batched = StreamingDriftMonitor(baseline, min_events=100)
+    batched.update_batch({"amount": values, "flag": flags.astype(float)})
+    assert batched.snapshot() == one_by_one.snapshot()
+
+
+def test_streaming_monitor_flags_shifted_feature_only() -> None:
+    rng = np.random.default_rng(1)
+    baseline = build_drift_baseline(
+        {"amount": rng.normal(size=5000), "flag": rng.integers(0, 2, 5000)}
+    )
+    monitor = StreamingDriftMonitor(baseline, min_events=100)
+    _feed(monitor, rng.normal(size=2000), rng.integers(0, 2, 2000))
+    stable = monitor.snapshot(psi_alert=0.2)
+    assert stable["drift_status"] == "ok"
+    assert stable["events_seen"] == 2000
+
+    monitor.reset()
+    _feed(monitor, rng.normal(loc=1.5, size=2000), rng.integers(0, 2, 2000))
+    shifted = monitor.snapshot(psi_alert=0.2)
+    assert shifted["drift_status"] == "warn"
+    assert shifted["drifted_features"] == ["amount"]
+    assert shifted["features"]["amount"]["ks"] > 0.4
+    assert shifted["features"]["flag"]["psi"] < 0.05
+
+
+def test_streaming_monitor_memory_stays_bounded() -> None:
+    baseline = build_drift_baseline({"amount": np.arange(100.0)})
+    monitor = StreamingDriftMonitor(baseline, half_life_events=50, min_events=1)
+    _feed(monitor, np.arange(1000.0) % 100, np.zeros(1000))
+    snap = monitor.snapshot()
+    assert snap["events_seen"] == 1000
+    assert snap["effective_events"] < 100
+    assert snap["drift_status"] == "ok"
+    assert psi(np.array([5, 5]), np.array([5, 5])) == 0.0
+
+
+def test_fit_ensemble_stores_drift_baseline_for_serving_features() -> None:
+    df = generate_synthetic_events(n_samples=400, random_state=7)
+    df["message_text"] = df["message_text"].map(normalize_text)
+    bundle = fit_ensemble(df, max_features_tfidf=200, random_state=7)
+    features = bundle["drift_baseline"]["features"]
+    assert "risk_score" in features
+    assert "graph_max_entity_pagerank" in features
+
+    out = explain_event(bundle, {"message_text": "urgent transfer now", "country": "NG"})
+    monitor = StreamingDriftMonitor(bundle["drift_baseline"], min_events=1)
+    monitor.update({**out["features"], "risk_score": out["risk_score"]})
+    assert set(monitor.snapshot()["features"]) == set(features)
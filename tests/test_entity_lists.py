@@ -0,0 +1,145 @@
+import numpy as np
+import pandas as pd
+from fastapi.testclient import TestClient
+
+import trustshield.serving.app as serving_app
+from trustshield.serving.entity_lists import EntityLists, compile_entity_list, load_entity_list
+from trustshield.serving.policy import decide, decide_batch, init_policy_state, load_policy
+
+client = TestClient(serving_app.app)
+
+
+def _lists(tmp_path) -> EntityLists:
+    (tmp_path / "cards.txt").write_text("# known fraud\ncard_1\n\ncard_2\ncard_1\n")
+    (tmp_path / "merchants.txt").write_text("merchant_ok\n")
+    return EntityLists(
+        [
+            {
+                "name": "trusted_merchants",
+                "column": "merchant_id",
+                "action": "allow",
+                "path": str(tmp_path / "merchants.txt"),
+            },
+            {
+                "name": "blocked_cards",
+                "column": "card_id",
+                "action": "block",
+                "path": str(tmp_path / "cards.txt"),
+            },
+            {
+                "name": "blocked_ips",
+                "column": "ip_id",
+                "action": "block",
+                "path": str(tmp_path / "missing.txt"),
+            },
+        ]
+    )
+
+
+def test_lists_match_reload_and_compile(tmp_path) -> None:
+    lists = _lists(tmp_path)
+    assert lists.match({"card_id": "card_2"}) == ("block", "blocked_cards")
+    assert lists.match({"card_id": "card_9", "merchant_id": "merchant_ok"}) == (
+        "allow",
+        "trusted_merchants",
+    )
+    # Blocks win over allows.
+    assert lists.match({"card_id": "card_1", "merchant_id": "merchant_ok"})[0] == "block"
+    assert lists.match({"card_id": "card_9", "ip_id": "ip_1"}) is None
+    stats = {entry["name"]: entry for entry in lists.stats()["lists"]}
+    assert stats["blocked_cards"]["entries"] == 2
+    assert stats["blocked_ips"]["missing"]
+
+    frame = pd.DataFrame(
+        {"card_id": ["card_1", "card_9", None, "card_1"], "merchant_id": ["m", "merchant_ok"] * 2}
+    )
+    matched = lists.match_frame(frame)
+    assert matched["list_action"].tolist()[:2] == ["block", "allow"]
+    assert pd.isna(matched["list_action"].iloc[2])
+    assert matched["list_name"].iloc[3] == "blocked_cards"
+
+    compiled = tmp_path / "cards.npy"
+    assert compile_entity_list(tmp_path / "cards.txt", compiled) == 2
+    assert np.array_equal(load_entity_list(compiled), load_entity_list(tmp_path / "cards.txt"))
+    (tmp_path / "missing.txt").write_text("ip_1\n")
+    (tmp_path / "cards.txt").write_text("card_3\n")
+    lists.reload()
+    assert lists.match({"card_id": "card_9", "ip_id": "ip_1"}) == ("block", "blocked_ips")
+    assert lists.match({"card_id": "card_1"}) is None
+
+
+def test_block_hits_decide_alone_and_allow_hits_keep_the_rules(tmp_path) -> None:
+    lists = _lists(tmp_path)
+    policy = load_policy()
+    policy["rate_limits"] = {
+        "rules": [{"name": "user", "keys": ["user_id"], "windows": [{"seconds": 60, "block": 3}]}]
+    }
+    frame = pd.DataFrame(
+        {
+            "message_text": "hi",
+            "user_id": "u1",
+            "card_id": ["card_1", "card_9", "card_9", "card_2", "card_9", "card_9"],
+            "merchant_id": ["m", "merchant_ok", "merchant_ok", "m", "m", "m"],
+            "payment_attempts": [1, 1, 9, 1, 1, 1],
+            "account_age_days": 30,
+            "event_ts": np.arange(6, dtype=float),
+        }
+    )
+    scores = np.full(len(frame), 0.9)
+    state = init_policy_state()
+    single = [
+        decide(float(score), row, policy, state=state, list_match=lists.match(row))
+        for score, row in zip(scores, frame.to_dict(orient="records"))
+    ]
+    # Block-listed rows 0 and 3 are not counted; the allow-listed rows 1 and 2 are, so the
+    # user reaches the limit on row 4.
+    assert [d for d, _, _ in single] == ["block", "allow", "block", "block", "block", "block"]
+    assert single[0][2] == ["entity_list:blocked_cards:block"]
+    assert "entity_list:blocked_cards" in single[0][1]
+    # The allow hit replaces the 0.9 score, but not the hard rules.
+    assert single[1][2] == ["entity_list:trusted_merchants:allow"]
+    assert single[2][2] == [
+        "entity_list:trusted_merchants:allow",
+        "hard_rule:max_payment_attempts",
+    ]
+    assert single[4][2] == ["rate_limit:user:60s:block"]
+
+    batch = decide_batch(
+        scores, frame, policy, state=init_policy_state(), list_match=lists.match_frame(frame)
+    )
+    assert batch["decision"].tolist() == [d for d, _, _ in single]
+    assert batch["reasons"].tolist() == [r for _, r, _ in single]
+    assert batch["policy_triggers"].tolist() == [t for _, _, t in single]
+
+
+def test_listed_events_are_decided_without_the_model(monkeypatch, tmp_path) -> None:
+    monkeypatch.setattr(serving_app, "bundle", None)
+    monkeypatch.setattr(serving_app, "entity_lists", _lists(tmp_path))
+    items = [
+        {"message_text": "hello", "user_id": f"u{i}", "card_id": card, "merchant_id": merchant}
+        for i, (card, merchant) in enumerate(
+            [("card_1", "m"), ("card_9", "m"), ("card_9", "merchant_ok")]
+        )
+    ]
+    monkeypatch.setattr(serving_app, "policy_runtime_state", init_policy_state())
+    expected = client.post("/predict/batch", json={"items": items}).json()["items"]
+    assert [item["model_version"] for item in expected] == [
+        "entity-list",
+        "fallback-heuristic",
+        "entity-list",
+    ]
+    assert expected[0]["decision"] == "block"
+    assert expected[0]["stages"] == ["entity_list"]
+    assert expected[2]["decision"] == "allow"
+
+    monkeypatch.setattr(serving_app, "policy_runtime_state", init_policy_state())
+    columns = {name: [item[name] for item in items] for name in items[0]}
+    got = client.post("/predict/columnar", json={"columns": columns}).json()["columns"]
+    for name in ("model_version", "decision", "reasons", "policy_triggers"):
+        assert got[name] == [item[name] for item in expected]
+    assert got["risk_score"] == [item["risk_score"] for item in expected]
+
+    stats = client.get("/entity-lists/stats").json()["stats"]
+    hits = {entry["name"]: entry["hits"] for entry in stats["lists"]}
+    assert hits == {"blocked_cards": 2, "trusted_merchants": 2, "blocked_ips": 0}
+    assert client.post("/entity-lists/reload").json()["stats"]["reloads"] == 2
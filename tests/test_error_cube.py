@@ -0,0 +1,50 @@
+import json
+
+import numpy as np
+
+from trustshield.evaluation.error_cube import build_error_cube, top_errors
+from trustshield.ingestion import generate_profile_events
+
+
+def _scored():
+    events = generate_profile_events("small", n_samples=3_000, random_state=11)
+    rng = np.random.default_rng(11)
+    scores = np.clip(events["is_fraud"].to_numpy() * 0.3 + rng.random(len(events)) * 0.7, 0, 1)
+    return events, scores, events["is_fraud"].to_numpy()
+
+
+def test_error_cube_counts_match_masks() -> None:
+    events, scores, y = _scored()
+    cube = build_error_cube(events, scores, y, threshold=0.5, top_k=3)
+    json.dumps(cube)
+    dims = cube["dimensions"]
+    assert set(dims) == {
+        "country",
+        "payment_attempts",
+        "account_age_days",
+        "entity_hotness",
+        "reason_flags",
+    }
+
+    pred = scores >= 0.5
+    us = (events["country"] == "US").to_numpy()
+    assert dims["country"]["US"]["fp"] == int((us & pred & (y == 0)).sum())
+    assert dims["country"]["US"]["fn"] == int((us & ~pred & (y == 1)).sum())
+    assert sum(segment["n"] for segment in dims["payment_attempts"].values()) == len(events)
+
+    new_account = (events["account_age_days"] < 7).to_numpy()
+    flag = dims["reason_flags"]["new_account"]
+    assert flag["tp"] == int((new_account & pred & (y == 1)).sum())
+    assert sum(flag["score_hist_legit"]) + sum(flag["score_hist_fraud"]) == flag["n"]
+
+    exemplars = dims["country"]["US"]["top_false_positives"]
+    expected = np.sort(scores[us & pred & (y == 0)])[::-1][:3].round(6)
+    assert [row["score"] for row in exemplars] == expected.tolist()
+
+
+def test_top_errors_use_extreme_scores() -> None:
+    events, scores, y = _scored()
+    top_fp, top_fn = top_errors(events, scores, y, threshold=0.5, k=4)
+    assert top_fp[0]["score"] == round(float(scores[(scores >= 0.5) & (y == 0)].max()), 6)
+    assert top_fn[0]["score"] == round(float(scores[(scores < 0.5) & (y == 1)].min()), 6)
+    assert len(top_fn) == 4
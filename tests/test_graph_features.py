@@ -1,4 +1,6 @@
+import numpy as np
 import pandas as pd
+import pytest
 
 from trustshield.features.graph import (
     build_graph_stats,
@@ -59,3 +61,61 @@ def test_enrich_with_graph_features_columns() -> None:
     out = enrich_with_graph_features(base, stats)
     assert "graph_device_id_pagerank" in out.columns
     assert "graph_min_component_size" in out.columns
+
+
+def test_graph_stats_accumulator_matches_batch_stats() -> None:
+    from trustshield.features.graph import GraphStatsAccumulator
+    from trustshield.ingestion import generate_synthetic_events
+
+    df = generate_synthetic_events(n_samples=500, random_state=11)
+    batch = build_graph_stats(df, target_col="is_fraud")
+    acc = GraphStatsAccumulator(target_col="is_fraud")
+    for start in range(0, len(df), 120):
+        acc.update(df.iloc[start : start + 120])
+    streamed = acc.finalize()
+
+    for key in ("entity_degree", "entity_fraud_rate", "entity_component_size"):
+        for col in ("device_id", "ip_id", "card_id"):
+            assert streamed[key][col] == batch[key][col]
+    assert streamed["global_fraud_rate"] == batch["global_fraud_rate"]
+
+
+def test_khop_index_spreads_risk_to_clean_neighbours() -> None:
+    from trustshield.features.graph import GraphStatsAccumulator
+
+    rows = [
+        ("u1", "d1", "i1", "c_fraud", 1),
+        ("u1", "d1", "i1", "c_fraud", 1),
+        ("u2", "d1", "i2", "c_clean", 0),
+        ("u3", "d3", "i3", "c_other", 0),
+        ("u3", "d3", "i3", "c_other", 0),
+        ("u4", "d4", "i4", "c_far", 0),
+    ]
+    columns = ["user_id", "device_id", "ip_id", "card_id", "is_fraud"]
+    train_df = pd.DataFrame(rows, columns=columns).assign(merchant_id="m1")
+    stats = build_graph_stats(train_df, target_col="is_fraud")
+
+    def card_features(card: str) -> dict[str, float]:
+        return graph_features_for_payload({"card_id": card}, stats)
+
+    clean, other = card_features("c_clean"), card_features("c_other")
+    # Own fraud rate 0 for both, but only the clean card shares a device with fraud.
+    assert clean["graph_card_id_fraud_rate"] == other["graph_card_id_fraud_rate"] == 0.0
+    assert clean["graph_card_id_hop1_fraud_rate"] > other["graph_card_id_hop1_fraud_rate"]
+    assert clean["graph_card_id_label_prop_risk"] > other["graph_card_id_label_prop_risk"]
+    unseen = card_features("c_new")
+    assert unseen["graph_card_id_hop2_fraud_rate"] == stats["khop"]["default"]
+
+    frame = pd.DataFrame({"card_id": ["c_clean", "c_new"], "device_id": "d1", "ip_id": "i9"})
+    enriched = enrich_with_graph_features(frame, stats)
+    payload_features = graph_features_for_payload(frame.iloc[0].to_dict(), stats)
+    for name in ("graph_card_id_hop1_fraud_rate", "graph_max_hop2_fraud_rate"):
+        assert enriched[name].iloc[0] == pytest.approx(payload_features[name])
+
+    accumulator = GraphStatsAccumulator(target_col="is_fraud")
+    for start in range(0, len(train_df), 4):
+        accumulator.update(train_df.iloc[start : start + 4])
+    chunked = accumulator.finalize()["khop"]["entities"]["card_id"]
+    np.testing.assert_allclose(
+        chunked["values"], stats["khop"]["entities"]["card_id"]["values"], rtol=1e-6
+    )
@@ -0,0 +1,26 @@
+from trustshield.benchmarks.hot_paths import compare_to_baseline, time_case
+
+
+def test_time_case_calibrates_inner_loop() -> None:
+    calls = []
+    result = time_case(lambda: calls.append(1), trials=3, warmup=1, min_trial_seconds=0.001)
+    assert result["trials"] == 3
+    assert result["calls_per_trial"] > 1
+    assert 0 < result["min_us"] <= result["median_us"] <= result["max_us"]
+    assert len(calls) >= 4 * result["calls_per_trial"]
+
+
+def test_compare_to_baseline_applies_per_case_thresholds() -> None:
+    baseline = {"fast": {"median_us": 10.0}, "slow": {"median_us": 100.0}}
+    results = {
+        "fast": {"median_us": 13.0},
+        "slow": {"median_us": 130.0},
+        "new_case": {"median_us": 1.0},
+    }
+    comparison = compare_to_baseline(
+        results, baseline, max_regression=0.25, thresholds={"slow": 0.5}
+    )
+    assert comparison["fast"]["regressed"] is True
+    assert comparison["slow"]["regressed"] is False
+    assert comparison["slow"]["allowed_ratio"] == 1.5
+    assert "new_case" not in comparison
@@ -0,0 +1,184 @@
+import numpy as np
+import pandas as pd
+from sklearn.metrics import average_precision_score
+
+from trustshield.monitoring.label_join import (
+    _read_new_labels,
+    histogram_quality,
+    join_predictions,
+    load_labels,
+    run_label_join,
+)
+from trustshield.serving.prediction_log import PredictionLog
+
+
+def _predictions(n: int, seed: int = 0) -> tuple[pd.DataFrame, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    y = (rng.random(n) < 0.2).astype(int)
+    scores = np.clip(rng.normal(0.3 + 0.4 * y, 0.15), 0, 1)
+    frame = pd.DataFrame(
+        {
+            "event_id": np.arange(n),
+            "logged_at": 1_700_000_000 + np.arange(n) * 60.0,
+            "risk_score": scores,
+            "decision": np.select([scores >= 0.75, scores >= 0.45], ["block", "review"], "allow"),
+        }
+    )
+    return frame, y
+
+
+def test_load_labels_sorts_and_keeps_latest_relabel(tmp_path) -> None:
+    pd.DataFrame({"event_id": [5, 1, 5, 3], "is_fraud": [0, 1, 1, 0]}).to_csv(
+        tmp_path / "labels.csv", index=False
+    )
+    ids, values = load_labels(tmp_path / "labels.csv", chunk_size=2)
+    assert ids.tolist() == [1, 3, 5]
+    assert values.tolist() == [1, 0, 1]
+
+
+def test_streamed_join_matches_in_memory_metrics() -> None:
+    frame, y = _predictions(5000)
+    # Labels arrive for a shuffled subset; predictions stream in small chunks with a retry.
+    labeled = np.random.default_rng(1).permutation(5000)[:4000]
+    ids = np.sort(labeled)
+    retry = frame.iloc[[ids[0]]].assign(risk_score=0.0)
+    chunks = [frame.iloc[i : i + 700] for i in range(0, 5000, 700)] + [retry]
+    joined = join_predictions(chunks, ids, y[ids].astype(np.int8))
+    assert joined["scanned"] == 5001
+    assert joined["labeled"] == 4000
+    assert joined["duplicates"] == 1
+
+    hist = sum(day["hist"] for day in joined["days"].values())
+    cells = sum(day["decisions"] for day in joined["days"].values())
+    quality = histogram_quality(hist, cells)
+    expected = average_precision_score(y[ids], frame["risk_score"].to_numpy()[ids])
+    assert abs(quality["pr_auc"] - expected) < 2e-3
+    block = frame["decision"].to_numpy()[ids] == "block"
+    assert quality["decisions"]["block"]["n"] == int(block.sum())
+    assert quality["decisions"]["block"]["fraud"] == int(y[ids][block].sum())
+
+
+def test_run_label_join_reads_prediction_log(tmp_path, monkeypatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    frame, y = _predictions(300, seed=2)
+    log = PredictionLog(tmp_path / "log", flush_rows=50, segment_max_rows=120).start()
+    for record in frame.to_dict(orient="records"):
+        log.append({**record, "reasons": [], "policy_triggers": []})
+    log.close()
+    pd.DataFrame({"event_id": frame["event_id"], "is_fraud": y}).to_csv("labels.csv", index=False)
+
+    report = run_label_join("labels.csv", log_dir=tmp_path / "log", window_days=1)
+    assert report["labeled_predictions"] == 300
+    assert report["label_coverage"] == 1.0
+    assert report["overall"]["n"] == 300
+    assert report["rolling"]["n"] == sum(day["n"] for day in report["daily"][-1:])
+    assert (tmp_path / "reports" / "live_quality.json").exists()
+
+
+def test_run_label_join_folds_only_new_segments_and_labels(tmp_path, monkeypatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    frame, y = _predictions(400, seed=3)
+    labels = pd.DataFrame({"event_id": frame["event_id"], "is_fraud": y})
+    log = PredictionLog(tmp_path / "log", flush_rows=50, segment_max_rows=100).start()
+    for record in frame.iloc[:200].to_dict(orient="records"):
+        log.append({**record, "reasons": [], "policy_triggers": []})
+    log.close()
+    # Only some labels are in yet; the rest arrive later for events already logged.
+    labels.iloc[:150].to_csv("labels_0.csv", index=False)
+    first = run_label_join("labels_*.csv", log_dir=tmp_path / "log")
+    assert first["labeled_predictions"] == 150
+    assert first["pending_predictions"] == 50
+    pending_dir = tmp_path / "reports" / "label_join_state_pending"
+    assert len(list(pending_dir.glob("pending-*"))) == 1
+
+    log = PredictionLog(tmp_path / "log", flush_rows=50, segment_max_rows=100).start()
+    for record in frame.iloc[200:].to_dict(orient="records"):
+        log.append({**record, "reasons": [], "policy_triggers": []})
+    log.append({**frame.iloc[0].to_dict(), "reasons": [], "policy_triggers": []})
+    log.close()
+    labels.iloc[150:].to_csv("labels_1.csv", index=False)
+    second = run_label_join("labels_*.csv", log_dir=tmp_path / "log")
+    assert second["new_segments"] == 3
+    assert second["new_label_files"] == 1
+    assert second["predictions_scanned"] == 401
+    assert second["duplicate_predictions"] == 1
+    assert second["pending_predictions"] == second["pending_labels"] == 0
+    assert list(pending_dir.iterdir()) == []
+
+    rebuilt = run_label_join("labels_*.csv", log_dir=tmp_path / "log", rebuild=True)
+    for key in ("labeled_predictions", "overall", "rolling", "daily"):
+        assert second[key] == rebuilt[key]
+    assert rebuilt["new_segments"] == 5
+
+
+def test_unlabeled_predictions_expire_after_the_label_delay(tmp_path, monkeypatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    frame, y = _predictions(200, seed=4)
+    # The second half is logged two days after the first; only its labels ever arrive.
+    frame.loc[100:, "logged_at"] += 2 * 86_400
+    log = PredictionLog(tmp_path / "log", flush_rows=50, segment_max_rows=100).start()
+    for record in frame.iloc[:100].to_dict(orient="records"):
+        log.append({**record, "reasons": [], "policy_triggers": []})
+    log.close()
+    pd.DataFrame({"event_id": [-5], "is_fraud": [0]}).to_csv("labels_0.csv", index=False)
+    first = run_label_join("labels_*.csv", log_dir=tmp_path / "log", max_label_delay_days=1)
+    assert first["pending_predictions"] == 100
+
+    log = PredictionLog(tmp_path / "log", flush_rows=50, segment_max_rows=100).start()
+    for record in frame.iloc[100:].to_dict(orient="records"):
+        log.append({**record, "reasons": [], "policy_triggers": []})
+    log.close()
+    pd.DataFrame({"event_id": frame["event_id"][100:], "is_fraud": y[100:]}).to_csv(
+        "labels_1.csv", index=False
+    )
+    second = run_label_join("labels_*.csv", log_dir=tmp_path / "log", max_label_delay_days=1)
+    assert second["labeled_predictions"] == 100
+    assert second["expired_predictions"] == 100
+    assert second["pending_predictions"] == 0
+
+
+def test_grown_label_files_read_only_their_new_rows(tmp_path) -> None:
+    labels = pd.DataFrame({"event_id": np.arange(10), "is_fraud": np.arange(10) % 2})
+    labels.iloc[:4].to_csv(tmp_path / "a.csv", index=False)
+    labels.iloc[:4].to_json(tmp_path / "b.jsonl", orient="records", lines=True)
+    labels.iloc[:4].to_parquet(tmp_path / "c.parquet", row_group_size=3)
+    paths = [tmp_path / name for name in ("a.csv", "b.jsonl", "c.parquet")]
+    offsets: dict[str, int] = {}
+    ids, _, files = _read_new_labels(paths, offsets, chunk_size=3)
+    assert files == 3
+    assert ids.tolist() == [0, 1, 2, 3]
+
+    labels.iloc[4:7].to_csv(tmp_path / "a.csv", mode="a", header=False, index=False)
+    with (tmp_path / "b.jsonl").open("a", encoding="utf-8") as f:
+        # The last line is still being written; it waits for the next run.
+        f.write('{"event_id":7,"is_fraud":1}\n{"event_id":8,')
+    labels.iloc[:9].to_parquet(tmp_path / "c.parquet", row_group_size=3)
+    ids, values, files = _read_new_labels(paths, offsets, chunk_size=2)
+    assert files == 3
+    assert ids.tolist() == [4, 5, 6, 7, 8]
+    assert values.tolist() == [0, 1, 0, 1, 0]
+    assert _read_new_labels(paths, offsets)[2] == 0
+
+
+def test_appended_label_file_does_not_inflate_late_labels(tmp_path, monkeypatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    frame, y = _predictions(200, seed=5)
+    log = PredictionLog(tmp_path / "log", flush_rows=50, segment_max_rows=100).start()
+    for record in frame.to_dict(orient="records"):
+        log.append({**record, "reasons": [], "policy_triggers": []})
+    log.close()
+    labels = pd.DataFrame({"event_id": frame["event_id"], "is_fraud": y})
+    labels.iloc[:100].to_csv("labels.csv", index=False)
+    first = run_label_join("labels.csv", log_dir=tmp_path / "log")
+    assert first["labeled_predictions"] == 100
+
+    # The file grows by the remaining labels plus one relabel of an event already counted.
+    relabel = labels.iloc[[0]].assign(is_fraud=1 - y[0])
+    pd.concat([labels.iloc[100:], relabel]).to_csv(
+        "labels.csv", mode="a", header=False, index=False
+    )
+    second = run_label_join("labels.csv", log_dir=tmp_path / "log")
+    assert second["new_label_files"] == 1
+    assert second["labels_loaded"] == 201
+    assert second["late_labels"] == 1
+    assert second["labeled_predictions"] == 200
@@ -0,0 +1,48 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import trustshield.serving.app as serving_app
+from trustshield.models import explain_event
+
+PAYLOAD = {"message_text": "urgent transfer click now", "country": "NG", "account_age_days": 30}
+
+
+def test_detail_levels_select_optional_stages(bundle) -> None:
+    full = explain_event(bundle, PAYLOAD)
+    reasons = explain_event(bundle, PAYLOAD, detail="reasons")
+    score_only = explain_event(bundle, PAYLOAD, detail="score")
+
+    assert full["stages"] == ["score", "model_reasons", "feature_contributions"]
+    assert reasons["stages"] == ["score", "model_reasons"]
+    assert reasons["skipped_stages"] == ["feature_contributions"]
+    assert score_only["skipped_stages"] == ["model_reasons", "feature_contributions"]
+    assert score_only["feature_contributions"] == {} and score_only["model_reasons"] == []
+    assert score_only["risk_score"] == full["risk_score"]
+
+
+def test_expired_deadline_skips_optional_stages_but_still_scores(bundle) -> None:
+    out = explain_event(bundle, PAYLOAD, detail="full", deadline=time.perf_counter() - 1.0)
+    assert out["stages"] == ["score"]
+    assert out["explanation_method"] == "none"
+    assert 0 <= out["risk_score"] <= 1
+    with pytest.raises(ValueError):
+        explain_event(bundle, PAYLOAD, detail="everything")
+
+
+def test_predict_reports_stages_for_detail_and_budget(bundle, monkeypatch) -> None:
+    monkeypatch.setattr(serving_app, "bundle", bundle)
+    monkeypatch.setattr(serving_app, "drift_monitor", None)
+    client = TestClient(serving_app.app)
+
+    body = client.post("/predict", json={**PAYLOAD, "detail": "score"}).json()
+    assert body["stages"] == ["score"]
+    assert body["feature_contributions"] == {}
+
+    body = client.post("/explain", json=PAYLOAD).json()
+    assert "feature_contributions" in body["stages"]
+
+    body = client.post("/predict", json={**PAYLOAD, "latency_budget_ms": 1e-6}).json()
+    assert body["skipped_stages"] == ["model_reasons", "feature_contributions"]
+    assert body["decision"] in {"allow", "review", "block"}
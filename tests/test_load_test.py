@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import trustshield.serving.app  # noqa: F401  (loads configs/ before tests change directory)
+from trustshield.tools.load_test import (
+    _request_bodies,
+    load_payloads,
+    run_load_test,
+    summarize_level,
+)
+
+
+def test_load_payloads_from_capture_cleans_missing_values(tmp_path) -> None:
+    pd.DataFrame(
+        {
+            "event_id": [-1, 7],
+            "message_text": ["hi", "urgent otp"],
+            "event_ts": [np.nan, 1_700_000_000.0],
+            "payment_attempts": [1, 3],
+            "risk_score": [0.1, 0.9],
+        }
+    ).to_json(tmp_path / "capture.jsonl", orient="records", lines=True)
+    payloads = load_payloads(str(tmp_path / "capture.jsonl"), n=10)
+    assert payloads[0]["event_id"] is None
+    assert payloads[0]["event_ts"] is None
+    assert payloads[1] == {
+        "event_id": 7,
+        "message_text": "urgent otp",
+        "event_ts": 1_700_000_000.0,
+        "payment_attempts": 3,
+    }
+
+
+def test_summarize_level_counts_errors_and_buckets() -> None:
+    summary = summarize_level(
+        "rate", 50.0, [0.001, 0.002, 0.004, 0.5], [True, True, False, True], 2.0, 4
+    )
+    assert summary["requests"] == 4
+    assert summary["events"] == 16
+    assert summary["errors"] == 1
+    assert summary["achieved_rps"] == 2.0
+    assert summary["latency_ms"]["max"] == 500.0
+    assert sum(count for _, count in summary["histogram"]) == 4
+
+
+def test_run_load_test_in_process(tmp_path, monkeypatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    report = run_load_test([1, 2], duration=0.3, warmup=0.0, n_payloads=50)
+    assert [row["level"] for row in report["curve"]] == [1, 2]
+    assert all(row["error_rate"] == 0.0 for row in report["curve"])
+    assert report["levels"][0]["requests"] > 0
+    assert (tmp_path / "reports" / "load_test.json").exists()
+
+
+def test_request_bodies_keep_the_partial_batch_and_reject_bad_sizes() -> None:
+    payloads = [{"message_text": f"m{i}"} for i in range(7)]
+    bodies = _request_bodies(payloads, 3)
+    assert [len(body["items"]) for body in bodies] == [3, 3, 1]
+    assert [len(body["items"]) for body in _request_bodies(payloads, 50)] == [7]
+    with pytest.raises(ValueError, match="No payloads"):
+        _request_bodies([], 3)
+    with pytest.raises(ValueError, match="exceeds"):
+        _request_bodies(payloads, 101)
@@ -0,0 +1,112 @@
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+import trustshield.features.event_time as event_time_module
+import trustshield.serving.app as serving_app
+from trustshield.features import NearDuplicateIndex
+from trustshield.serving.policy import decide, decide_batch, init_policy_state, load_policy
+
+client = TestClient(serving_app.app)
+TEMPLATE = (
+    "Your account is blocked, share the OTP code sent to your phone immediately "
+    "or visit {link} to restore access {suffix}"
+)
+
+
+def _scam(i: int, ts: float, **overrides) -> dict:
+    text = TEMPLATE.format(link=f"https://verify-{i}.example", suffix=["now", "today", ""][i % 3])
+    event = {"message_text": text, "user_id": f"u{i}", "card_id": f"c{i % 4}", "event_ts": ts}
+    return {**event, **overrides}
+
+
+def test_mutated_templates_cluster_and_expire() -> None:
+    index = NearDuplicateIndex(window_seconds=600, recent_seconds=120, buckets=10)
+    for i in range(12):
+        features = index.update(_scam(i, 1_000.0 + i * 30))
+    assert features["campaign_cluster_messages"] == 12.0
+    # 60 s buckets: the last event, at 1 330 s, counts those from 1 260 s on as recent.
+    assert features["campaign_cluster_recent_messages"] == 3.0
+    assert features["campaign_cluster_users"] == pytest.approx(12.0, rel=0.1)
+    assert features["campaign_cluster_cards"] == pytest.approx(4.0, rel=0.1)
+
+    other = index.update(
+        {"message_text": "Can you confirm the delivery date for my order", "event_ts": 1_340.0}
+    )
+    assert other["campaign_cluster_messages"] == 1.0
+    short = index.update({"message_text": "ok thanks", "event_ts": 1_400.0})
+    assert short == dict.fromkeys(short, 0.0)
+    stats = index.stats()
+    assert stats["clusters"] == 2
+    assert stats["messages_skipped"] == 1
+
+    # Idle for longer than the window: the campaign's cluster and band entries are gone.
+    later = index.update(_scam(99, 5_000.0))
+    assert later["campaign_cluster_messages"] == 1.0
+    stats = index.stats()
+    assert stats["clusters"] == 1
+    assert stats["evicted_clusters"] == 2
+    assert stats["band_entries"] <= index.bands
+
+
+def test_far_future_timestamp_does_not_stop_eviction(monkeypatch) -> None:
+    clock = {"now": 1_000_000.0}
+    monkeypatch.setattr(event_time_module, "wall_time", lambda: clock["now"])
+    index = NearDuplicateIndex(window_seconds=600)
+    index.update(_scam(0, 1e12))
+    for i in range(1, 4):
+        clock["now"] += 3_600.0
+        features = index.update(_scam(i, clock["now"]))
+    # Capped at the wall clock plus skew, so each earlier message has aged out.
+    assert features["campaign_cluster_messages"] == 1.0
+    assert index.stats()["evicted_clusters"] == 3
+
+
+def test_campaign_rules_match_between_decide_and_decide_batch() -> None:
+    policy = load_policy()
+    policy["near_duplicates"] = {
+        "rules": [{"feature": "campaign_cluster_users", "review": 3, "block": 5}]
+    }
+    events = [_scam(i, float(i)) for i in range(6)]
+    campaign = NearDuplicateIndex().update_frame(pd.DataFrame(events))
+    payloads = [{**event, "account_age_days": 30, "payment_attempts": 1} for event in events]
+    single = [
+        decide(0.1, payload, policy, campaign=row)
+        for payload, row in zip(payloads, campaign.to_dict(orient="records"))
+    ]
+    assert [d for d, _, _ in single] == ["allow", "allow", "review", "review", "block", "block"]
+    assert single[-1][2] == ["campaign:campaign_cluster_users:block"]
+    batch = decide_batch([0.1] * 6, pd.DataFrame(payloads), policy, campaign=campaign)
+    assert batch["decision"].tolist() == [d for d, _, _ in single]
+    assert batch["policy_triggers"].tolist() == [t for _, _, t in single]
+
+
+def test_campaign_features_in_predict_and_columnar(monkeypatch) -> None:
+    policy = {
+        **serving_app.policy_cfg,
+        "near_duplicates": {
+            "enabled": True,
+            "rules": [{"feature": "campaign_cluster_messages", "review": 3}],
+        },
+    }
+    monkeypatch.setattr(serving_app, "bundle", None)
+    monkeypatch.setattr(serving_app, "entity_lists", None)
+    monkeypatch.setattr(serving_app, "policy_cfg", policy)
+    items = [
+        {**_scam(i, 1_700_000_000.0 + i), "account_age_days": 30, "payment_attempts": 1}
+        for i in range(4)
+    ]
+    monkeypatch.setattr(serving_app, "policy_runtime_state", init_policy_state())
+    monkeypatch.setattr(serving_app, "near_duplicates", serving_app._init_near_duplicates(policy))
+    expected = client.post("/predict/batch", json={"items": items}).json()["items"]
+    assert [item["campaign"]["campaign_cluster_messages"] for item in expected] == [1, 2, 3, 4]
+    assert "campaign:campaign_cluster_messages:review" in expected[-1]["policy_triggers"]
+    assert client.get("/campaigns/stats").json()["stats"]["messages_seen"] == 4
+
+    monkeypatch.setattr(serving_app, "policy_runtime_state", init_policy_state())
+    assert client.post("/campaigns/reset").json() == {"status": "ok"}
+    columns = {name: [item[name] for item in items] for name in items[0]}
+    got = client.post("/predict/columnar", json={"columns": columns}).json()["columns"]
+    assert got["campaign_cluster_messages"] == [1, 2, 3, 4]
+    for name in ("decision", "reasons", "policy_triggers"):
+        assert got[name] == [item[name] for item in expected]
@@ -0,0 +1,132 @@
+import pandas as pd
+
+import trustshield.features.event_time as event_time_module
+from trustshield.features.graph import (
+    build_graph_stats,
+    enrich_with_graph_features,
+    graph_features_for_payload,
+)
+from trustshield.features.online_graph import OnlineEntityGraph
+from trustshield.serving.policy import decide, decide_batch, load_policy
+
+
+def _ring(graph: OnlineEntityGraph, start_ts: float = 0.0) -> list[dict[str, float]]:
+    # Four new users chained through shared cards and devices.
+    events = [
+        {"user_id": "u1", "card_id": "c1", "device_id": "d1"},
+        {"user_id": "u2", "card_id": "c1", "device_id": "d2"},
+        {"user_id": "u3", "card_id": "c2", "device_id": "d2"},
+        {"user_id": "u4", "card_id": "c2", "device_id": "d3", "ip_id": "unknown_ip"},
+    ]
+    return [graph.update({**event, "event_ts": start_ts + i}) for i, event in enumerate(events)]
+
+
+def test_ring_forms_one_component_and_ages_out() -> None:
+    graph = OnlineEntityGraph(window_seconds=100)
+    features = _ring(graph)
+    assert [f["live_component_users"] for f in features] == [1.0, 2.0, 3.0, 4.0]
+    # Users, two cards and three devices; the placeholder ip is not an entity.
+    assert features[-1]["live_component_size"] == 9.0
+    assert features[-1]["live_component_cards"] == 2.0
+    assert features[1]["live_card_id_degree"] == 2.0
+    assert features[-1]["live_ip_id_degree"] == 0.0
+
+    # Still visible one window later, gone after two.
+    later = graph.update({"user_id": "u1", "event_ts": 150})
+    assert later["live_component_users"] == 4.0
+    gone = graph.update({"user_id": "u1", "event_ts": 250})
+    assert gone["live_component_users"] == 1.0
+    assert graph.stats()["rotations"] == 2
+
+
+def test_hub_entities_stop_linking_and_max_nodes_rotates() -> None:
+    graph = OnlineEntityGraph(max_hub_degree=3)
+    for i in range(6):
+        features = graph.update({"user_id": f"u{i}", "ip_id": "nat", "event_ts": float(i)})
+    assert features["live_component_users"] == 1.0
+    assert features["live_ip_id_degree"] == 6.0
+    assert graph.stats()["hub_links_skipped"] == 3
+
+    graph = OnlineEntityGraph(max_nodes=10)
+    for i in range(20):
+        graph.update({"user_id": f"u{i}", "card_id": f"c{i}", "event_ts": 0.0})
+    stats = graph.stats()
+    assert stats["rotations"] >= 2
+    assert stats["active_nodes"] <= 10
+
+
+def test_far_future_timestamp_does_not_stop_rotation_and_merchants_do_not_link(
+    monkeypatch,
+) -> None:
+    clock = {"now": 1_000_000.0}
+    monkeypatch.setattr(event_time_module, "wall_time", lambda: clock["now"])
+    graph = OnlineEntityGraph(window_seconds=100)
+    graph.update({"user_id": "u0", "card_id": "c0", "event_ts": 1e12})
+    for user, card in (("u1", "c1"), ("u2", "c0")):
+        clock["now"] += 1_000.0
+        later = graph.update({"user_id": user, "card_id": card, "event_ts": clock["now"]})
+    # Capped at the wall clock plus skew, so generations keep rotating and the far-future
+    # event has aged out by the time its card is reused.
+    assert graph.stats()["rotations"] == 2
+    assert later["live_component_users"] == 1.0
+
+    # Two shoppers of one merchant stay in separate components by default.
+    graph = OnlineEntityGraph()
+    graph.update({"user_id": "u1", "merchant_id": "m0", "event_ts": 0.0})
+    shopper = graph.update({"user_id": "u2", "merchant_id": "m0", "event_ts": 1.0})
+    assert shopper["live_component_users"] == 1.0
+
+
+def test_live_features_replace_global_means_for_unseen_entities() -> None:
+    train_df = pd.DataFrame(
+        [
+            {
+                "user_id": "u0",
+                "device_id": "d0",
+                "ip_id": "i0",
+                "card_id": "c0",
+                "merchant_id": "m0",
+                "is_fraud": 0,
+            },
+            {
+                "user_id": "u9",
+                "device_id": "d9",
+                "ip_id": "i0",
+                "card_id": "c9",
+                "merchant_id": "m0",
+                "is_fraud": 1,
+            },
+        ]
+    )
+    stats = build_graph_stats(train_df, target_col="is_fraud")
+    graph = OnlineEntityGraph()
+    _ring(graph)
+    payload = {"user_id": "u5", "device_id": "d3", "ip_id": "i0", "card_id": "c2", "event_ts": 9}
+    live = graph.update(payload)
+
+    features = graph_features_for_payload(payload, stats, live=live)
+    baseline = graph_features_for_payload(payload, stats)
+    assert features["graph_card_id_degree"] == live["live_card_id_degree"] == 3.0
+    assert features["graph_card_id_component_size"] == live["live_component_size"]
+    # The ip is known from training and keeps its training features.
+    assert features["graph_ip_id_degree"] == baseline["graph_ip_id_degree"]
+
+    frame = pd.DataFrame([payload])
+    enriched = enrich_with_graph_features(frame, stats, live=pd.DataFrame([live]))
+    for name, value in features.items():
+        assert enriched[name].iloc[0] == value
+
+
+def test_component_users_triggers_match_between_decide_and_decide_batch() -> None:
+    policy = load_policy()
+    policy["live_graph"] = {"component_users_review": 3, "component_users_block": 4}
+    live = pd.DataFrame(_ring(OnlineEntityGraph()))
+    payloads = [{"message_text": "hi", "account_age_days": 30, "payment_attempts": 1}] * len(live)
+    single = [
+        decide(0.1, payload, policy, live_graph=row)
+        for payload, row in zip(payloads, live.to_dict(orient="records"))
+    ]
+    batch = decide_batch([0.1] * len(live), pd.DataFrame(payloads), policy, live_graph=live)
+    assert [d for d, _, _ in single] == ["allow", "allow", "review", "block"]
+    assert batch["decision"].tolist() == [d for d, _, _ in single]
+    assert batch["policy_triggers"].tolist() == [t for _, _, t in single]
@@ -1,4 +1,16 @@
-from trustshield.serving.policy import decide, init_policy_state, load_policy
+import threading
+
+import numpy as np
+import pandas as pd
+
+import trustshield.features.event_time as event_time_module
+from trustshield.serving.policy import (
+    decide,
+    decide_batch,
+    init_policy_state,
+    load_policy,
+    policy_state_summary,
+)
 
 
 def test_policy_blocks_high_score() -> None:
@@ -60,3 +72,139 @@ def test_policy_rate_limit_review_then_block() -> None:
 
     assert review_seen
     assert block_seen
+
+
+def test_decide_batch_with_state_matches_sequential_decide() -> None:
+    policy = load_policy()
+    rng = np.random.default_rng(3)
+    n = 60
+    frame = pd.DataFrame(
+        {
+            "message_text": ["normal text"] * n,
+            "user_id": rng.choice(["u1", "u2", "u3"], n),
+            "device_id": rng.choice(["d1", "d2"], n),
+            "ip_id": rng.choice(["i1", "i2", "i3", "i4"], n),
+            "event_ts": 1_700_000_000 + np.arange(n) * 5.0,
+            "payment_attempts": rng.integers(0, 7, n),
+            "account_age_days": rng.integers(0, 10, n),
+            "device_reuse_count": 1,
+            "chargeback_history": 0,
+        }
+    )
+    scores = rng.random(n)
+    batch = decide_batch(scores, frame, policy, state=init_policy_state())
+
+    state = init_policy_state()
+    for i, row in enumerate(frame.to_dict(orient="records")):
+        decision, reasons, triggers = decide(float(scores[i]), row, policy, state=state)
+        assert batch["decision"].iloc[i] == decision
+        assert batch["reasons"].iloc[i] == reasons
+        assert batch["policy_triggers"].iloc[i] == triggers
+
+
+def test_rate_limit_rules_count_key_combinations_over_several_windows() -> None:
+    policy = load_policy()
+    policy["rate_limits"] = {
+        "buckets_per_window": 6,
+        "rules": [
+            {
+                "name": "user_ip",
+                "keys": ["user_id", "ip_id"],
+                "windows": [{"seconds": 60, "review": 3}, {"seconds": 3600, "block": 5}],
+            }
+        ],
+    }
+    state = init_policy_state()
+    payload = {"message_text": "hi", "account_age_days": 30, "user_id": "u1", "ip_id": "i1"}
+    triggers = [
+        decide(0.1, {**payload, "event_ts": ts}, policy, state=state)[2]
+        for ts in (0.0, 10.0, 20.0, 200.0, 210.0)
+    ]
+    assert triggers[2] == ["rate_limit:user_ip:60s:review"]
+    # The 60 s window has emptied by t=200; the hour still holds every event.
+    assert triggers[3] == []
+    assert triggers[4] == ["rate_limit:user_ip:3600s:block"]
+    # Another ip is another key, and placeholder ids are never counted.
+    assert decide(0.1, {**payload, "ip_id": "i2", "event_ts": 211.0}, policy, state=state)[2] == []
+    for ts in range(220, 230):
+        _, _, unknown = decide(
+            0.1, {**payload, "ip_id": "unknown_ip", "event_ts": float(ts)}, policy, state=state
+        )
+        assert unknown == []
+
+    # Keys idle for longer than the largest window are dropped when new keys arrive.
+    for i in range(50):
+        decide(0.1, {**payload, "user_id": f"u{i}", "event_ts": 10_000.0 + i}, policy, state=state)
+    summary = policy_state_summary(state)
+    assert summary["tracked_keys"]["user_id+ip_id"] == 50
+
+
+def test_far_future_event_ts_neither_evicts_keys_nor_freezes_rings(monkeypatch) -> None:
+    clock = {"now": 1_000_000.0}
+    monkeypatch.setattr(event_time_module, "wall_time", lambda: clock["now"])
+    policy = load_policy()
+    state = init_policy_state()
+    payload = {"message_text": "hi", "account_age_days": 30, "device_id": "d1", "user_id": "u1"}
+    for i in range(5):
+        _, _, triggers = decide(0.1, {**payload, "event_ts": clock["now"] + i}, policy, state=state)
+    assert "rate_limit:device:block" in triggers
+    fresh = {**payload, "device_id": "d2", "user_id": "u2", "ip_id": "i2", "card_id": "c2"}
+    decide(0.1, {**fresh, "event_ts": clock["now"] + 1e9}, policy, state=state)
+    _, _, triggers = decide(0.1, {**payload, "event_ts": clock["now"] + 6}, policy, state=state)
+    assert "rate_limit:device:block" in triggers
+
+    # On an existing key the capped time stays close, so real time still moves its ring on.
+    decide(0.1, {**payload, "event_ts": clock["now"] + 1e9}, policy, state=state)
+    clock["now"] += 3_600.0
+    _, _, triggers = decide(0.1, {**payload, "event_ts": clock["now"]}, policy, state=state)
+    assert triggers == []
+
+
+def test_rule_names_do_not_change_the_trigger_level() -> None:
+    policy = load_policy()
+    policy["rate_limits"] = {
+        "rules": [
+            {
+                "name": "blocklist_card",
+                "keys": ["card_id"],
+                "windows": [{"seconds": 60, "review": 2}],
+            }
+        ]
+    }
+    state = init_policy_state()
+    payload = {"message_text": "hi", "account_age_days": 30, "card_id": "c1"}
+    rows = [{**payload, "event_ts": 1_700_000_000.0 + i} for i in range(2)]
+    decisions = [decide(0.1, row, policy, state=state) for row in rows]
+    assert decisions[-1][0] == "review"
+    assert decisions[-1][2] == ["rate_limit:blocklist_card:60s:review"]
+    batch = decide_batch([0.1, 0.1], pd.DataFrame(rows), policy, state=init_policy_state())
+    assert batch["decision"].tolist() == ["allow", "review"]
+
+
+def test_concurrent_decides_share_counters_safely() -> None:
+    policy = load_policy()
+    policy["rate_limits"] = {
+        "buckets_per_window": 4,
+        "rules": [{"keys": ["card_id"], "windows": [{"seconds": 3_600, "block": 801}]}],
+    }
+    state = init_policy_state()
+    errors: list[BaseException] = []
+
+    def _worker(thread: int) -> None:
+        try:
+            for i in range(200):
+                # Fresh keys on every call keep the eviction scan busy next to the shared key.
+                for card in ("shared", f"c{thread}-{i}"):
+                    payload = {"card_id": card, "account_age_days": 30, "event_ts": 1e9 + i}
+                    decide(0.1, payload, policy, state=state)
+        except BaseException as exc:  # noqa: BLE001
+            errors.append(exc)
+
+    threads = [threading.Thread(target=_worker, args=(t,)) for t in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    payload = {"card_id": "shared", "account_age_days": 30, "event_ts": 1e9 + 200}
+    assert decide(0.1, payload, policy, state=state)[2] == ["rate_limit:card_id:3600s:block"]
@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+
+import trustshield.features.event_time as event_time_module
+from trustshield.evaluation.policy_replay import (
+    expand_policy_grid,
+    replay_policies,
+    window_counts,
+)
+from trustshield.ingestion import generate_profile_events
+from trustshield.serving.policy import decide, init_policy_state, load_policy
+
+
+def test_window_counts_match_online_deques() -> None:
+    rng = np.random.default_rng(0)
+    keys = rng.choice(["a", "b", "c"], size=300)
+    event_ts = np.sort(rng.integers(0, 600, size=300)).astype(float)
+    counts = window_counts(keys, event_ts, window_seconds=60)
+
+    history: dict[str, list[float]] = {}
+    for i, (key, ts) in enumerate(zip(keys, event_ts)):
+        seen = history.setdefault(key, [])
+        seen.append(ts)
+        assert counts[i] == sum(1 for value in seen if value >= ts - 60)
+
+
+def test_replay_matches_sequential_decide_for_every_variant() -> None:
+    events = generate_profile_events("small", n_samples=2_000, random_state=4)
+    scores = np.random.default_rng(4).random(len(events))
+    base = load_policy()
+    base["rate_limits"]["window_seconds"] = 3_600
+    variants = expand_policy_grid(
+        base,
+        {"score_thresholds.block": [0.7, 0.9], "rate_limits.device_review_events": [2, 3]},
+    )
+    results = replay_policies(events, scores, variants)
+    assert len(results) == 5
+
+    rows = events.to_dict(orient="records")
+    for variant, result in zip(variants, results):
+        state = init_policy_state()
+        decisions = {"allow": 0, "review": 0, "block": 0}
+        for row, score in zip(rows, scores):
+            decision, _, _ = decide(float(score), row, variant["policy"], state=state)
+            decisions[decision] += 1
+        assert result["decisions"] == decisions
+    assert any(name.startswith("rate_limit:") for name, _ in results[0]["top_policy_triggers"])
+
+
+def test_evaluate_variant_reports_precision_proxies() -> None:
+    events = generate_profile_events("small", n_samples=500, random_state=2)
+    scores = events["is_fraud"].to_numpy(dtype=float)
+    result = replay_policies(events, scores, expand_policy_grid(load_policy(), {}))[0]
+    assert result["name"] == "baseline"
+    assert 0 <= result["fraud_capture_rate"] <= 1
+    assert sum(result["decisions"].values()) == 500
+
+
+def test_replay_matches_decide_for_multi_window_rules() -> None:
+    events = generate_profile_events("small", n_samples=2_000, random_state=6)
+    scores = np.random.default_rng(6).random(len(events))
+    policy = load_policy()
+    policy["rate_limits"] = {
+        "buckets_per_window": 4,
+        "rules": [
+            {
+                "name": "card",
+                "keys": ["card_id"],
+                "windows": [
+                    {"seconds": 600, "review": 2, "block": 4},
+                    {"seconds": 7_200, "review": 3},
+                ],
+            },
+            {"keys": ["user_id", "merchant_id"], "windows": [{"seconds": 3_600, "block": 2}]},
+        ],
+    }
+    result = replay_policies(events, scores, expand_policy_grid(policy, {}))[0]
+
+    state = init_policy_state()
+    decisions = {"allow": 0, "review": 0, "block": 0}
+    triggers: dict[str, int] = {}
+    for row, score in zip(events.to_dict(orient="records"), scores):
+        decision, _, names = decide(float(score), row, policy, state=state)
+        decisions[decision] += 1
+        for name in names:
+            triggers[name] = triggers.get(name, 0) + 1
+    assert result["decisions"] == decisions
+    replayed = dict(result["top_policy_triggers"])
+    for name, count in replayed.items():
+        if name.startswith("rate_limit:"):
+            assert count == triggers[name]
+    assert any(name.startswith("rate_limit:user_id+merchant_id:") for name in replayed)
+
+
+def test_replay_caps_far_future_timestamps_like_decide(monkeypatch) -> None:
+    now = 1_000_000.0
+    monkeypatch.setattr(event_time_module, "wall_time", lambda: now)
+    event_ts = np.concatenate([now - 400 + 10.0 * np.arange(30), np.full(10, 1e12)])
+    events = pd.DataFrame(
+        {
+            "device_id": "d1",
+            "account_age_days": 30,
+            "payment_attempts": 1,
+            "event_ts": event_ts,
+        }
+    )
+    policy = load_policy()
+    policy["rate_limits"] = {
+        "buckets_per_window": 6,
+        "rules": [{"keys": ["device_id"], "windows": [{"seconds": 300, "block": 25}]}],
+    }
+    scores = np.zeros(len(events))
+    result = replay_policies(events, scores, expand_policy_grid(policy, {}))[0]
+
+    state = init_policy_state()
+    decisions = {"allow": 0, "review": 0, "block": 0}
+    for row in events.to_dict(orient="records"):
+        decisions[decide(0.0, row, policy, state=state)[0]] += 1
+    assert decisions["block"] > 0
+    assert result["decisions"] == decisions
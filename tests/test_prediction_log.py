@@ -0,0 +1,70 @@
+import pandas as pd
+
+import trustshield.serving.app as serving_app
+from trustshield.serving.policy import load_policy
+from trustshield.serving.prediction_log import (
+    PredictionLog,
+    iter_prediction_log,
+    list_segments,
+    prediction_record,
+)
+
+
+def _record(i: int) -> dict:
+    payload = {
+        "event_id": i,
+        "event_ts": None,
+        "message_text": f"msg {i}",
+        "country": "US",
+        "user_id": f"u{i % 3}",
+        "device_id": "d",
+        "ip_id": "ip",
+        "card_id": "c",
+        "merchant_id": "m",
+        "payment_attempts": 1,
+        "account_age_days": 30,
+        "device_reuse_count": 1,
+        "chargeback_history": 0,
+    }
+    reasons = ["high_payment_attempts"] if i % 2 else []
+    return prediction_record(payload, "ts-1", i / 100, "allow", reasons, [], 0.5)
+
+
+def test_prediction_log_rotates_segments_and_streams_back(tmp_path) -> None:
+    log = PredictionLog(tmp_path, flush_rows=10, segment_max_rows=25).start()
+    for i in range(60):
+        assert log.append(_record(i))
+    log.close()
+
+    stats = log.stats()
+    assert stats["written"] == 60
+    assert stats["dropped"] == 0
+    assert stats["segments_closed"] == len(list_segments(tmp_path)) >= 2
+    assert not list(tmp_path.glob(".open-*"))
+
+    logged = pd.concat(iter_prediction_log(tmp_path, chunk_size=7), ignore_index=True)
+    assert sorted(logged["event_id"].tolist()) == list(range(60))
+    assert logged["event_ts"].isna().all()
+    assert list(logged.loc[logged["event_id"] == 1, "reasons"].iloc[0]) == [
+        "high_payment_attempts"
+    ]
+
+
+def test_prediction_log_sheds_load_when_buffer_is_full(tmp_path) -> None:
+    # Not started: nothing drains the buffer, so appends beyond capacity are dropped.
+    log = PredictionLog(tmp_path, capacity=5, fmt="jsonl")
+    accepted = [log.append(_record(i)) for i in range(8)]
+    assert accepted == [True] * 5 + [False] * 3
+    assert log.stats()["dropped"] == 3
+
+    log.start()
+    log.close()
+    assert log.stats()["written"] == 5
+    assert [path.suffix for path in list_segments(tmp_path)] == [".jsonl"]
+    logged = pd.concat(iter_prediction_log(tmp_path), ignore_index=True)
+    assert logged["event_id"].tolist() == [0, 1, 2, 3, 4]
+
+
+def test_prediction_log_is_off_by_default() -> None:
+    # Records hold raw message text and entity ids; logging them is opt-in.
+    assert serving_app._init_prediction_log(load_policy()) is None
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from trustshield.features.graph import build_graph_stats, enrich_with_graph_features
+from trustshield.ingestion import generate_synthetic_events, iter_event_chunks, read_events
+from trustshield.preprocessing.validation import REQUIRED_COLUMNS, validate_events
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".jsonl", ".parquet"])
+def test_read_events_projects_and_compacts(tmp_path, suffix) -> None:
+    if suffix == ".parquet":
+        pytest.importorskip("pyarrow")
+    df = generate_synthetic_events(n_samples=300, random_state=3)
+    df["raw_payload"] = "ignored"
+    path = tmp_path / f"events{suffix}"
+    if suffix == ".csv":
+        df.to_csv(path, index=False)
+    elif suffix == ".jsonl":
+        df.to_json(path, orient="records", lines=True)
+    else:
+        df.to_parquet(path, index=False)
+
+    out = read_events(path, chunk_size=70)
+    assert list(out.columns) == REQUIRED_COLUMNS
+    assert isinstance(out["device_id"].dtype, pd.CategoricalDtype)
+    assert out["payment_attempts"].dtype.itemsize < 8
+    assert out["device_id"].astype(str).tolist() == df["device_id"].tolist()
+    validate_events(out)
+
+    chunk_sizes = [len(chunk) for chunk in iter_event_chunks(path, chunk_size=70)]
+    assert sum(chunk_sizes) == 300
+    assert max(chunk_sizes) == 70
+
+
+def test_graph_features_accept_categorical_frames(tmp_path) -> None:
+    df = generate_synthetic_events(n_samples=200, random_state=9)
+    path = tmp_path / "events.csv"
+    df.to_csv(path, index=False)
+    compact = read_events(path)
+
+    train_part = compact.iloc[:150]
+    stats = build_graph_stats(train_part, target_col="is_fraud")
+    raw_stats = build_graph_stats(df.iloc[:150], target_col="is_fraud")
+    khop, raw_khop = stats.pop("khop"), raw_stats.pop("khop")
+    assert stats == raw_stats
+    for col, entry in khop["entities"].items():
+        assert entry["index"].equals(raw_khop["entities"][col]["index"])
+        np.testing.assert_array_equal(entry["values"], raw_khop["entities"][col]["values"])
+    stats["khop"] = khop
+
+    enriched = enrich_with_graph_features(compact, stats)
+    expected = enrich_with_graph_features(df, stats)
+    for name in ("graph_max_entity_fraud_rate", "graph_max_hop2_fraud_rate"):
+        pd.testing.assert_series_equal(enriched[name], expected[name])
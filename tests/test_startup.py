@@ -0,0 +1,37 @@
+import time
+
+from fastapi.testclient import TestClient
+
+import trustshield.serving.app as serving_app
+from trustshield.benchmarks.startup import measure_startup
+
+
+def test_app_import_skips_report_and_training_dependencies(tmp_path) -> None:
+    result = measure_startup(str(tmp_path / "no_bundle.joblib"))
+    assert result["eager_heavy_modules"] == []
+    assert result["model_status"] == "missing"
+
+
+def test_readiness_waits_for_background_load_and_warmup(monkeypatch, bundle_path) -> None:
+    monkeypatch.setattr(serving_app, "MODEL_BUNDLE_PATH", bundle_path)
+    monkeypatch.setattr(serving_app, "bundle", None)
+    monkeypatch.setattr(serving_app, "drift_monitor", None)
+    monkeypatch.setattr(serving_app, "model_state", dict(serving_app.model_state))
+
+    with TestClient(serving_app.app) as client:
+        deadline = time.monotonic() + 60
+        # One response per poll: checks are computed before the model state is serialized, so
+        # a load finishing between two separate requests cannot fail the check.
+        ready = client.get("/health/ready").json()
+        while ready["model"]["status"] in ("not_started", "loading"):
+            assert not ready["checks"]["model_warmed_up"]
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+            ready = client.get("/health/ready").json()
+        ready = client.get("/health/ready").json()
+        assert ready["checks"]["model_loaded"] and ready["checks"]["model_warmed_up"]
+        assert ready["model"]["status"] == "ready"
+        assert ready["model"]["warmup_seconds"] is not None
+        assert client.post("/predict", json={"message_text": "hi"}).json()["model_version"] != (
+            "fallback-heuristic"
+        )
@@ -0,0 +1,68 @@
+import asyncio
+import json
+
+from fastapi.testclient import TestClient
+
+import trustshield.serving.app as serving_app
+from trustshield.serving.ndjson import iter_ndjson_lines
+from trustshield.serving.policy import init_policy_state
+
+client = TestClient(serving_app.app)
+
+
+def _split(chunks: list[bytes], max_line_bytes: int = 64) -> list[tuple[int, bytes | None]]:
+    async def _source():
+        for chunk in chunks:
+            yield chunk
+
+    async def _collect():
+        return [item async for item in iter_ndjson_lines(_source(), max_line_bytes)]
+
+    return asyncio.run(_collect())
+
+
+def test_ndjson_lines_span_chunks_and_skip_oversized() -> None:
+    chunks = [b'{"a": 1}\n{"b"', b": 2}\n\n" + b"x" * 50, b"x" * 50 + b'\n{"c": 3}']
+    assert _split(chunks) == [(1, b'{"a": 1}'), (2, b'{"b": 2}'), (4, None), (5, b'{"c": 3}')]
+    assert _split([b"y" * 200]) == [(1, None)]
+
+
+def test_predict_stream_scores_every_line_and_reports_bad_ones() -> None:
+    lines = [json.dumps({"message_text": f"hello {i}", "account_age_days": 30}) for i in range(120)]
+    lines.insert(5, '{"message_text": ')
+    lines.insert(9, json.dumps({"message_text": "x", "payment_attempts": -1}))
+    response = client.post(
+        "/predict/stream?batch_size=16",
+        content="\n".join(lines).encode("utf-8"),
+        headers={"content-type": "application/x-ndjson"},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["line"] for row in rows] == list(range(1, 123))
+    errors = {row["line"]: row["error"] for row in rows if "error" in row}
+    assert errors == {6: "invalid_request", 10: "invalid_request"}
+    scored = [row for row in rows if "error" not in row]
+    assert len(scored) == 120
+    assert all(row["decision"] in {"allow", "review", "block"} for row in scored)
+
+
+def test_predict_stream_matches_columnar(monkeypatch) -> None:
+    for name in ("live_graph", "feature_store", "near_duplicates", "prediction_log"):
+        monkeypatch.setattr(serving_app, name, None)
+    items = [
+        {"message_text": f"urgent otp {i}", "account_age_days": i % 5, "payment_attempts": i % 7}
+        for i in range(40)
+    ]
+    monkeypatch.setattr(serving_app, "policy_runtime_state", init_policy_state())
+    body = "\n".join(json.dumps(item) for item in items).encode("utf-8")
+    rows = [
+        json.loads(line)
+        for line in client.post("/predict/stream?batch_size=16", content=body).text.splitlines()
+    ]
+
+    monkeypatch.setattr(serving_app, "policy_runtime_state", init_policy_state())
+    columns = {name: [item[name] for item in items] for name in items[0]}
+    expected = client.post("/predict/columnar", json={"columns": columns}).json()["columns"]
+    for name, values in expected.items():
+        assert [row[name] for row in rows] == values
@@ -0,0 +1,27 @@
+from trustshield.ingestion import generate_profile_events
+from trustshield.models import explain_event
+from trustshield.models.streaming import train_streaming
+
+
+def test_train_streaming_from_chunked_files(tmp_path) -> None:
+    for i in range(2):
+        df = generate_profile_events("small", n_samples=1500, random_state=i)
+        df["event_id"] += i * 1500
+        df.to_csv(tmp_path / f"events_{i}.csv", index=False)
+
+    cfg = {
+        "dataset": {"random_state": 42},
+        "streaming": {
+            "input_path": str(tmp_path / "events_*.csv"),
+            "chunk_size": 400,
+            "hashing_features": 2**12,
+            "epochs": 1,
+        },
+    }
+    bundle = train_streaming(cfg)
+    assert bundle["meta"]["training_mode"] == "streaming"
+    assert bundle["meta"]["rows_seen"] + bundle["meta"]["holdout_rows"] == 3000
+
+    out = explain_event(bundle, {"message_text": "urgent transfer", "country": "NG"})
+    assert 0 <= out["risk_score"] <= 1
+    assert out["explanation_method"] in {"shap", "linear_coef"}
@@ -0,0 +1,21 @@
+from trustshield.ingestion import generate_profile_events, get_scale_profile
+from trustshield.preprocessing.validation import REQUIRED_COLUMNS, validate_events
+
+
+def test_profile_events_schema_and_ordering() -> None:
+    df = generate_profile_events("small", n_samples=2000, random_state=7)
+    assert list(df.columns) == REQUIRED_COLUMNS + ["event_ts"]
+    assert len(df) == 2000
+    assert df["event_ts"].is_monotonic_increasing
+    validate_events(df)
+
+
+def test_profile_popularity_is_skewed_and_rings_share_entities() -> None:
+    profile = get_scale_profile("small", n_fraud_rings=5, ring_share=1.0)
+    df = generate_profile_events(profile, n_samples=5000, random_state=3)
+    device_counts = df["device_id"].value_counts()
+    assert device_counts.iloc[0] > 10 * device_counts.median()
+
+    ring_devices = df["device_id"] >= f"device_{profile.n_devices:04d}"
+    assert ring_devices.any()
+    assert df.loc[ring_devices, "card_id"].nunique() <= 5 * profile.ring_cards
@@ -0,0 +1,20 @@
+import scipy.sparse as sp
+
+from trustshield.ingestion import generate_synthetic_events
+from trustshield.models import explain_event
+from trustshield.models.train import fit_ensemble
+from trustshield.preprocessing import normalize_text
+
+
+def test_fit_ensemble_keeps_text_sparse_and_scores_payload() -> None:
+    df = generate_synthetic_events(n_samples=400, random_state=5)
+    df["message_text"] = df["message_text"].map(normalize_text)
+    bundle = fit_ensemble(df, max_features_tfidf=200, random_state=5)
+
+    x_text = bundle["text_vectorizer"].transform(["urgent transfer"])
+    assert sp.issparse(x_text)
+    assert x_text.dtype.name == "float32"
+
+    out = explain_event(bundle, {"message_text": "urgent transfer now", "country": "NG"})
+    assert 0 <= out["risk_score"] <= 1
+    assert 0 <= bundle["metrics"]["pr_auc"] <= 1
@@ -0,0 +1,137 @@
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+import trustshield.features.event_time as event_time_module
+import trustshield.serving.app as serving_app
+from trustshield.features.velocity import EntityFeatureStore, replay_velocity_features
+from trustshield.ingestion import generate_synthetic_events
+from trustshield.models import explain_event
+from trustshield.models.train import fit_ensemble
+from trustshield.preprocessing import normalize_text
+from trustshield.serving.policy import decide, decide_batch, load_policy
+
+
+def _event(ts: float, card: str, **overrides) -> dict:
+    event = {
+        "user_id": "u1",
+        "device_id": "d1",
+        "ip_id": "i1",
+        "card_id": card,
+        "payment_attempts": 2,
+        "event_ts": ts,
+    }
+    return {**event, **overrides}
+
+
+def test_windows_count_sum_and_expire() -> None:
+    store = EntityFeatureStore(windows_seconds=[60, 600], buckets=6)
+    for i in range(5):
+        features = store.update(_event(1_000.0 + i * 20, f"c{i}"))
+    assert features["velocity_user_id_events_600s"] == 5.0
+    assert features["velocity_user_id_payment_attempts_sum_600s"] == 10.0
+    # 60 s window in 10 s buckets: the events at 1000 and 1020 have left it.
+    assert features["velocity_user_id_events_60s"] == 3.0
+    assert features["velocity_device_id_distinct_card_id_600s"] == pytest.approx(5.0, abs=0.2)
+    assert features["velocity_ip_id_distinct_user_id_600s"] == pytest.approx(1.0, abs=0.01)
+    assert features["velocity_card_id_events_600s"] == 1.0
+
+    later = store.update(_event(2_000.0, "c0", ip_id="unknown_ip"))
+    assert later["velocity_user_id_events_600s"] == 1.0
+    assert later["velocity_ip_id_events_600s"] == 0.0
+
+
+def test_distinct_counts_stay_close_and_memory_is_bounded() -> None:
+    store = EntityFeatureStore(windows_seconds=[3_600])
+    for i in range(150):
+        features = store.update(_event(float(i), f"card_{i}", user_id=f"user_{i}"))
+    assert features["velocity_device_id_distinct_card_id_3600s"] == pytest.approx(150, rel=0.15)
+    assert features["velocity_ip_id_distinct_user_id_3600s"] == pytest.approx(150, rel=0.15)
+
+    store = EntityFeatureStore(windows_seconds=[60], max_entities=100)
+    for i in range(1_000):
+        store.update(_event(float(i), f"c{i}", user_id=f"u{i}"))
+    stats = store.stats()
+    assert max(stats["tracked_entities"].values()) <= 100
+    # Users idle for longer than the window are dropped before the cap is reached.
+    assert stats["tracked_entities"]["user_id"] <= 61
+
+
+def test_velocity_rules_match_between_decide_and_decide_batch() -> None:
+    policy = load_policy()
+    policy["velocity"] = {
+        "rules": [{"feature": "velocity_device_id_distinct_card_id_3600s", "review": 3, "block": 5}]
+    }
+    events = [_event(float(i), f"c{i}") for i in range(6)]
+    velocity = EntityFeatureStore().update_frame(pd.DataFrame(events))
+    payloads = [{"message_text": "hi", "account_age_days": 30, "payment_attempts": 1}] * 6
+    single = [
+        decide(0.1, payload, policy, velocity=row)
+        for payload, row in zip(payloads, velocity.to_dict(orient="records"))
+    ]
+    assert [d for d, _, _ in single] == ["allow", "allow", "review", "review", "block", "block"]
+    assert single[-1][2] == ["velocity:velocity_device_id_distinct_card_id_3600s:block"]
+    batch = decide_batch([0.1] * 6, pd.DataFrame(payloads), policy, velocity=velocity)
+    assert batch["decision"].tolist() == [d for d, _, _ in single]
+    assert batch["policy_triggers"].tolist() == [t for _, _, t in single]
+
+
+def test_training_replays_velocity_in_time_order() -> None:
+    df = generate_synthetic_events(n_samples=400, random_state=5)
+    df["message_text"] = df["message_text"].map(normalize_text)
+    df["event_ts"] = 1_700_000_000.0 + np.random.default_rng(5).uniform(0, 7_200, len(df))
+
+    replayed = replay_velocity_features(df)
+    first = df["event_ts"].idxmin()
+    counts = replayed.filter(like="_events_")
+    assert counts.loc[first].max() == 1.0
+    assert replayed["velocity_user_id_events_3600s"].max() > 1.0
+
+    bundle = fit_ensemble(df, max_features_tfidf=200, random_state=5)
+    assert "velocity_device_id_distinct_card_id_3600s" in bundle["meta"]["num_cols"]
+    payload = {"message_text": "hello", "device_id": "d9", "event_ts": 1_700_000_100.0}
+    without = explain_event(bundle, payload, detail="score")
+    velocity = EntityFeatureStore().update(payload)
+    with_velocity = explain_event(bundle, payload, detail="score", velocity=velocity)
+    assert without["features"]["velocity_device_id_events_60s"] == 0.0
+    assert with_velocity["features"]["velocity_device_id_events_60s"] == 1.0
+
+
+def test_far_future_timestamp_does_not_freeze_windows(monkeypatch) -> None:
+    clock = {"now": 1_000_000.0}
+    monkeypatch.setattr(event_time_module, "wall_time", lambda: clock["now"])
+    store = EntityFeatureStore(windows_seconds=[60])
+    store.update(_event(1e12, "c0"))
+    for i in range(5):
+        clock["now"] += 7_200.0
+        features = store.update(_event(clock["now"], f"c{i}"))
+    # Capped at the wall clock plus skew, so later events still expire the earlier ones.
+    assert features["velocity_user_id_events_60s"] == 1.0
+
+
+def test_serving_store_follows_the_bundle_windows(monkeypatch, tmp_path) -> None:
+    df = generate_synthetic_events(n_samples=200, random_state=6)
+    df["message_text"] = df["message_text"].map(normalize_text)
+    df["event_ts"] = 1_700_000_000.0 + np.arange(len(df)) * 20.0
+    bundle = fit_ensemble(
+        df,
+        max_features_tfidf=100,
+        random_state=6,
+        velocity_windows_seconds=[120],
+        velocity_buckets=4,
+    )
+    assert bundle["meta"]["velocity"] == {"windows_seconds": [120], "buckets_per_window": 4}
+    assert "velocity_user_id_events_120s" in bundle["meta"]["num_cols"]
+
+    path = tmp_path / "bundle.joblib"
+    joblib.dump(bundle, path)
+    policy = {**serving_app.policy_cfg, "velocity": {"enabled": True, "windows_seconds": [60]}}
+    monkeypatch.setattr(serving_app, "policy_cfg", policy)
+    monkeypatch.setattr(serving_app, "feature_store", serving_app._init_feature_store(policy))
+    monkeypatch.setattr(serving_app, "bundle", None)
+    monkeypatch.setattr(serving_app, "drift_monitor", None)
+    monkeypatch.setattr(serving_app, "model_state", dict(serving_app.model_state))
+    assert serving_app.load_model(str(path)) is not None
+    assert serving_app.feature_store.windows == [120]
+    assert serving_app.feature_store.buckets == 4